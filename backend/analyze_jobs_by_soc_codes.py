@@ -6,87 +6,46 @@ Script to analyze jobs by specific SOC codes using Claude/Sonnet 4.0
 import asyncio
 import json
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.services.analysis_service import HybridTermAnalyzer
-from app.core.config import settings
+from app.services.analysis_service import get_analyzer
+from app.core.config import get_settings
+from app.core.soc import soc_filter
+from app.services.soc_catalog_service import load_soc_catalog
 
 async def find_available_soc_codes():
     """Find all available SOC codes in the database"""
-    client = AsyncIOMotorClient(settings.database_url)
+    client = AsyncIOMotorClient(get_settings().database_url)
     db = client.occupation100
-    collection = db.jobs
     
     print("🔍 Searching for available SOC codes in the database...")
     
-    # Find all unique SOC codes
-    pipeline = [
-        {"$match": {"soc_code": {"$exists": True, "$ne": None}}},
-        {"$group": {"_id": "$soc_code", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    
-    soc_codes = await collection.aggregate(pipeline).to_list(length=None)
+    # Counts are kept per SOC code in soc_catalog at ingestion (build_soc_catalog.py for older data)
+    catalog = await load_soc_catalog(db)
     
+    soc_codes = sorted((entry for entry in catalog if entry["search_count"]), key=lambda entry: -entry["search_count"])
     print(f"📊 Found {len(soc_codes)} unique SOC codes:")
     for soc in soc_codes:
-        print(f"  - {soc['_id']}: {soc['count']} jobs")
-    
-    # Also check onet_codes and soc_codes arrays
-    print("\n🔍 Checking for SOC codes in arrays...")
-    
-    # Check onet_codes
-    pipeline_onet = [
-        {"$match": {"onet_codes": {"$exists": True, "$ne": None, "$ne": []}}},
-        {"$unwind": "$onet_codes"},
-        {"$group": {"_id": "$onet_codes", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    
-    onet_codes = await collection.aggregate(pipeline_onet).to_list(length=None)
-    print(f"📊 Found {len(onet_codes)} unique O*NET codes:")
-    for code in onet_codes[:10]:  # Show top 10
-        print(f"  - {code['_id']}: {code['count']} jobs")
-    
-    # Check soc_codes arrays
-    pipeline_soc_array = [
-        {"$match": {"soc_codes": {"$exists": True, "$ne": None, "$ne": []}}},
-        {"$unwind": "$soc_codes"},
-        {"$group": {"_id": "$soc_codes", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
+        print(f"  - {soc['soc_code']}: {soc['search_count']} jobs")
     
-    soc_codes_array = await collection.aggregate(pipeline_soc_array).to_list(length=None)
-    print(f"📊 Found {len(soc_codes_array)} unique SOC codes in arrays:")
-    for code in soc_codes_array[:10]:  # Show top 10
-        print(f"  - {code['_id']}: {code['count']} jobs")
+    # Also count postings under any of their SOC codes (soc_codes / O*NET codes)
+    print(f"\n📊 Found {len(catalog)} unique SOC codes across all SOC fields:")
+    for code in catalog[:10]:  # Show top 10
+        print(f"  - {code['soc_code']}: {code['posting_count']} jobs")
     
     client.close()
-    return soc_codes, onet_codes, soc_codes_array
+    return catalog
 
 async def analyze_jobs_by_soc_code(soc_code: str, limit: int = 100):
     """Analyze jobs for a specific SOC code using Claude/Sonnet 4.0"""
-    client = AsyncIOMotorClient(settings.database_url)
+    client = AsyncIOMotorClient(get_settings().database_url)
     db = client.occupation100
     collection = db.jobs
     
     print(f"\n🎯 Analyzing jobs for SOC code: {soc_code}")
     
-    # Try multiple query patterns to find jobs with this SOC code
-    queries = [
-        {"soc_code": soc_code},
-        {"onet_codes": soc_code},
-        {"soc_codes": soc_code},
-        {"onet_codes": {"$in": [soc_code]}},
-        {"soc_codes": {"$in": [soc_code]}}
-    ]
-    
-    jobs = []
-    for query in queries:
-        cursor = collection.find(query).limit(limit)
-        batch = await cursor.to_list(length=limit)
-        if batch:
-            jobs.extend(batch)
-            print(f"  ✅ Found {len(batch)} jobs with query: {query}")
-            break
+    cursor = collection.find(soc_filter(soc_code)).limit(limit)
+    jobs = await cursor.to_list(length=limit)
+    if jobs:
+        print(f"  ✅ Found {len(jobs)} jobs")
     else:
         print(f"  ❌ No jobs found for SOC code: {soc_code}")
         await client.close()
@@ -101,7 +60,7 @@ async def analyze_jobs_by_soc_code(soc_code: str, limit: int = 100):
     print(f"  📊 Analyzing {len(jobs)} unique jobs...")
     
     # Initialize the analyzer
-    analyzer = HybridTermAnalyzer()
+    analyzer = get_analyzer()
     
     # Extract job descriptions
     job_descriptions = []
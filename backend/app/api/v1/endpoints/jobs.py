@@ -1,19 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Union, Tuple, Optional
 from difflib import SequenceMatcher
 
 from app.core.config import Settings, get_settings
+from app.core.soc import soc_filter
 from app.models.pydantic_models import (
+    AnalyzedTerm,
     JobSearchRequest,
     JobAnalysisResponse,
     JobInsertResponse,
     JobSuggestion,
+    SimilarOccupation,
+    SimilarOccupationsResponse,
     Job
 )
 from app.services import career_api_service
-from app.services.analysis_service import generate_report_from_postings
+from app.services.analysis_service import get_analyzer, generate_report_from_postings, generate_report_from_term_stats
+from app.services.term_stats_service import load_term_stats
+from app.services.soc_catalog_service import load_soc_catalog, catalog_entry
 from app.services.cache_service import cache_service
-from app.db.mongodb import insert_jobs_from_job_set, get_jobs_by_criteria, get_job_count
+from app.services.export_service import stream_ndjson, EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE
+from app.services.ingest_service import ingest_ndjson
+from app.db.monitoring import get_command_monitor
+from app.db.mongodb import (
+    insert_jobs_from_job_set,
+    get_jobs_by_criteria,
+    get_jobs_page,
+    iter_jobs,
+    get_jobs_for_analysis,
+    get_cached_job_count,
+    get_estimated_job_count,
+    encode_page_token,
+    decode_page_token,
+    get_database,
+    build_projection,
+    INTERNAL_FIELDS
+)
 
 router = APIRouter()
 
@@ -46,6 +69,23 @@ def find_job_match(query: str, supported_jobs: List[Dict[str, str]]) -> Tuple[Op
     return None, suggestions
 
 
+async def attach_distinctive_terms(report, soc_code: str):
+    """Add the prebuilt cross-occupation distinctive terms (see build_distinctive_terms.py) to a report."""
+    # Imported here: the module loads numpy and scipy, which start-up does not need
+    from app.services.distinctive_terms_service import load_distinctive_terms
+    
+    try:
+        terms = await load_distinctive_terms(get_database(), soc_code)
+    except Exception as e:
+        print(f"Error loading distinctive terms for {soc_code}: {e}")
+        return
+    if terms:
+        report.distinctive_terms = [
+            AnalyzedTerm(term=item["term"], count=item["doc_count"], context_sentences=item.get("context_sentences", []))
+            for item in terms
+        ]
+
+
 @router.post("/analyze", response_model=JobAnalysisResponse)
 async def analyze_job(
     search_request: JobSearchRequest,
@@ -84,27 +124,32 @@ async def analyze_job(
     
     # Fetch job postings from MongoDB for the matched job
     try:
-        # Query MongoDB for jobs with this SOC code
-        filters = {}
+        # Without Claude, assemble the rule-based report from ingest-time term statistics
+        if not get_analyzer().claude_available:
+            total_postings, term_stats = await load_term_stats(get_database(), soc_code)
+            if total_postings:
+                report = generate_report_from_term_stats(total_postings, term_stats, job_title, soc_code)
+                await attach_distinctive_terms(report, soc_code)
+                cache_service.cache_analysis(soc_code, job_title, report)
+                return JobAnalysisResponse(
+                    success=True,
+                    data=report
+                )
         
-        # Try multiple SOC code field patterns
+        # Query MongoDB for jobs with this SOC code in any of the SOC code fields
         filters = {
-            "$or": [
-                {"soc_code": soc_code},
-                {"onet_codes": soc_code},
-                {"soc_codes": soc_code},
-                {"onet_codes": {"$in": [soc_code]}},
-                {"soc_codes": {"$in": [soc_code]}}
-            ]
+            **soc_filter(soc_code),
+            # Analyze one posting per near-duplicate cluster
+            "dup_canonical": {"$ne": False}
         }
         
-        # Get jobs from MongoDB (limit to 100 for analysis)
-        raw_postings = await get_jobs_by_criteria(limit=100, **filters)
+        # Get jobs from MongoDB (limit to 100 for analysis), only the fields the analyzer reads
+        raw_postings = await get_jobs_for_analysis(limit=100, **filters)
         
         if not raw_postings:
             # If no jobs found by SOC code, try job title matching
             title_filters = {"JobTitle": {"$regex": job_title, "$options": "i"}}
-            raw_postings = await get_jobs_by_criteria(limit=100, **title_filters)
+            raw_postings = await get_jobs_for_analysis(limit=100, **title_filters)
         
         if not raw_postings:
             raise HTTPException(
@@ -118,6 +163,7 @@ async def analyze_job(
             job_title,
             soc_code
         )
+        await attach_distinctive_terms(report, soc_code)
         
         # Cache the analysis results
         cache_service.cache_analysis(soc_code, job_title, report)
@@ -153,6 +199,72 @@ async def insert_jobs(
         )
 
 
+@router.post("/insert/stream", response_model=JobInsertResponse)
+async def insert_jobs_stream(request: Request, gzip: bool = False):
+    """
+    Insert jobs sent as newline-delimited JSON (one job per line), reading the
+    request body as it arrives.
+    
+    Jobs are validated and upserted INSERT_CHUNK_SIZE at a time while the
+    upload is still in progress, so memory use stays flat however large the
+    body is; a running summary is logged as chunks complete. The body may be
+    gzip-compressed (Content-Encoding: gzip, or gzip=true). Chunks written
+    before a malformed stream or a dropped connection are kept.
+    """
+    compressed = gzip or request.headers.get("content-encoding", "").lower() == "gzip"
+    try:
+        return await ingest_ndjson(request.stream(), compressed=compressed)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to insert jobs: {str(e)}"
+        )
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Field list for a comma-separated fields parameter; by default whole postings
+    without the fields derived at ingestion.
+    """
+    field_list = fields.split(",") if fields else [f"-{field}" for field in INTERNAL_FIELDS]
+    try:
+        build_projection(field_list)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return field_list
+
+
+def build_list_filters(
+    company: str = None,
+    location: str = None,
+    job_title: str = None,
+    search: str = None,
+    collapse_duplicates: bool = False
+) -> Dict[str, Any]:
+    """Build the MongoDB filter criteria shared by the list and export endpoints."""
+    filters = {}
+    if search:
+        filters["$text"] = {"$search": search}
+    if company:
+        filters["Company"] = {"$regex": company, "$options": "i"}
+    if location:
+        filters["Location"] = {"$regex": location, "$options": "i"}
+    if job_title:
+        filters["JobTitle"] = {"$regex": job_title, "$options": "i"}
+    if collapse_duplicates:
+        # Postings ingested before clustering have no flag and are kept
+        filters["dup_canonical"] = {"$ne": False}
+    return filters
+
+
 @router.get("/list")
 async def list_jobs(
     limit: int = 100,
@@ -160,24 +272,76 @@ async def list_jobs(
     company: str = None,
     location: str = None,
     job_title: str = None,
+    search: str = None,
+    collapse_duplicates: bool = False,
+    fields: str = None,
+    paginate: str = "offset",
+    cursor: str = None,
+    count: str = "exact",
     settings: Settings = Depends(get_settings)
 ):
     """
     Retrieve jobs from MongoDB with optional filtering and pagination.
+    search matches whole words in the title, company and location through the text index.
+    With collapse_duplicates, only one posting per near-duplicate cluster is returned.
+    fields is a comma-separated list of fields to return (e.g. "JvId,JobTitle,Company"),
+    or to leave out when prefixed with "-" (e.g. "-Description,-MetaData"); by default
+    whole postings are returned without the fields derived at ingestion.
+    
+    Pagination is by skip/limit (paginate=offset, the default) or by cursor
+    (paginate=cursor): pages are in _id order and each response carries a
+    `next` token to pass back as `cursor` for the following page (null on the
+    last page). Passing a cursor implies paginate=cursor.
+    
+    count controls total_count: "exact" counts the matches (reused for a short
+    time per filter), "estimated" reads the collection size from metadata when
+    there are no filters (otherwise as "exact"), "none" skips counting.
     """
+    field_list = parse_fields(fields)
+    
+    if cursor:
+        paginate = "cursor"
+    if paginate not in ("offset", "cursor") or count not in ("exact", "estimated", "none"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="paginate must be offset or cursor; count must be exact, estimated or none"
+        )
+    if paginate == "cursor" and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip cannot be combined with cursor pagination"
+        )
+    
+    filters = build_list_filters(company, location, job_title, search, collapse_duplicates)
+    
+    after = None
+    if cursor:
+        try:
+            after = decode_page_token(cursor, filters)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
     try:
-        # Build filter criteria
-        filters = {}
-        if company:
-            filters["Company"] = {"$regex": company, "$options": "i"}
-        if location:
-            filters["Location"] = {"$regex": location, "$options": "i"}
-        if job_title:
-            filters["JobTitle"] = {"$regex": job_title, "$options": "i"}
-        
         # Get jobs and total count
-        jobs = await get_jobs_by_criteria(limit=limit, skip=skip, **filters)
-        total_count = await get_job_count(**filters)
+        next_token = None
+        if paginate == "cursor":
+            # The _id is needed for the next token, so it cannot be left out
+            page_fields = [field for field in field_list if field.strip() != "-_id"] or [f"-{field}" for field in INTERNAL_FIELDS]
+            jobs = await get_jobs_page(limit=limit, after=after, fields=page_fields, **filters)
+            if len(jobs) == limit and jobs:
+                next_token = encode_page_token(jobs[-1]["_id"], filters)
+        else:
+            jobs = await get_jobs_by_criteria(limit=limit, skip=skip, fields=field_list, **filters)
+        
+        if count == "none":
+            total_count = None
+        elif count == "estimated" and not filters:
+            total_count = await get_estimated_job_count()
+        else:
+            total_count = await get_cached_job_count(**filters)
         
         return {
             "success": True,
@@ -185,7 +349,8 @@ async def list_jobs(
             "total_count": total_count,
             "returned_count": len(jobs),
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next": next_token
         }
         
     except Exception as e:
@@ -195,6 +360,145 @@ async def list_jobs(
         )
 
 
+@router.get("/export")
+async def export_jobs(
+    company: str = None,
+    location: str = None,
+    job_title: str = None,
+    search: str = None,
+    collapse_duplicates: bool = False,
+    fields: str = None,
+    limit: int = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    gzip: bool = False
+):
+    """
+    Stream every matching job as newline-delimited JSON (one posting per line).
+    
+    Accepts the same filters and fields as /list. Documents are read from a
+    MongoDB cursor batch_size at a time and written out as they arrive, so
+    memory use does not depend on how many postings are exported. With gzip,
+    the stream is gzip-compressed on the fly (Content-Encoding: gzip).
+    """
+    field_list = parse_fields(fields)
+    filters = build_list_filters(company, location, job_title, search, collapse_duplicates)
+    batch_size = max(1, min(batch_size, MAX_EXPORT_BATCH_SIZE))
+    
+    headers = {"Content-Disposition": 'attachment; filename="jobs.ndjson"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        stream_ndjson(iter_jobs(limit=limit, batch_size=batch_size, fields=field_list, **filters), compress=gzip),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
+
+
+@router.get("/similar/{soc_code}", response_model=SimilarOccupationsResponse)
+async def similar_occupations(
+    soc_code: str,
+    limit: int = 10,
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Return the occupations whose postings are most similar to the given SOC code,
+    ranked by cosine similarity of their precomputed term vectors.
+    
+    Ingestion does not update the vectors: they are as of the last run of
+    build_similarity_index.py, whose build_id and built_at are returned so
+    clients can tell how current the answer is.
+    """
+    # Imported here: the module loads numpy and scipy, which start-up does not need
+    from app.services.similarity_service import get_similarity_index
+    
+    try:
+        index = await get_similarity_index(get_database())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load similarity index: {str(e)}"
+        )
+    
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Similarity index has not been built yet"
+        )
+    if soc_code not in index:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No term vector for SOC {soc_code}"
+        )
+    
+    titles = {job["soc_code"]: job["title"] for job in settings.supported_jobs}
+    similar = [
+        SimilarOccupation(title=titles.get(item["soc_code"]), **item)
+        for item in index.most_similar(soc_code, k=max(1, min(limit, 100)))
+    ]
+    return SimilarOccupationsResponse(
+        success=True,
+        soc_code=soc_code,
+        title=titles.get(soc_code),
+        similar=similar,
+        build_id=index.build_id,
+        built_at=index.built_at
+    )
+
+
+@router.get("/soc-stats")
+async def get_soc_stats(sort: str = "posting_count", limit: int = 0):
+    """
+    Get posting counts per SOC code from the catalog maintained at ingestion.
+    
+    Each SOC code has its posting_count (postings filed under it with any of
+    their SOC codes), search_count (postings fetched for it as the search
+    SOC code), latest DatePosted, last ingest time and a breakdown by state.
+    Reads the small soc_catalog collection, so it costs the same however
+    many postings are stored.
+    """
+    if sort not in ("posting_count", "search_count"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sort must be posting_count or search_count"
+        )
+    try:
+        catalog = await load_soc_catalog(get_database(), sort=sort, limit=max(0, limit))
+        return {
+            "success": True,
+            "soc_code_count": len(catalog),
+            "soc_codes": catalog
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load SOC statistics: {str(e)}"
+        )
+
+
+@router.get("/soc-stats/{soc_code}")
+async def get_soc_code_stats(soc_code: str):
+    """
+    Get the catalog entry (counts, dates and locations) for one SOC code.
+    """
+    try:
+        doc = await get_database().soc_catalog.find_one({"_id": soc_code})
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load SOC statistics: {str(e)}"
+        )
+    if not doc or not doc.get("posting_count"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No postings for SOC code {soc_code}"
+        )
+    return {
+        "success": True,
+        **catalog_entry(doc)
+    }
+
+
 @router.get("/cache/stats")
 async def get_cache_stats():
     """
@@ -233,4 +537,40 @@ async def clear_cache(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to clear cache: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/db/query-stats")
+async def get_query_stats(top: int = 20, sort: str = "total_ms"):
+    """
+    Get MongoDB command statistics per query shape, slowest first.
+    
+    Each shape (command, collection and filter structure with the values
+    left out) has its count, failures, latency quantiles estimated from its
+    histogram, documents returned or written, and bytes (only recorded with
+    MONGO_COMMAND_BYTES=true). sort ranks by any of total_ms, mean_ms,
+    p95_ms, p99_ms, max_ms, count or bytes.
+    """
+    if sort not in ("total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "count", "failures", "documents", "bytes"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort query shapes by {sort}"
+        )
+    monitor = get_command_monitor()
+    return {
+        "success": True,
+        "shape_count": len(monitor.snapshot()),
+        "shapes": monitor.top_shapes(max(1, top), sort)
+    }
+
+
+@router.delete("/db/query-stats")
+async def reset_query_stats():
+    """
+    Forget the recorded MongoDB command statistics.
+    """
+    get_command_monitor().reset()
+    return {
+        "success": True,
+        "message": "Cleared MongoDB query statistics"
+    }
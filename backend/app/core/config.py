@@ -1,39 +1,60 @@
 import csv
-import json
 import pathlib
-from pathlib import Path
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict
 from pydantic_settings import BaseSettings
 
+SOC_CODES_CSV = pathlib.Path(__file__).parent.parent.parent / "config" / "onet_soc_codes.csv"
+
+
+@lru_cache(maxsize=None)
+def load_supported_jobs() -> List[Dict[str, str]]:
+    """
+    Load the supported job titles from the CSV file with 100 SOC codes.
+    
+    Parsed on first use and cached for the life of the process, so every
+    Settings instance (and every script) shares one copy.
+    """
+    supported_jobs = []
+    try:
+        with open(SOC_CODES_CSV, "r", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) == 1:
+                    # Handle the format where title and soc_code are in one quoted string
+                    data = row[0]
+                    if ',' in data:
+                        title, soc_code = data.rsplit(',', 1)
+                        supported_jobs.append({"title": title.strip(), "soc_code": soc_code.strip()})
+        print(f"Loaded {len(supported_jobs)} supported job titles from CSV config.")
+    except FileNotFoundError:
+        # Handle case where file might not exist
+        print(f"Warning: {SOC_CODES_CSV} not found. Supported jobs list will be empty.")
+    except Exception as e:
+        print(f"Error loading {SOC_CODES_CSV}: {e}")
+    return supported_jobs
+
 
 class Settings(BaseSettings):
     database_url: str
     onestop_api_key: str = ""
     onestop_user_id: str = ""
     anthropic_api_key: str = ""
-    supported_jobs: Optional[List[Dict[str, str]]] = None
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Load supported jobs from the CSV file with 100 SOC codes
-        self.supported_jobs = []
-        config_path = pathlib.Path(__file__).parent.parent.parent / "config" / "onet_soc_codes.csv"
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) == 1:
-                        # Handle the format where title and soc_code are in one quoted string
-                        data = row[0]
-                        if ',' in data:
-                            title, soc_code = data.rsplit(',', 1)
-                            self.supported_jobs.append({"title": title.strip(), "soc_code": soc_code.strip()})
-            print(f"Loaded {len(self.supported_jobs)} supported job titles from CSV config.")
-        except FileNotFoundError:
-            # Handle case where file might not exist
-            print(f"Warning: {config_path} not found. Supported jobs list will be empty.")
-        except Exception as e:
-            print(f"Error loading {config_path}: {e}")
+    # Approximate token budget for the posting text sent to Claude in one analysis
+    analysis_token_budget: int = 3750
+    # Worker processes for rule-based analysis of large SOCs (0 uses every core)
+    analysis_workers: int = 0
+    # Follow a change stream on jobs so writes from other processes invalidate
+    # cached analyses too (needs a replica set)
+    watch_job_changes: bool = False
+    # Record latency histograms per MongoDB query shape (/jobs/db/query-stats, /metrics)
+    mongo_command_monitoring: bool = True
+    # Also record the encoded size of every command and reply (re-encodes each reply)
+    mongo_command_bytes: bool = False
+
+    @property
+    def supported_jobs(self) -> List[Dict[str, str]]:
+        return load_supported_jobs()
 
     class Config:
         env_file = ".env"
@@ -44,8 +65,13 @@ class Settings(BaseSettings):
         }
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
 
 
-def get_settings() -> Settings:
-    return settings
\ No newline at end of file
+def __getattr__(name: str):
+    # `settings` is built on first access rather than at import time
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
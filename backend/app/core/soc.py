@@ -0,0 +1,37 @@
+from typing import List, Dict, Any
+
+
+def job_soc_codes(job: Dict[str, Any]) -> List[str]:
+    """
+    Return every SOC code a job posting is filed under.
+    
+    Combines the search SOC code (soc_code) with the O*NET codes returned by the
+    job details API (soc_codes / OnetCodes, or onet_codes on older documents),
+    de-duplicated in that order.
+    """
+    codes = []
+    if job.get("soc_code"):
+        codes.append(job["soc_code"])
+    for field in ("soc_codes", "OnetCodes", "onet_codes"):
+        values = job.get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        codes.extend(values)
+    
+    unique_codes = []
+    for code in codes:
+        code = str(code).strip()
+        if code and code not in unique_codes:
+            unique_codes.append(code)
+    return unique_codes
+
+
+def soc_filter(soc_code: str) -> Dict[str, Any]:
+    """
+    MongoDB filter matching postings filed under a SOC code.
+    
+    Matches the canonical soc_all array (every code from job_soc_codes, stored at
+    ingest), so the lookup is a single indexed equality. Postings ingested
+    before soc_all existed need migrate_soc_all.py to be found.
+    """
+    return {"soc_all": soc_code}
@@ -0,0 +1,113 @@
+from typing import List, Dict, Any, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# Every index the application's queries rely on, per collection. Created at
+# startup; indexes found on these collections but not declared here are
+# reported as unmanaged.
+MANAGED_INDEXES: Dict[str, List[IndexModel]] = {
+    "jobs": [
+        # Upserts and change detection look postings up by JvId
+        IndexModel([("JvId", ASCENDING)], name="jvid_unique", unique=True),
+        # Analysis selects postings by any of their SOC codes (multikey, see soc_filter)
+        IndexModel([("soc_all", ASCENDING)], name="soc_all"),
+        # Per-SOC scripts group and select by the primary SOC code
+        IndexModel([("soc_code", ASCENDING)], name="soc_code"),
+        # Members of a near-duplicate cluster whose representative changed
+        IndexModel([("dup_cluster_id", ASCENDING)], name="dup_cluster_id"),
+        # /list search
+        IndexModel(
+            [("JobTitle", TEXT), ("Company", TEXT), ("Location", TEXT)],
+            name="posting_text",
+            weights={"JobTitle": 5, "Company": 2, "Location": 1},
+            default_language="english"
+        ),
+    ],
+    "soc_term_stats": [
+        # load_term_stats: one SOC's terms by posting count
+        IndexModel([("soc_code", ASCENDING), ("doc_count", DESCENDING), ("_id", ASCENDING)], name="soc_doc_count"),
+    ],
+    "soc_term_vectors": [
+        IndexModel([("build_id", ASCENDING)], name="build_id"),
+    ],
+}
+
+
+def _key_signature(key) -> Tuple:
+    """Comparable form of an index key; text indexes are stored as _fts/_ftsx."""
+    items = list(key.items())
+    if any(direction == TEXT for _, direction in items):
+        return (("_fts", TEXT), ("_ftsx", 1))
+    return tuple((field, direction) for field, direction in items)
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create every managed index that does not exist yet.
+
+    An index is considered present when one with the same key exists, whatever
+    its name, so indexes created by hand are not duplicated. Failures (e.g. a
+    unique index over existing duplicates) are reported, not raised, so the
+    application still starts.
+
+    Args:
+        db: Motor database handle
+
+    Returns:
+        Dictionary with the "created" and "failed" index names ("collection.name")
+    """
+    result = {"created": [], "failed": []}
+    for collection_name, indexes in MANAGED_INDEXES.items():
+        collection = db[collection_name]
+        existing = {_key_signature(index["key"]) async for index in collection.list_indexes()}
+        for index in indexes:
+            if _key_signature(index.document["key"]) in existing:
+                continue
+            name = f"{collection_name}.{index.document['name']}"
+            try:
+                await collection.create_indexes([index])
+                result["created"].append(name)
+            except OperationFailure as e:
+                print(f"⚠️ Could not create index {name}: {e}")
+                result["failed"].append(name)
+    return result
+
+
+async def index_report(db) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare the managed index set with what the database has and uses.
+
+    Usage comes from $indexStats and counts operations since the server (or the
+    index) last started, so an index only shows as unused after the application
+    has served representative traffic.
+
+    Args:
+        db: Motor database handle
+
+    Returns:
+        Per collection: "missing" managed indexes, "unmanaged" indexes present but
+        not declared, "unused" indexes with no recorded operations, and "usage"
+        (index name -> operations)
+    """
+    report = {}
+    for collection_name, indexes in MANAGED_INDEXES.items():
+        collection = db[collection_name]
+        existing = {index["name"]: _key_signature(index["key"]) async for index in collection.list_indexes()}
+        declared = {_key_signature(index.document["key"]): index.document["name"] for index in indexes}
+
+        usage = {}
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                usage[stats["name"]] = stats.get("accesses", {}).get("ops", 0)
+        except OperationFailure as e:
+            print(f"⚠️ $indexStats unavailable for {collection_name}: {e}")
+
+        present = set(existing.values())
+        report[collection_name] = {
+            "missing": [name for key, name in declared.items() if key not in present],
+            "unmanaged": [name for name, key in existing.items() if name != "_id_" and key not in declared],
+            "unused": [name for name, ops in usage.items() if name != "_id_" and ops == 0],
+            "usage": usage,
+        }
+    return report
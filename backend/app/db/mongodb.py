@@ -1,21 +1,112 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from bson import ObjectId
+from bson.errors import InvalidId
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.core.config import settings
-from app.models.pydantic_models import Job, JobInsertResponse
-from typing import List, Dict, Any
+from app.core.config import get_settings
+from app.core.soc import job_soc_codes
+from app.db.indexes import ensure_indexes
+from app.db.monitoring import get_command_monitor
+from app.models.pydantic_models import Job, JobInsertError, JobInsertResponse
+from typing import List, Dict, Any, Optional, Set, Tuple, AsyncIterator, Union
+from typing_extensions import Annotated
+from pydantic import Field, TypeAdapter, ValidationError
 from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.services.dedup_service import assign_duplicate_clusters, store_lsh_buckets
+from app.services.event_service import publish_soc_changes, SOC_FIELDS
+from app.services.soc_catalog_service import prepare_soc_catalog, apply_soc_catalog
+from app.services.term_stats_service import prepare_term_stats, apply_term_stats
+from app.services.text_service import annotate_clean_text, CLEANER_VERSION
 
 client: AsyncIOMotorClient = None
 
+# Start-up index creation, kept so it is not garbage collected mid-run
+_index_task: Optional[asyncio.Task] = None
+
+# Fields derived at ingestion for de-duplication, term statistics and analysis,
+# not part of the posting itself; left out of listings unless asked for
+INTERNAL_FIELDS = ["clean_text", "sentences", "cleaner_version", "minhash", "content_hash", "document_hash", "term_stats_socs", "term_stats_terms"]
+
+# Everything the analyzer reads from a posting cleaned at ingestion
+# (prepare_postings and select_representative_postings)
+ANALYSIS_FIELDS = ["JvId", "JobTitle", "Company", "Location", "clean_text", "sentences", "cleaner_version"]
+
+# Raw text needed to clean postings stored before (or by an older) cleaner version
+RAW_TEXT_FIELDS = ["JvId", "Description", "description", "JobTitle", "job_title"]
+
+# Seconds a job count is reused for the same filters
+COUNT_CACHE_SECONDS = 30
+
+# Distinct filter signatures whose counts are kept, least recently used dropped first
+COUNT_CACHE_SIZE = 256
+
+_count_cache: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+
+# Jobs enriched and upserted together during an insert
+INSERT_CHUNK_SIZE = 1000
+
+# Chunk bulk writes in flight at once while later chunks are prepared
+INSERT_CONCURRENCY = 4
+
+# Fields of a posting changed when its near-duplicate cluster is assigned again
+CLUSTER_FIELDS = ["minhash", "dup_cluster_id", "dup_canonical", "content_hash", "term_stats_socs", "term_stats_terms"]
+
+NO_CLUSTER_CHANGES = {"duplicates": 0, "claimed": [], "released": [], "representatives": []}
+
+# Fields a posting's write is conditional on: the aggregate changes are worked
+# out against the stored version, whose content and cluster role these pin
+WRITE_GUARD_FIELDS = ["document_hash", "dup_canonical"]
+
+# Server error code for a unique index violation
+DUPLICATE_KEY = 11000
+
+CONCURRENT_WRITE_ERROR = "Posting was changed by another ingest while this one was processed; submit it again"
+
+# Per-job errors listed in an insert response
+MAX_REPORTED_ERRORS = 1000
+
+# Validates a list of jobs in one call; a job failing validation is returned as given
+_JOB_LIST_ADAPTER = TypeAdapter(List[Annotated[Union[Job, Any], Field(union_mode="left_to_right")]])
+
+_JOB_DUMP_ADAPTER = TypeAdapter(List[Job])
+
 
 async def connect_to_mongo():
     """Create database connection"""
-    global client
-    client = AsyncIOMotorClient(settings.database_url)
+    global client, _index_task
+    settings = get_settings()
+    # Per-query-shape latency, documents and bytes (see app/db/monitoring.py)
+    event_listeners = [get_command_monitor()] if settings.mongo_command_monitoring else []
+    client = AsyncIOMotorClient(settings.database_url, event_listeners=event_listeners)
+    
+    # Create the index set the queries rely on (see app/db/indexes.py) in the
+    # background: an unreachable server would otherwise hold up start-up for
+    # the whole server selection timeout
+    _index_task = asyncio.create_task(_ensure_indexes_in_background())
+
+
+async def _ensure_indexes_in_background():
+    try:
+        created = await ensure_indexes(get_database())
+        if created["created"]:
+            print(f"Created indexes: {', '.join(created['created'])}")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Error ensuring indexes: {e}")
 
 
 async def close_mongo_connection():
     """Close database connection"""
     global client
+    if _index_task and not _index_task.done():
+        _index_task.cancel()
     if client:
         client.close()
 
@@ -30,89 +121,519 @@ def get_jobs_collection():
     return get_database().jobs
 
 
-async def insert_jobs_from_job_set(job_set: List[Dict[str, Any]]) -> JobInsertResponse:
+def validate_jobs(job_set: List[Any], offset: int = 0) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
     """
-    Insert jobs from job_set into MongoDB, overwriting duplicates based on JvId.
+    Validate a list of raw jobs against the Job model in one TypeAdapter call.
+    
+    The adapter passes invalid jobs through unchanged instead of failing the
+    whole list, so only those are validated again, one by one, for their errors.
     
     Args:
-        job_set: List of job dictionaries from the CareerOneStop API
+        job_set: Raw job dictionaries
+        offset: Index of the first job in the full submitted list, for reporting
         
     Returns:
-        JobInsertResponse with operation statistics
+        Tuple of ((index, job document) for each valid job, error dict per invalid job)
     """
-    if not job_set:
-        return JobInsertResponse(
-            success=True,
-            inserted_count=0,
-            updated_count=0,
-            total_processed=0,
-            message="No jobs to process"
+    models = []
+    errors = []
+    for index, item in enumerate(_JOB_LIST_ADAPTER.validate_python(job_set), offset):
+        if isinstance(item, Job):
+            models.append((index, item))
+            continue
+        try:
+            Job.model_validate(item)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+                for error in e.errors()
+            )
+            errors.append({"index": index, "jv_id": _raw_jv_id(item), "error": message})
+    documents = _JOB_DUMP_ADAPTER.dump_python([model for _, model in models], by_alias=True)
+    return list(zip((index for index, _ in models), documents)), errors
+
+
+def _raw_jv_id(job_data: Any) -> Optional[str]:
+    value = job_data.get("JvId", job_data.get("jv_id")) if isinstance(job_data, dict) else None
+    return str(value) if value is not None else None
+
+
+def document_hash(job_dict: Dict[str, Any]) -> str:
+    """Hash of a validated job as submitted (plus the cleaner version), to detect unchanged re-ingests."""
+    payload = json.dumps(job_dict, sort_keys=True, default=str)
+    return hashlib.md5(f"{CLEANER_VERSION}|{payload}".encode()).hexdigest()
+
+
+async def _split_unchanged(collection, jobs: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Tuple[int, Dict[str, Any]]], int, Dict[str, Dict[str, Any]]]:
+    """
+    Set document_hash on each job and drop those stored with the same hash.
+    
+    Returns:
+        Tuple of (changed jobs, number unchanged, JvId -> stored version of
+        each changed job, with its WRITE_GUARD_FIELDS and SOC fields)
+    """
+    for _, job_dict in jobs:
+        job_dict["document_hash"] = document_hash(job_dict)
+    
+    stored = {}
+    jv_ids = [job_dict["JvId"] for _, job_dict in jobs]
+    projection = {"JvId": 1, "_id": 0, **{field: 1 for field in WRITE_GUARD_FIELDS + SOC_FIELDS}}
+    for start in range(0, len(jv_ids), INSERT_CHUNK_SIZE):
+        async for doc in collection.find({"JvId": {"$in": jv_ids[start:start + INSERT_CHUNK_SIZE]}}, projection):
+            stored[doc["JvId"]] = doc
+    
+    changed = [(index, job_dict) for index, job_dict in jobs if stored.get(job_dict["JvId"], {}).get("document_hash") != job_dict["document_hash"]]
+    previous = {job_dict["JvId"]: stored[job_dict["JvId"]] for _, job_dict in changed if job_dict["JvId"] in stored}
+    return changed, len(jobs) - len(changed), previous
+
+
+def _annotate_chunk(job_dicts: List[Dict[str, Any]]):
+    for job_dict in job_dicts:
+        # Clean and segment once here so analysis never re-parses the HTML
+        annotate_clean_text(job_dict)
+        
+        # Every SOC code of the posting in one field, so lookups are a single equality
+        job_dict["soc_all"] = job_soc_codes(job_dict)
+
+
+async def _enrich_chunk(db, job_dicts: List[Dict[str, Any]], signature_cache: Dict[str, List[int]],
+                        bucket_cache: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Add the fields derived at ingestion and work out the chunk's changes to
+    the shared aggregates, to be applied by _apply_chunk after the write.
+    
+    The CPU work (cleaning here, signatures and term extraction in the
+    services) runs in the default executor; only the database lookups are
+    awaited on the event loop, so requests are served while a chunk is enriched.
+    """
+    await asyncio.get_running_loop().run_in_executor(None, _annotate_chunk, job_dicts)
+    
+    changes = {"dedup": dict(NO_CLUSTER_CHANGES), "term_stats": [], "catalog": []}
+    
+    # Tag near-duplicates (same posting under different JvIds) via the persisted LSH index
+    try:
+        changes["dedup"] = await assign_duplicate_clusters(db, job_dicts, signature_cache, bucket_cache)
+        if changes["dedup"]["duplicates"]:
+            print(f"Tagged {changes['dedup']['duplicates']} jobs as near-duplicates of existing postings")
+    except Exception as e:
+        print(f"Error assigning duplicate clusters: {e}")
+    
+    # Work out how new or changed postings change the per-SOC term statistics
+    try:
+        changes["term_stats"] = await prepare_term_stats(db, job_dicts)
+    except Exception as e:
+        print(f"Error updating term statistics: {e}")
+    
+    # Per-SOC counts, locations and dates, so SOC listings need no aggregation
+    try:
+        changes["catalog"] = await prepare_soc_catalog(db, job_dicts)
+    except Exception as e:
+        print(f"Error updating SOC catalog: {e}")
+    
+    return changes
+
+
+async def _apply_chunk(db, changes: Dict[str, Any], written: Set[str]):
+    """
+    Apply the aggregate changes from _enrich_chunk for the postings that were
+    stored; a failed write leaves the aggregates as they were, so retrying
+    the posting never counts it twice.
+    """
+    try:
+        await store_lsh_buckets(
+            db,
+            [bucket for bucket in changes["dedup"]["claimed"] if bucket["jv_id"] in written],
+            [bucket for bucket in changes["dedup"]["released"] if bucket["jv_id"] in written]
         )
+    except Exception as e:
+        print(f"Error storing duplicate clusters: {e}")
     
-    collection = get_jobs_collection()
+    # Fold new or changed postings into the per-SOC term statistics
+    try:
+        term_changes = [change for change in changes["term_stats"] if change["jv_id"] in written]
+        await apply_term_stats(db, term_changes)
+        if term_changes:
+            print(f"Updated term statistics from {len(term_changes)} new or changed jobs")
+    except Exception as e:
+        print(f"Error updating term statistics: {e}")
+    
+    # Per-SOC counts, locations and dates, so SOC listings need no aggregation
+    try:
+        await apply_soc_catalog(db, [change for change in changes["catalog"] if change["jv_id"] in written])
+    except Exception as e:
+        print(f"Error updating SOC catalog: {e}")
+
+
+async def _write_chunk(collection, chunk: List[Tuple[int, Dict[str, Any]]], previous: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Upsert one chunk by JvId, unordered, collecting per-document write errors.
+    
+    Each write only applies to the version of the posting the chunk was
+    compared against (previous, or no posting at all): a posting another
+    ingest stored in the meantime fails the filter, and the upsert then
+    fails on the unique JvId index, so its aggregate changes are not applied
+    on top of the other ingest's.
+    """
+    operations = [
+        UpdateOne(
+            {"JvId": job_dict["JvId"], **{field: previous.get(job_dict["JvId"], {}).get(field) for field in WRITE_GUARD_FIELDS}},
+            {"$set": job_dict},
+            upsert=True
+        )
+        for _, job_dict in chunk
+    ]
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        return {"inserted": result.upserted_count, "updated": result.modified_count, "errors": []}
+    except BulkWriteError as e:
+        details = e.details
+        errors = [
+            {
+                "index": chunk[error["index"]][0],
+                "jv_id": chunk[error["index"]][1]["JvId"],
+                "error": CONCURRENT_WRITE_ERROR if error.get("code") == DUPLICATE_KEY else error.get("errmsg", "write failed")
+            }
+            for error in details.get("writeErrors", [])
+        ]
+        return {"inserted": details.get("nUpserted", 0), "updated": details.get("nModified", 0), "errors": errors}
+    except Exception as e:
+        print(f"Error during bulk write operation: {e}")
+        return {
+            "inserted": 0,
+            "updated": 0,
+            "errors": [{"index": index, "jv_id": job_dict["JvId"], "error": f"Database operation failed: {e}"} for index, job_dict in chunk]
+        }
+
+
+class JobIngest:
+    """
+    The chunked insert pipeline, fed one chunk of raw jobs at a time.
+    
+    Each chunk is validated, stripped of jobs stored unchanged, enriched and
+    written; up to INSERT_CONCURRENCY chunk writes stay in flight while the
+    next chunks are prepared, so memory is bounded by the chunk size rather
+    than the number of jobs ingested. Used by insert_jobs_from_job_set for a
+    parsed batch and by the NDJSON stream ingest for uploads of any size.
+    """
+    
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_database()
+        self.collection = self.db.jobs
+        self.received = 0
+        self.valid = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.inserted = 0
+        self.updated = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.write_errors: List[Dict[str, Any]] = []
+        # SOC codes of the postings written, before and after the write, published once the ingest finishes
+        self.changed_soc_codes = set()
+        # Representatives and band keys of chunks still being written, for near-duplicate matching
+        self._signature_cache: Dict[str, List[int]] = {}
+        self._bucket_cache: Dict[str, Dict[str, str]] = {}
+        # Pending write of each JvId, so a later copy is never overtaken by an earlier one
+        self._writing: Dict[str, asyncio.Task] = {}
+        self._in_flight = set()
+    
+    async def add_chunk(self, jobs: List[Any], offset: int, keep: Optional[Dict[str, int]] = None):
+        """
+        Run one chunk of raw jobs through the pipeline.
+        
+        Args:
+            jobs: Raw job dictionaries, at most INSERT_CHUNK_SIZE
+            offset: Index of the first job among all jobs ingested, for reporting
+            keep: Index of the copy to store for each JvId, when the whole batch
+                is known up front (defaults to the last copy within the chunk)
+        """
+        self.received += len(jobs)
+        valid_jobs, errors = validate_jobs(jobs, offset=offset)
+        self.errors.extend(errors)
+        if keep is None:
+            keep = {job_dict["JvId"]: index for index, job_dict in valid_jobs}
+        valid_jobs = [(index, job_dict) for index, job_dict in valid_jobs if keep.get(job_dict["JvId"]) == index]
+        self.valid += len(valid_jobs)
+        
+        # Later copies of a JvId still being written are compared and folded in
+        # against the stored earlier copy, and must not overtake its write
+        earlier = {self._writing[job_dict["JvId"]] for _, job_dict in valid_jobs if job_dict["JvId"] in self._writing}
+        if earlier:
+            await self._wait(earlier)
+        
+        changed_jobs, unchanged_count, previous = await _split_unchanged(self.collection, valid_jobs)
+        self.unchanged += unchanged_count
+        if not changed_jobs:
+            return
+        self.changed += len(changed_jobs)
+        
+        changes = await _enrich_chunk(self.db, [job_dict for _, job_dict in changed_jobs], self._signature_cache, self._bucket_cache)
+        if len(self._in_flight) >= INSERT_CONCURRENCY:
+            await self._wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+        
+        task = asyncio.create_task(self._write(changed_jobs, changes, previous))
+        self._in_flight.add(task)
+        for _, job_dict in changed_jobs:
+            self._writing[job_dict["JvId"]] = task
+    
+    async def _write(self, chunk: List[Tuple[int, Dict[str, Any]]], changes: Dict[str, Any],
+                     previous: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        result = await _write_chunk(self.collection, chunk, previous)
+        failed = {error["jv_id"] for error in result["errors"]}
+        written = {job_dict["JvId"] for _, job_dict in chunk} - failed
+        await _apply_chunk(self.db, changes, written)
+        for _, job_dict in chunk:
+            if job_dict["JvId"] in written:
+                # A posting moved to other SOC codes also changes the ones it left
+                self.changed_soc_codes.update(job_dict["soc_all"])
+                self.changed_soc_codes.update(job_soc_codes(previous.get(job_dict["JvId"], {})))
+        self._release_caches(changes, [job_dict["JvId"] for _, job_dict in chunk])
+        for _, job_dict in chunk:
+            if self._writing.get(job_dict["JvId"]) is asyncio.current_task():
+                del self._writing[job_dict["JvId"]]
+        
+        representatives = [jv_id for jv_id in changes["dedup"]["representatives"] if jv_id in written]
+        if representatives:
+            try:
+                await self._reassign_members(representatives)
+            except Exception as e:
+                print(f"Error reassigning near-duplicates: {e}")
+        return result
     
-    # Prepare bulk operations for upsert (insert or update)
-    operations = []
+    def _release_caches(self, changes: Dict[str, Any], jv_ids: List[str]):
+        """Forget the signatures and band keys of written (or failed) postings; the database has them now."""
+        for bucket in changes["dedup"]["claimed"]:
+            if self._bucket_cache.get(bucket["_id"]) is bucket:
+                del self._bucket_cache[bucket["_id"]]
+        for jv_id in jv_ids:
+            self._signature_cache.pop(jv_id, None)
     
-    for job_data in job_set:
+    async def _reassign_members(self, representatives: List[str]):
+        """
+        Assign the members of clusters whose representative changed again.
+        
+        A representative whose text changed no longer stands for its members:
+        each is matched against the index again from its stored text, and may
+        join another cluster or found its own (and so start counting in the
+        term statistics).
+        """
+        cursor = self.collection.find(
+            {"dup_cluster_id": {"$in": representatives}, "JvId": {"$nin": representatives}},
+            {"_id": 0}
+        ).batch_size(INSERT_CHUNK_SIZE)
+        members = []
+        async for member in cursor:
+            members.append(member)
+            if len(members) >= INSERT_CHUNK_SIZE:
+                await self._reassign_batch(members)
+                members = []
+        if members:
+            await self._reassign_batch(members)
+    
+    async def _reassign_batch(self, members: List[Dict[str, Any]]):
+        changes = {"dedup": dict(NO_CLUSTER_CHANGES), "term_stats": [], "catalog": []}
         try:
-            # Validate and parse job data using Pydantic model
-            job = Job(**job_data)
-            
-            # Convert to dict for MongoDB insertion
-            job_dict = job.model_dump(by_alias=True)
-            
-            # Create upsert operation using JvId as the unique identifier
-            operation = UpdateOne(
-                {"JvId": job_dict["JvId"]},  # Filter by JvId
-                {"$set": job_dict},         # Update/insert the document
-                upsert=True                 # Create if doesn't exist
-            )
-            operations.append(operation)
-            
+            changes["dedup"] = await assign_duplicate_clusters(self.db, members, self._signature_cache, self._bucket_cache)
+            changes["term_stats"] = await prepare_term_stats(self.db, members)
+        except Exception:
+            self._release_caches(changes, [member["JvId"] for member in members])
+            raise
+        operations = [
+            UpdateOne({"JvId": member["JvId"]}, {"$set": {field: member[field] for field in CLUSTER_FIELDS if field in member}})
+            for member in members
+        ]
+        written = {member["JvId"] for member in members}
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            written -= {members[error["index"]]["JvId"] for error in e.details.get("writeErrors", [])}
         except Exception as e:
-            print(f"Error processing job data: {job_data}. Error: {e}")
-            continue
+            print(f"Error reassigning near-duplicates: {e}")
+            written = set()
+        await _apply_chunk(self.db, changes, written)
+        self._release_caches(changes, [member["JvId"] for member in members])
+        for member in members:
+            if member["JvId"] in written:
+                self.changed_soc_codes.update(member.get("soc_all") or job_soc_codes(member))
+        print(f"Reassigned {len(written)} near-duplicates of changed postings")
     
-    if not operations:
-        return JobInsertResponse(
-            success=False,
-            inserted_count=0,
-            updated_count=0,
-            total_processed=0,
-            message="No valid jobs to process"
-        )
+    async def _wait(self, tasks, return_when=asyncio.ALL_COMPLETED):
+        done, _ = await asyncio.wait(tasks, return_when=return_when)
+        self._in_flight -= done
+        for task in done:
+            result = task.result()
+            self.inserted += result["inserted"]
+            self.updated += result["updated"]
+            self.write_errors.extend(result["errors"])
     
-    try:
-        # Execute bulk operations
-        result = await collection.bulk_write(operations)
+    def progress(self) -> Dict[str, int]:
+        """Running totals, counting only the chunk writes that have completed."""
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": len(self.errors) + len(self.write_errors),
+        }
+    
+    async def finish(self) -> JobInsertResponse:
+        """
+        Wait for the remaining writes and summarize the ingest.
+        
+        Returns:
+            JobInsertResponse with operation statistics and per-job errors
+        """
+        if self._in_flight:
+            await self._wait(self._in_flight)
+        
+        if self.errors:
+            first = self.errors[0]
+            print(f"Rejected {len(self.errors)} of {self.received} jobs failing validation (first: index {first['index']}: {first['error']})")
+        errors = sorted(self.errors + self.write_errors, key=lambda error: error["index"])
+        
+        if not self.valid:
+            return JobInsertResponse(
+                success=False,
+                inserted_count=0,
+                updated_count=0,
+                total_processed=0,
+                message="No valid jobs to process",
+                failed_count=len(errors),
+                errors=[JobInsertError(**error) for error in errors[:MAX_REPORTED_ERRORS]]
+            )
+        
+        # Cached counts may no longer match the collection
+        _count_cache.clear()
+        
+        if self.write_errors:
+            first = self.write_errors[0]
+            print(f"Failed to write {len(self.write_errors)} jobs (first: {first['jv_id']}: {first['error']})")
+        
+        written = self.changed - len(self.write_errors)
+        if written:
+            # Cached reports for these SOC codes no longer match the postings
+            await publish_soc_changes(self.changed_soc_codes, "insert", written)
         
         return JobInsertResponse(
-            success=True,
-            inserted_count=result.upserted_count,
-            updated_count=result.modified_count,
-            total_processed=len(operations),
-            message=f"Successfully processed {len(operations)} jobs: {result.upserted_count} inserted, {result.modified_count} updated"
+            success=written > 0 or not self.changed,
+            inserted_count=self.inserted,
+            updated_count=self.updated,
+            total_processed=written + self.unchanged,
+            message=(
+                f"Successfully processed {written + self.unchanged} jobs: {self.inserted} inserted, {self.updated} updated, "
+                f"{self.unchanged} unchanged" + (f", {len(errors)} failed" if errors else "")
+            ),
+            unchanged_count=self.unchanged,
+            failed_count=len(errors),
+            errors=[JobInsertError(**error) for error in errors[:MAX_REPORTED_ERRORS]]
         )
+
+
+async def insert_jobs_from_job_set(job_set: List[Dict[str, Any]], db=None) -> JobInsertResponse:
+    """
+    Insert jobs from job_set into MongoDB, overwriting duplicates based on JvId.
+    
+    Runs the batch through JobIngest in chunks of INSERT_CHUNK_SIZE jobs:
+    
+    1. Validate the chunk with one TypeAdapter call, reporting invalid jobs
+    2. Skip jobs stored with the same content hash (and all but the last copy
+       of a JvId submitted more than once)
+    3. Clean the text, tag near-duplicates and work out the term statistics
+    4. Upsert the chunk with an unordered bulk_write, each write conditional
+       on the version compared in step 2 (a posting another ingest changed
+       meanwhile is reported as failed); up to INSERT_CONCURRENCY chunk
+       writes are in flight while the next chunks are prepared
+    5. Once a chunk is written, fold the postings that were stored into the
+       LSH index, term statistics and SOC catalog
+    
+    Args:
+        job_set: List of job dictionaries from the CareerOneStop API
+        db: Database to write to (defaults to the application database)
         
-    except Exception as e:
-        print(f"Error during bulk write operation: {e}")
+    Returns:
+        JobInsertResponse with operation statistics and per-job errors
+    """
+    if not job_set:
         return JobInsertResponse(
-            success=False,
+            success=True,
             inserted_count=0,
             updated_count=0,
             total_processed=0,
-            message=f"Database operation failed: {str(e)}"
+            message="No jobs to process"
         )
+    
+    # A JvId submitted more than once is stored as its last copy
+    last_index = {_raw_jv_id(job_data): index for index, job_data in enumerate(job_set)}
+    
+    ingest = JobIngest(db)
+    for start in range(0, len(job_set), INSERT_CHUNK_SIZE):
+        await ingest.add_chunk(job_set[start:start + INSERT_CHUNK_SIZE], offset=start, keep=last_index)
+    return await ingest.finish()
 
 
-async def get_jobs_by_criteria(limit: int = 100, skip: int = 0, **filters) -> List[Dict[str, Any]]:
+def build_projection(fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+    """
+    Turn a list of field names into a MongoDB projection.
+    
+    Names prefixed with "-" are excluded, all others included; the two cannot
+    be mixed (except for "-_id"). None or an empty list means whole documents.
+    
+    Raises:
+        ValueError: If included and excluded fields are mixed
+    """
+    if not fields:
+        return None
+    projection = {}
+    for field in fields:
+        field = field.strip()
+        if field:
+            projection[field.lstrip("-")] = 0 if field.startswith("-") else 1
+    if len({value for name, value in projection.items() if name != "_id"}) > 1:
+        raise ValueError("Cannot mix included and excluded fields in one projection")
+    return projection or None
+
+
+async def get_jobs_by_criteria(limit: int = 100, skip: int = 0, fields: Optional[List[str]] = None, **filters) -> List[Dict[str, Any]]:
     """
     Retrieve jobs from MongoDB with optional filtering.
     
     Args:
         limit: Maximum number of jobs to return
         skip: Number of jobs to skip (for pagination)
+        fields: Fields to return (or to leave out, prefixed with "-"); None returns whole documents
+        **filters: Additional filter criteria
+        
+    Returns:
+        List of job documents
+    """
+    collection = get_jobs_collection()
+    
+    try:
+        cursor = collection.find(filters, build_projection(fields)).skip(skip).limit(limit)
+        jobs = await cursor.to_list(length=limit)
+        
+        # Convert ObjectId to string for JSON serialization
+        for job in jobs:
+            if '_id' in job:
+                job['_id'] = str(job['_id'])
+                
+        return jobs
+        
+    except Exception as e:
+        print(f"Error retrieving jobs: {e}")
+        return []
+
+
+async def get_jobs_page(limit: int = 100, after: Optional[str] = None, fields: Optional[List[str]] = None, **filters) -> List[Dict[str, Any]]:
+    """
+    Retrieve one page of jobs in _id order, starting after a given _id (keyset pagination).
+    
+    Unlike skip, the cost of a page does not grow with how deep into the
+    results it is, and postings inserted meanwhile do not shift later pages.
+    
+    Args:
+        limit: Maximum number of jobs to return
+        after: _id of the last job of the previous page (None for the first page)
+        fields: Fields to return (or to leave out, prefixed with "-"); None returns whole documents
         **filters: Additional filter criteria
         
     Returns:
@@ -120,8 +641,12 @@ async def get_jobs_by_criteria(limit: int = 100, skip: int = 0, **filters) -> Li
     """
     collection = get_jobs_collection()
     
+    query = dict(filters)
+    if after:
+        query["_id"] = {"$gt": ObjectId(after)}
+    
     try:
-        cursor = collection.find(filters).skip(skip).limit(limit)
+        cursor = collection.find(query, build_projection(fields)).sort("_id", 1).limit(limit)
         jobs = await cursor.to_list(length=limit)
         
         # Convert ObjectId to string for JSON serialization
@@ -136,6 +661,86 @@ async def get_jobs_by_criteria(limit: int = 100, skip: int = 0, **filters) -> Li
         return []
 
 
+async def iter_jobs(limit: Optional[int] = None, batch_size: int = 500, fields: Optional[List[str]] = None, **filters) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate over every matching job in _id order without loading them all.
+    
+    Documents are fetched batch_size at a time by the cursor and yielded one by one.
+    
+    Args:
+        limit: Maximum number of jobs to yield (None for all)
+        batch_size: Documents fetched per round trip
+        fields: Fields to return (or to leave out, prefixed with "-"); None returns whole documents
+        **filters: Filter criteria
+    """
+    cursor = get_jobs_collection().find(filters, build_projection(fields)).sort("_id", 1).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    async for job in cursor:
+        if '_id' in job:
+            job['_id'] = str(job['_id'])
+        yield job
+
+
+def filter_signature(filters: Dict[str, Any]) -> str:
+    """Stable hash of a filter, identical for equal filters whatever their key order."""
+    return hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def encode_page_token(last_id: str, filters: Dict[str, Any]) -> str:
+    """Opaque token for the page after ``last_id``, bound to the filters it was issued for."""
+    payload = json.dumps({"after": last_id, "filters": filter_signature(filters)[:16]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_page_token(token: str, filters: Dict[str, Any]) -> str:
+    """
+    The _id a page token continues after.
+    
+    Raises:
+        ValueError: If the token is malformed or was issued for different filters
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        after = str(ObjectId(payload["after"]))
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid page token")
+    if payload.get("filters") != filter_signature(filters)[:16]:
+        raise ValueError("Page token was issued for different filters")
+    return after
+
+
+async def get_jobs_for_analysis(limit: int = 100, **filters) -> List[Dict[str, Any]]:
+    """
+    Retrieve only the fields the analyzer needs for the matching jobs.
+    
+    Postings cleaned at ingestion are returned without their raw description
+    and metadata; the raw text is fetched only for postings stored before (or
+    by an older) cleaner version, so they can be cleaned during analysis.
+    
+    Args:
+        limit: Maximum number of jobs to return
+        **filters: Filter criteria
+        
+    Returns:
+        List of partial job documents
+    """
+    jobs = await get_jobs_by_criteria(limit=limit, fields=ANALYSIS_FIELDS, **filters)
+    
+    stale = [job["JvId"] for job in jobs if job.get("cleaner_version") != CLEANER_VERSION and job.get("JvId")]
+    if stale:
+        raw_text = {}
+        try:
+            async for doc in get_jobs_collection().find({"JvId": {"$in": stale}}, build_projection(RAW_TEXT_FIELDS + ["-_id"])):
+                raw_text[doc["JvId"]] = doc
+        except Exception as e:
+            print(f"Error retrieving job descriptions: {e}")
+        for job in jobs:
+            job.update(raw_text.get(job.get("JvId"), {}))
+    
+    return jobs
+
+
 async def get_job_count(**filters) -> int:
     """
     Get the total count of jobs matching the given filters.
@@ -154,4 +759,41 @@ async def get_job_count(**filters) -> int:
         
     except Exception as e:
         print(f"Error counting jobs: {e}")
+        return 0
+
+
+async def get_cached_job_count(**filters) -> int:
+    """
+    Count of jobs matching the filters, reused for COUNT_CACHE_SECONDS.
+    
+    Counts are keyed by filter signature and dropped whenever jobs are inserted
+    through insert_jobs_from_job_set, so repeated paging through the same
+    listing runs the count query once.
+    
+    Args:
+        **filters: Filter criteria
+        
+    Returns:
+        Total count of matching jobs
+    """
+    key = filter_signature(filters)
+    cached = _count_cache.get(key)
+    if cached and time.monotonic() - cached[0] < COUNT_CACHE_SECONDS:
+        _count_cache.move_to_end(key)
+        return cached[1]
+    
+    count = await get_job_count(**filters)
+    _count_cache[key] = (time.monotonic(), count)
+    _count_cache.move_to_end(key)
+    while len(_count_cache) > COUNT_CACHE_SIZE:
+        _count_cache.popitem(last=False)
+    return count
+
+
+async def get_estimated_job_count() -> int:
+    """Approximate number of jobs in the collection from its metadata, without scanning it."""
+    try:
+        return await get_jobs_collection().estimated_document_count()
+    except Exception as e:
+        print(f"Error estimating job count: {e}")
         return 0
\ No newline at end of file
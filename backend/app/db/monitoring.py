@@ -0,0 +1,288 @@
+import bisect
+import json
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import bson
+from pymongo import monitoring
+
+from app.core.config import get_settings
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Distinct query shapes tracked; later new shapes are counted under OVERFLOW_SHAPE
+MAX_SHAPES = 500
+
+OVERFLOW_SHAPE = "other"
+
+# Commands that read or write application data; handshakes, pings, auth and
+# session bookkeeping are not recorded
+MONITORED_COMMANDS = {
+    "find", "getMore", "aggregate", "count", "distinct",
+    "insert", "update", "delete", "findAndModify", "createIndexes",
+}
+
+# Commands whose size is dominated by what is sent (the documents or updates)
+# rather than the reply
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify"}
+
+# Open cursors whose getMore batches are attributed to the query that opened them
+MAX_TRACKED_CURSORS = 10000
+
+# Array operators whose elements are separate sub-queries rather than values
+_LOGICAL_OPERATORS = {"$and", "$or", "$nor"}
+
+
+def _normalize(value: Any, key: Optional[str] = None) -> Any:
+    """Replace every value in a filter with "?", keeping field names and operators."""
+    if isinstance(value, dict):
+        return {k: _normalize(v, k) for k, v in sorted(value.items())}
+    if isinstance(value, list) and key in _LOGICAL_OPERATORS:
+        return [_normalize(v) for v in value]
+    return "?"
+
+
+def _shape_json(value: Any) -> str:
+    return json.dumps(_normalize(value), separators=(",", ":"))
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> str:
+    """
+    Normalized shape of a command: its name, collection and filter structure.
+
+    Values are replaced by "?", so every SOC lookup has one shape however many
+    SOC codes are looked up, while a query with different fields or operators
+    (the $or SOC filter, a regex /list filter, count_documents' $match plus
+    $group) gets its own.
+
+    Args:
+        command_name: Command name from the monitoring event
+        command: Command document from the monitoring event
+
+    Returns:
+        Shape string, e.g. 'find jobs {"soc_all":"?"} sort ["_id"]'
+    """
+    collection = command.get(command_name)
+    shape = f"{command_name} {collection}"
+
+    if command_name in ("find", "count", "distinct", "findAndModify"):
+        shape += f" {_shape_json(command.get('filter', command.get('query', {})))}"
+        if command_name == "distinct":
+            shape += f" key {command.get('key')}"
+        if command.get("sort"):
+            shape += f" sort {json.dumps(list(command['sort']))}"
+    elif command_name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            name = next(iter(stage), "?")
+            stages.append(f"{name} {_shape_json(stage[name])}" if name == "$match" else name)
+        shape += f" [{', '.join(stages)}]"
+    elif command_name in ("update", "delete"):
+        operations = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        shape += f" {_shape_json(operations[0].get('q', {}))}"
+        if operations[0].get("upsert"):
+            shape += " upsert"
+    return shape
+
+
+def documents_in_reply(command_name: str, reply: Dict[str, Any]) -> int:
+    """Documents a command returned (reads) or affected (writes)."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    if command_name == "count":
+        return 1
+    return int(reply.get("n", 0) or 0)
+
+
+class ShapeStats:
+    """Latency histogram and totals for one query shape."""
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.documents = 0
+        self.bytes = 0
+        # One count per LATENCY_BUCKETS bound, plus +Inf
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, seconds: float, documents: int, size: int, failed: bool):
+        self.count += 1
+        self.failures += failed
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.documents += documents
+        self.bytes += size
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile by interpolating within its histogram bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max_seconds
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max_seconds)
+            seen += bucket_count
+        return self.max_seconds
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_ms": round(self.total_seconds * 1000 / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "histogram": {
+                **{str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                "+Inf": self.buckets[-1],
+            },
+        }
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    pymongo command listener recording per-shape latency, documents and bytes.
+
+    Registered on the client in connect_to_mongo. pymongo calls it from
+    whichever thread runs the command, so the statistics are guarded by a
+    lock. getMore batches are counted under the shape of the query that
+    opened the cursor. With record_bytes, bytes are the encoded reply for
+    reads and the encoded command (documents or updates sent) for writes;
+    encoding every reply again costs about as much as decoding it did, so it
+    is off unless asked for (MONGO_COMMAND_BYTES=true) and bytes stay 0.
+    """
+
+    def __init__(self, record_bytes: bool = False):
+        self.record_bytes = record_bytes
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ShapeStats] = {}
+        # (connection, request id) -> (shape, command bytes, getMore cursor id) of commands in progress
+        self._pending: Dict[Tuple[Any, int], Tuple[str, int, Optional[int]]] = {}
+        # Open cursor id -> shape of the query that opened it
+        self._cursors: Dict[int, str] = {}
+
+    def started(self, event):
+        if event.command_name not in MONITORED_COMMANDS:
+            return
+        cursor_id = event.command.get("getMore") if event.command_name == "getMore" else None
+        if cursor_id is not None:
+            shape = self._cursors.get(cursor_id, "getMore")
+        else:
+            shape = query_shape(event.command_name, event.command)
+        size = len(bson.encode(event.command)) if self.record_bytes and event.command_name in WRITE_COMMANDS else 0
+        self._pending[(event.connection_id, event.request_id)] = (shape, size, cursor_id)
+
+    def succeeded(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        shape, size, getmore_cursor_id = pending
+        reply = event.reply
+        if self.record_bytes and event.command_name not in WRITE_COMMANDS:
+            size = len(bson.encode(reply))
+
+        cursor = reply.get("cursor")
+        if isinstance(cursor, dict):
+            cursor_id = cursor.get("id")
+            with self._lock:
+                if cursor_id:
+                    if len(self._cursors) >= MAX_TRACKED_CURSORS:
+                        self._cursors.pop(next(iter(self._cursors)))
+                    self._cursors[cursor_id] = shape
+                elif getmore_cursor_id is not None:
+                    # Cursor exhausted
+                    self._cursors.pop(getmore_cursor_id, None)
+
+        self._record(shape, event.duration_micros / 1e6, documents_in_reply(event.command_name, reply), size, False)
+
+    def failed(self, event):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is not None:
+            self._record(pending[0], event.duration_micros / 1e6, 0, pending[1], True)
+
+    def _record(self, shape: str, seconds: float, documents: int, size: int, failed: bool):
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                if len(self._stats) >= MAX_SHAPES:
+                    shape = OVERFLOW_SHAPE
+                stats = self._stats.setdefault(shape, ShapeStats())
+            stats.record(seconds, documents, size, failed)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Summary of every shape recorded so far."""
+        with self._lock:
+            return {shape: stats.summary() for shape, stats in self._stats.items()}
+
+    def top_shapes(self, limit: int = 20, sort: str = "total_ms") -> List[Dict[str, Any]]:
+        """
+        The slowest query shapes.
+
+        Args:
+            limit: Number of shapes to return
+            sort: Summary field to rank by (total_ms, mean_ms, p95_ms, p99_ms, max_ms, count, bytes)
+
+        Returns:
+            Shape summaries with their "shape", slowest first
+        """
+        shapes = [{"shape": shape, **summary} for shape, summary in self.snapshot().items()]
+        shapes.sort(key=lambda summary: summary.get(sort, 0), reverse=True)
+        return shapes[:limit]
+
+    def reset(self):
+        """Forget every recorded command."""
+        with self._lock:
+            self._stats.clear()
+            self._cursors.clear()
+
+    def prometheus(self) -> str:
+        """Every shape's histogram and totals in the Prometheus text exposition format."""
+        lines = [
+            "# HELP mongodb_command_duration_seconds MongoDB command latency by query shape",
+            "# TYPE mongodb_command_duration_seconds histogram",
+        ]
+        with self._lock:
+            stats = list(self._stats.items())
+            for shape, shape_stats in stats:
+                label = _label(shape)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], shape_stats.buckets):
+                    cumulative += count
+                    lines.append(f'mongodb_command_duration_seconds_bucket{{shape="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'mongodb_command_duration_seconds_sum{{shape="{label}"}} {shape_stats.total_seconds}')
+                lines.append(f'mongodb_command_duration_seconds_count{{shape="{label}"}} {shape_stats.count}')
+            for name, help_text, attribute in (
+                ("mongodb_command_failures_total", "Failed MongoDB commands by query shape", "failures"),
+                ("mongodb_command_documents_total", "Documents returned or written by query shape", "documents"),
+                ("mongodb_command_bytes_total", "Reply bytes (reads) or command bytes (writes) by query shape", "bytes"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f'{name}{{shape="{_label(shape)}"}} {getattr(shape_stats, attribute)}' for shape, shape_stats in stats)
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@lru_cache(maxsize=None)
+def get_command_monitor() -> CommandMonitor:
+    """The process-wide command monitor registered on the MongoDB client."""
+    return CommandMonitor(record_bytes=get_settings().mongo_command_bytes)
@@ -1,7 +1,13 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from fastapi.responses import PlainTextResponse
+from app.core.config import get_settings
+from app.db.monitoring import get_command_monitor
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
 from app.api.v1.api import api_router
+from app.services import event_service
+from app.services.cache_service import invalidate_changed_socs
 
 app = FastAPI()
 
@@ -16,22 +22,40 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api/v1")
 
+# Cached analyses of a SOC are dropped as soon as its postings change
+event_service.subscribe(invalidate_changed_socs)
+
+_change_watcher: asyncio.Task = None
+
 
 @app.on_event("startup")
 async def startup_event():
+    global _change_watcher
     try:
         await connect_to_mongo()
         print("Successfully connected to MongoDB")
     except Exception as e:
         print(f"Failed to connect to MongoDB: {e}")
+        return
+    
+    if get_settings().watch_job_changes:
+        _change_watcher = asyncio.create_task(event_service.watch_job_changes(get_database()))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if _change_watcher:
+        _change_watcher.cancel()
     await close_mongo_connection()
     print("Disconnected from MongoDB")
 
 
 @app.get("/api/v1/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """MongoDB command histograms per query shape, in the Prometheus text format."""
+    return PlainTextResponse(get_command_monitor().prometheus(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -31,10 +31,13 @@ class JobInsightsReport(BaseModel):
     searched_title: str = Field(..., description="The job title that was searched for.")
     soc_code: str = Field(..., description="The SOC code corresponding to the searched title.")
     total_postings_analyzed: int = Field(..., description="The total number of job postings analyzed.")
+    postings_represented: Optional[int] = Field(None, description="Number of postings whose text was included in the analysis after de-duplication and budgeting.")
+    postings_dropped: Optional[int] = Field(None, description="Number of postings left out as near-duplicates or for exceeding the token budget.")
     responsibilities: List[AnalyzedTerm] = Field(default_factory=list)
     skills: List[AnalyzedTerm] = Field(default_factory=list)
     qualifications: List[AnalyzedTerm] = Field(default_factory=list)
     unique_aspects: List[AnalyzedTerm] = Field(default_factory=list)
+    distinctive_terms: List[AnalyzedTerm] = Field(default_factory=list, description="Terms far more common in this occupation's postings than in other occupations', strongest first.")
 
 class JobAnalysisResponse(BaseModel):
     """
@@ -44,6 +47,27 @@ class JobAnalysisResponse(BaseModel):
     suggestions: Optional[List[JobSuggestion]] = None
     data: Optional[JobInsightsReport] = None
 
+class SimilarOccupation(BaseModel):
+    """
+    An occupation whose postings describe similar work.
+    """
+    soc_code: str = Field(..., description="The SOC code of the similar occupation.")
+    title: Optional[str] = Field(None, description="The occupation title, if it is a supported job.")
+    score: float = Field(..., description="Cosine similarity of the two occupations' term vectors (0 to 1).")
+    shared_terms: List[str] = Field(default_factory=list, description="Terms contributing most to the similarity.")
+
+class SimilarOccupationsResponse(BaseModel):
+    """
+    The response model for the similar occupations endpoint.
+    """
+    success: bool = True
+    soc_code: str
+    title: Optional[str] = None
+    similar: List[SimilarOccupation] = Field(default_factory=list)
+    # The vector build answering the request; rebuilt only by build_similarity_index.py
+    build_id: Optional[str] = None
+    built_at: Optional[datetime] = None
+
 class DataSource(BaseModel):
     """
     Represents a data source in job metadata.
@@ -95,6 +119,14 @@ class Job(BaseModel):
     class Config:
         populate_by_name = True
 
+class JobInsertError(BaseModel):
+    """
+    A job that could not be validated or written.
+    """
+    index: int = Field(..., description="Position of the job in the submitted list.")
+    jv_id: Optional[str] = Field(None, description="The job's JvId, if it has one.")
+    error: str = Field(..., description="Why the job was rejected.")
+
 class JobInsertResponse(BaseModel):
     """
     Response model for job insertion operations.
@@ -103,4 +135,7 @@ class JobInsertResponse(BaseModel):
     inserted_count: int = Field(..., description="Number of jobs inserted")
     updated_count: int = Field(..., description="Number of jobs updated")
     total_processed: int = Field(..., description="Total number of jobs processed")
-    message: str = Field(..., description="Operation result message")
\ No newline at end of file
+    message: str = Field(..., description="Operation result message")
+    unchanged_count: int = Field(0, description="Number of jobs skipped because they are stored unchanged")
+    failed_count: int = Field(0, description="Number of jobs rejected by validation or by the database")
+    errors: List[JobInsertError] = Field(default_factory=list, description="Rejected jobs, truncated for very large batches")
\ No newline at end of file
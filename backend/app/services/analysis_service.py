@@ -1,12 +1,119 @@
 import json
+import multiprocessing
 import re
-import html
 import os
-from typing import List, Dict, Any, Set, Tuple
-from collections import defaultdict, Counter
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from app.models.pydantic_models import JobInsightsReport, AnalyzedTerm
-from app.core.config import settings
-import anthropic
+from app.core.config import get_settings
+from app.services.categorization_service import get_categorizer
+from app.services.dedup_service import select_representative_postings
+from app.services.extraction_service import get_activity_extractor
+from app.services.normalization_service import NORMALIZATION_DICT, get_phrase_normalizer
+from app.services.text_service import clean_html_and_artifacts, split_sentences, get_posting_text_and_sentences
+
+# Postings below this count are extracted serially; handing them to the pool would dominate
+PARALLEL_MIN_POSTINGS = 200
+
+# Number of context sentences kept per extracted activity
+CONTEXT_SAMPLE_SIZE = 3
+
+
+def extract_activities_rule_based(text: str) -> List[Tuple[str, str]]:
+    """Enhanced rule-based activity extraction for fallback mode."""
+    if not text:
+        return []
+    
+    return extract_activities_from_sentences(split_sentences(clean_html_and_artifacts(text)))
+
+
+def extract_activities_from_sentences(sentences: List[str]) -> List[Tuple[str, str]]:
+    """Rule-based activity extraction over already cleaned and split sentences."""
+    return get_activity_extractor().extract(sentences)
+
+
+def aggregate_activities(posting_sentences: List[List[str]]) -> Tuple[List[Counter], Dict[str, List[str]]]:
+    """
+    Extract and normalize activities from a sequence of postings, each given as its sentences.
+    
+    Returns a Counter of normalized activity mentions per posting and, per
+    activity, the first few distinct context sentences in the order they were
+    encountered.
+    """
+    normalizer = get_phrase_normalizer()
+    posting_terms = []
+    sentences = {}
+    
+    for posting in posting_sentences:
+        counts = Counter()
+        for activity, sentence in extract_activities_from_sentences(posting):
+            normalized = normalizer.normalize(activity)
+            counts[normalized] += 1
+            samples = sentences.setdefault(normalized, [])
+            if len(samples) < CONTEXT_SAMPLE_SIZE and sentence not in samples:
+                samples.append(sentence)
+        posting_terms.append(counts)
+    
+    return posting_terms, sentences
+
+
+def merge_activity_aggregates(partials: List[Tuple[List[Counter], Dict[str, List[str]]]]) -> Tuple[List[Counter], Dict[str, List[str]]]:
+    """Merge per-chunk aggregates in chunk order, reproducing the serial result exactly."""
+    posting_terms = []
+    sentences = {}
+    
+    for partial_terms, partial_sentences in partials:
+        posting_terms.extend(partial_terms)
+        for activity, samples in partial_sentences.items():
+            merged = sentences.setdefault(activity, [])
+            for sentence in samples:
+                if len(merged) >= CONTEXT_SAMPLE_SIZE:
+                    break
+                if sentence not in merged:
+                    merged.append(sentence)
+    
+    return posting_terms, sentences
+
+
+@lru_cache(maxsize=None)
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The process pool for aggregate_activities_parallel, started once per worker count.
+    
+    Workers are spawned rather than forked, so the pool can be started from a
+    process that already runs threads (the MongoDB driver's, for one).
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def aggregate_activities_parallel(posting_sentences: List[List[str]], max_workers: int = 0) -> Tuple[List[Counter], Dict[str, List[str]]]:
+    """
+    Run aggregate_activities across a process pool, one chunk of postings per task.
+    
+    Small inputs, or a single worker, take the serial path since handing the
+    work to the pool would dominate the regex work. The API analyzes at most
+    100 postings per SOC, below PARALLEL_MIN_POSTINGS, so only the batch
+    scripts that analyze every posting of a SOC (reanalyze_jobs_with_claude.py)
+    reach the pool; the call blocks until every chunk is done.
+    
+    Args:
+        posting_sentences: Cleaned sentences for each posting
+        max_workers: Number of worker processes (0 uses every available core)
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(posting_sentences) < PARALLEL_MIN_POSTINGS:
+        return aggregate_activities(posting_sentences)
+    
+    # Several chunks per worker so uneven posting lengths still balance out
+    chunk_size = max(1, -(-len(posting_sentences) // (workers * 4)))
+    chunks = [posting_sentences[i:i + chunk_size] for i in range(0, len(posting_sentences), chunk_size)]
+    
+    partials = list(get_process_pool(workers).map(aggregate_activities, chunks))
+    
+    return merge_activity_aggregates(partials)
+
 
 class HybridTermAnalyzer:
     """
@@ -18,6 +125,8 @@ class HybridTermAnalyzer:
         self.claude_available = False
         self.client = None
         
+        settings = get_settings()
+        
         # Try to get API key from settings or environment
         api_key = None
         if settings.anthropic_api_key and settings.anthropic_api_key != "your-anthropic-api-key-here":
@@ -29,6 +138,9 @@ class HybridTermAnalyzer:
         # Try to initialize Claude client
         if api_key:
             try:
+                # Imported here: the SDK is slow to import and unused in rule-based mode
+                import anthropic
+                
                 # Initialize with the updated anthropic library
                 self.client = anthropic.Anthropic(api_key=api_key)
                 self.claude_available = True
@@ -40,107 +152,14 @@ class HybridTermAnalyzer:
             print("ℹ️ No Anthropic API key found in settings or environment - Using enhanced rule-based analysis")
         
         # Enhanced normalization dictionary for fallback mode
-        self.normalization_dict = {
-            # Electrical work activities
-            'running wire': 'running and pulling electrical wire',
-            'pulling wire': 'running and pulling electrical wire',
-            'wire running': 'running and pulling electrical wire',
-            'wire pulling': 'running and pulling electrical wire',
-            'run wire': 'running and pulling electrical wire',
-            'pull wire': 'running and pulling electrical wire',
-            'running and pulling wire': 'running and pulling electrical wire',
-            
-            'bending conduit': 'installing and bending conduit',
-            'conduit bending': 'installing and bending conduit',
-            'bend conduit': 'installing and bending conduit',
-            'running conduit': 'installing and bending conduit',
-            'conduit installation': 'installing and bending conduit',
-            
-            'installing lights': 'installing lighting and electrical fixtures',
-            'installing outlets': 'installing lighting and electrical fixtures',
-            'light installation': 'installing lighting and electrical fixtures',
-            'outlet installation': 'installing lighting and electrical fixtures',
-            'install lights': 'installing lighting and electrical fixtures',
-            'install outlets': 'installing lighting and electrical fixtures',
-            'fixture installation': 'installing lighting and electrical fixtures',
-            
-            'low voltage work': 'low voltage systems installation',
-            'low voltage': 'low voltage systems installation',
-            'low voltage installation': 'low voltage systems installation',
-            'low voltage systems': 'low voltage systems installation',
-            
-            'industrial work': 'industrial electrical maintenance',
-            'industrial electrical': 'industrial electrical maintenance',
-            'industrial maintenance': 'industrial electrical maintenance',
-            
-            'electrical terminations': 'electrical connections and terminations',
-            'wire terminations': 'electrical connections and terminations',
-            'cable terminations': 'electrical connections and terminations',
-            'terminating': 'electrical connections and terminations',
-            'terminate': 'electrical connections and terminations',
-            'connections': 'electrical connections and terminations',
-            
-            # Healthcare activities
-            'patient care': 'providing direct patient care',
-            'administering medication': 'medication administration and monitoring',
-            'medication administration': 'medication administration and monitoring',
-            'vital signs': 'monitoring vital signs and patient status',
-            'monitoring patients': 'monitoring vital signs and patient status',
-            'patient monitoring': 'monitoring vital signs and patient status',
-            
-            # Programming and tech
-            'javascript': 'javascript programming',
-            'js': 'javascript programming',
-            'python': 'python programming',
-            'java': 'java programming',
-            'react': 'react development',
-            'node.js': 'node.js development',
-            'nodejs': 'node.js development',
-            
-            # General work activities
-            'data analysis': 'analyzing and interpreting data',
-            'data analytics': 'analyzing and interpreting data',
-            'project management': 'managing projects and timelines',
-            'customer service': 'providing customer support and service',
-            'troubleshooting': 'diagnosing and troubleshooting issues',
-        }
+        self.normalization_dict = NORMALIZATION_DICT
         
     def clean_html_and_artifacts(self, text: str) -> str:
         """Clean HTML tags, script content, and other artifacts from text."""
-        if not text:
-            return ""
-        
-        # Decode HTML entities
-        text = html.unescape(text)
-        
-        # Remove script and style tags with content
-        text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-        text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Remove HTML tags but keep content
-        text = re.sub(r'<[^>]+>', ' ', text)
-        
-        # Remove tracking patterns
-        tracking_patterns = [
-            r'https?://[^\s]*\.cloudfront\.net[^\s]*',
-            r'https?://[^\s]*analytics[^\s]*',
-            r'data-[a-zA-Z-]+=[\"\'][^\"\']*[\"\']',
-            r'defer\s+src=', r'script\s+id=',
-        ]
-        
-        for pattern in tracking_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Remove URLs and emails
-        text = re.sub(r'https?://\S+', '', text)
-        text = re.sub(r'\S+@\S+\.\S+', '', text)
-        
-        # Clean whitespace
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return clean_html_and_artifacts(text)
 
-    def extract_and_categorize_with_claude(self, job_postings_text: str, job_title: str) -> Dict[str, List[Dict[str, Any]]]:
-        """Use Claude to extract and categorize work activities from job postings."""
+    def build_claude_request(self, job_postings_text: str, job_title: str) -> Dict[str, Any]:
+        """Build the Messages API parameters for categorizing a SOC's job postings."""
         
         system_prompt = """You are an expert job market analyst specializing in extracting meaningful work activities from job postings. Your task is to analyze job posting content and extract the most important daily work responsibilities, required skills, qualifications, and unique aspects.
 
@@ -186,25 +205,32 @@ JOB POSTINGS TEXT:
 
 Please extract and categorize the key elements following the guidelines above. Focus on what people actually DO in this role on a daily basis."""
 
+        return {
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": 4000,
+            "temperature": 0.1,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": user_prompt}]
+        }
+
+    def parse_claude_response(self, response_text: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse the JSON categorization out of a Claude response."""
+        # Extract JSON from response
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group()
+            result = json.loads(json_str)
+            return result
+        else:
+            return json.loads(response_text)
+
+    def extract_and_categorize_with_claude(self, job_postings_text: str, job_title: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Use Claude to extract and categorize work activities from job postings."""
         try:
             response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4000,
-                temperature=0.1,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}]
+                **self.build_claude_request(job_postings_text, job_title)
             )
-            
-            response_text = response.content[0].text
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                result = json.loads(json_str)
-                return result
-            else:
-                return json.loads(response_text)
+            return self.parse_claude_response(response.content[0].text)
                 
         except Exception as e:
             print(f"❌ Claude API error: {e}")
@@ -212,117 +238,114 @@ Please extract and categorize the key elements following the guidelines above. F
 
     def extract_activities_rule_based(self, text: str) -> List[Tuple[str, str]]:
         """Enhanced rule-based activity extraction for fallback mode."""
-        if not text:
-            return []
-        
-        text = self.clean_html_and_artifacts(text)
-        activities_with_context = []
-        
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', text)
-        
-        # Enhanced action verbs for different industries
-        action_verbs = {
-            'administer', 'analyze', 'assess', 'assist', 'build', 'calculate', 'care', 'clean',
-            'collaborate', 'collect', 'communicate', 'compile', 'complete', 'conduct', 'configure',
-            'connect', 'coordinate', 'create', 'deliver', 'design', 'develop', 'diagnose',
-            'document', 'educate', 'ensure', 'evaluate', 'examine', 'execute', 'facilitate',
-            'implement', 'improve', 'install', 'instruct', 'interpret', 'investigate', 'maintain',
-            'manage', 'monitor', 'operate', 'organize', 'oversee', 'perform', 'plan', 'prepare',
-            'present', 'process', 'provide', 'record', 'repair', 'report', 'research', 'review',
-            'schedule', 'supervise', 'support', 'teach', 'test', 'train', 'troubleshoot',
-            'update', 'verify', 'write', 'pull', 'run', 'bend', 'terminate', 'wire'
-        }
-        
-        # Enhanced work-related nouns
-        work_nouns = {
-            'care', 'records', 'reports', 'documentation', 'systems', 'equipment', 'patients',
-            'clients', 'customers', 'data', 'procedures', 'protocols', 'meetings', 'training',
-            'wiring', 'conduit', 'panels', 'circuits', 'electrical', 'nursing', 'medication',
-            'code', 'software', 'database', 'network', 'server', 'application', 'website'
-        }
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) < 20:
-                continue
-                
-            sentence_lower = sentence.lower()
-            
-            # Look for responsibility patterns
-            patterns = [
-                r'responsible for ([^,]{20,100})',
-                r'duties include ([^,]{20,100})',
-                r'will ([a-z\s]{15,80}(?:patients|clients|systems|equipment|data|wiring|electrical)[^,]{0,40})',
-                r'((?:coordinate|provide|maintain|manage|monitor|install|connect|analyze|develop)[^,]{20,100})',
-            ]
-            
-            for pattern in patterns:
-                matches = re.finditer(pattern, sentence_lower, re.IGNORECASE)
-                for match in matches:
-                    activity = match.group(1).strip()
-                    if 20 <= len(activity) <= 100:
-                        activity = re.sub(r'\s+', ' ', activity)
-                        if not any(artifact in activity for artifact in ['script', 'http', 'www']):
-                            activities_with_context.append((activity, sentence))
-        
-        return activities_with_context
+        return extract_activities_rule_based(text)
 
     def categorize_activity_rule_based(self, activity: str, context: str) -> str:
-        """Enhanced rule-based categorization for fallback mode."""
-        activity_lower = activity.lower()
-        context_lower = context.lower()
-        
-        # Enhanced categorization rules
-        if any(word in activity_lower for word in ['coordinate', 'provide', 'maintain', 'manage', 'monitor', 'install', 'connect', 'analyze', 'develop', 'perform', 'conduct']):
-            return 'responsibilities'
-        
-        if any(word in activity_lower for word in ['python', 'java', 'javascript', 'sql', 'excel', 'software', 'programming', 'coding']):
-            return 'skills'
-            
-        if any(word in activity_lower for word in ['degree', 'bachelor', 'master', 'experience', 'years', 'certification', 'license']):
-            return 'qualifications'
-            
-        if any(word in activity_lower for word in ['benefits', 'remote', 'flexible', 'culture', 'salary', 'bonus']):
-            return 'unique_aspects'
-        
-        return 'responsibilities'  # Default
+        """Keyword-scored categorization for fallback mode (rules in config/category_rules.json)."""
+        return get_categorizer().categorize(activity, context)
 
-    def analyze_with_fallback(self, job_postings_text: str, job_title: str) -> Dict[str, List[Dict[str, Any]]]:
-        """Enhanced rule-based analysis for fallback mode."""
+    def analyze_with_fallback(self, posting_sentences: List[List[str]], job_title: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Enhanced rule-based analysis for fallback mode.
+        
+        Each activity's count is the number of postings mentioning it, the same
+        definition the Claude prompt uses.
+        """
+        # numpy/scipy are only needed here, so they load on the first fallback analysis
+        from app.services.term_matrix_service import TermMatrix, posting_fingerprint, get_cached_term_matrix, cache_term_matrix
+        
+        # The posting x term matrix is reused while the same postings are analyzed again
+        cache_key = posting_fingerprint(posting_sentences)
+        matrix = get_cached_term_matrix(cache_key)
+        if matrix is None:
+            # Extract and normalize activities per posting, in parallel for large SOCs
+            posting_terms, activity_sentences = aggregate_activities_parallel(
+                posting_sentences, max_workers=get_settings().analysis_workers
+            )
+            matrix = TermMatrix.from_posting_terms(posting_terms, activity_sentences)
+            cache_term_matrix(cache_key, matrix)
         
-        # Extract activities using rule-based approach
-        activities_with_context = self.extract_activities_rule_based(job_postings_text)
+        document_frequencies = matrix.document_frequencies()
         
-        # Track activities and normalize them
-        activity_data = defaultdict(lambda: {'count': 0, 'sentences': set()})
+        # Categorize activities
+        members = {'responsibilities': [], 'skills': [], 'qualifications': [], 'unique_aspects': []}
+        for index, activity in enumerate(matrix.vocabulary):
+            category = self.categorize_activity_rule_based(activity, ' '.join(matrix.term_sentences[activity]))
+            members[category].append(index)
+        
+        # Keep the 15 activities found in the most postings per category
+        categorized = {}
+        for category, indices in members.items():
+            categorized[category] = [
+                {
+                    'term': matrix.vocabulary[index],
+                    'count': int(document_frequencies[index]),
+                    'context_sentences': matrix.term_sentences[matrix.vocabulary[index]]
+                }
+                for index in matrix.top_k(document_frequencies, 15, indices)
+            ]
         
-        for activity, sentence in activities_with_context:
-            # Normalize the activity
-            normalized = self.normalization_dict.get(activity.lower(), activity)
-            activity_data[normalized]['count'] += 1
-            activity_data[normalized]['sentences'].add(sentence)
+        return categorized
+
+    def prepare_postings(self, postings: List[Dict[str, Any]], token_budget: Optional[int] = None) -> Tuple[List[str], List[List[str]], List[int]]:
+        """
+        Clean each posting and select the de-duplicated subset to analyze.
+        
+        Postings cleaned at ingestion by the current cleaner version are not
+        cleaned again.
+        
+        Returns:
+            Tuple of (cleaned text per posting, sentences per posting, indices of the selected postings)
+        """
+        posting_texts = []
+        posting_sentences = []
+        for posting in postings:
+            text, sentences = get_posting_text_and_sentences(posting)
+            posting_texts.append(text)
+            posting_sentences.append(sentences)
         
-        # Categorize activities
-        categorized = {'responsibilities': [], 'skills': [], 'qualifications': [], 'unique_aspects': []}
+        # Drop near-duplicates and fit the most diverse postings into the token budget
+        selection = select_representative_postings(postings, posting_texts, token_budget=token_budget)
+        selected_indices = selection["selected_indices"]
+        print(f"🧮 Representing {len(selected_indices)} of {len(postings)} postings "
+              f"({selection['duplicates_dropped']} near-duplicates, {selection['budget_dropped']} over budget dropped)")
         
-        for activity, data in activity_data.items():
-            if data['count'] >= 1:  # Include all activities in fallback mode
-                category = self.categorize_activity_rule_based(activity, ' '.join(list(data['sentences'])[:3]))
-                
-                item = {
-                    'term': activity,
-                    'count': data['count'],
-                    'context_sentences': list(data['sentences'])[:3]
-                }
-                categorized[category].append(item)
+        return posting_texts, posting_sentences, selected_indices
+
+    def combine_postings_text(self, posting_texts: List[str], selected_indices: List[int]) -> str:
+        """Combine the selected job posting text into a single prompt body."""
+        combined_text = ""
+        for index in selected_indices:
+            combined_text += f"\n\n--- JOB POSTING ---\n{posting_texts[index]}"
+        return combined_text
+
+    def build_report(self, results: Dict[str, List[Dict[str, Any]]], searched_title: str, soc_code: str,
+                     total_postings: int, postings_represented: int) -> JobInsightsReport:
+        """Convert categorized analysis results into a JobInsightsReport."""
+        categorized_terms = {'responsibilities': [], 'skills': [], 'qualifications': [], 'unique_aspects': []}
         
-        # Sort by count and limit results
-        for category in categorized:
-            categorized[category].sort(key=lambda x: x['count'], reverse=True)
-            categorized[category] = categorized[category][:15]
+        for category, items in results.items():
+            if category in categorized_terms:
+                for item in items[:15]:
+                    if isinstance(item, dict) and 'term' in item:
+                        analyzed_term = AnalyzedTerm(
+                            term=item.get('term', ''),
+                            count=item.get('count', 1),
+                            context_sentences=item.get('context_sentences', [])[:3]
+                        )
+                        categorized_terms[category].append(analyzed_term)
         
-        return categorized
+        return JobInsightsReport(
+            searched_title=searched_title,
+            soc_code=soc_code,
+            total_postings_analyzed=total_postings,
+            postings_represented=postings_represented,
+            postings_dropped=total_postings - postings_represented,
+            responsibilities=categorized_terms['responsibilities'],
+            skills=categorized_terms['skills'],
+            qualifications=categorized_terms['qualifications'],
+            unique_aspects=categorized_terms['unique_aspects']
+        )
 
     def generate_report_from_postings(self, postings: List[Dict[str, Any]], searched_title: str, soc_code: str) -> JobInsightsReport:
         """Generate a complete JobInsightsReport using Claude or fallback analysis."""
@@ -334,63 +357,66 @@ Please extract and categorize the key elements following the guidelines above. F
                 responsibilities=[], skills=[], qualifications=[], unique_aspects=[]
             )
         
-        # Combine all job posting text
-        combined_text = ""
-        for posting in postings:
-            text_fields = []
-            
-            if posting.get('Description'):
-                text_fields.append(posting['Description'])
-            elif posting.get('description'):
-                text_fields.append(posting['description'])
-            
-            if posting.get('JobTitle'):
-                text_fields.append(posting['JobTitle'])
-            elif posting.get('job_title'):
-                text_fields.append(posting['job_title'])
-            
-            posting_text = ' '.join(text_fields)
-            posting_text = self.clean_html_and_artifacts(posting_text)
-            
-            if posting_text:
-                combined_text += f"\n\n--- JOB POSTING ---\n{posting_text}"
+        # Only Claude is limited by context; the fallback just drops duplicates
+        token_budget = get_settings().analysis_token_budget if self.claude_available else None
+        posting_texts, posting_sentences, selected_indices = self.prepare_postings(postings, token_budget)
         
         # Use Claude if available, otherwise use enhanced fallback
         if self.claude_available:
             print("🤖 Using Claude/Sonnet 4.0 for superior analysis...")
+            combined_text = self.combine_postings_text(posting_texts, selected_indices)
             claude_results = self.extract_and_categorize_with_claude(combined_text, searched_title)
         else:
             print("🔧 Using enhanced rule-based analysis...")
-            claude_results = self.analyze_with_fallback(combined_text, searched_title)
+            claude_results = self.analyze_with_fallback(
+                [posting_sentences[index] for index in selected_indices],
+                searched_title
+            )
         
-        # Convert results to AnalyzedTerm objects
+        return self.build_report(claude_results, searched_title, soc_code, len(postings), len(selected_indices))
+
+    def generate_report_from_term_stats(self, total_postings: int, term_stats: List[Dict[str, Any]], searched_title: str, soc_code: str) -> JobInsightsReport:
+        """
+        Assemble a rule-based report from pre-aggregated per-SOC term statistics.
+        
+        Cost depends on the number of terms, not postings, since extraction already
+        happened at ingest time. Counts are document frequencies.
+        """
         categorized_terms = {'responsibilities': [], 'skills': [], 'qualifications': [], 'unique_aspects': []}
         
-        for category, items in claude_results.items():
-            if category in categorized_terms:
-                for item in items[:15]:
-                    if isinstance(item, dict) and 'term' in item:
-                        analyzed_term = AnalyzedTerm(
-                            term=item.get('term', ''),
-                            count=item.get('count', 1),
-                            context_sentences=item.get('context_sentences', [])[:3]
-                        )
-                        categorized_terms[category].append(analyzed_term)
+        # term_stats arrive sorted by doc_count, so each category fills with its top terms
+        for stat in term_stats:
+            sentences = stat.get('sentences', [])[:CONTEXT_SAMPLE_SIZE]
+            category = self.categorize_activity_rule_based(stat['term'], ' '.join(sentences))
+            if len(categorized_terms[category]) < 15:
+                categorized_terms[category].append(AnalyzedTerm(
+                    term=stat['term'],
+                    count=stat['doc_count'],
+                    context_sentences=sentences
+                ))
         
         return JobInsightsReport(
             searched_title=searched_title,
             soc_code=soc_code,
-            total_postings_analyzed=len(postings),
+            total_postings_analyzed=total_postings,
+            postings_represented=total_postings,
+            postings_dropped=0,
             responsibilities=categorized_terms['responsibilities'],
             skills=categorized_terms['skills'],
             qualifications=categorized_terms['qualifications'],
             unique_aspects=categorized_terms['unique_aspects']
         )
 
-
-# Global analyzer instance
-analyzer = HybridTermAnalyzer()
+@lru_cache(maxsize=None)
+def get_analyzer() -> HybridTermAnalyzer:
+    """Return the shared analyzer, constructing it (and the Claude client) on first use."""
+    return HybridTermAnalyzer()
 
 def generate_report_from_postings(postings: List[Dict[str, Any]], searched_title: str, soc_code: str) -> JobInsightsReport:
     """Public interface for generating reports from job postings."""
-    return analyzer.generate_report_from_postings(postings, searched_title, soc_code)
\ No newline at end of file
+    return get_analyzer().generate_report_from_postings(postings, searched_title, soc_code)
+
+
+def generate_report_from_term_stats(total_postings: int, term_stats: List[Dict[str, Any]], searched_title: str, soc_code: str) -> JobInsightsReport:
+    """Public interface for generating rule-based reports from per-SOC term statistics."""
+    return get_analyzer().generate_report_from_term_stats(total_postings, term_stats, searched_title, soc_code)
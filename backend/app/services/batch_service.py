@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+
+# custom_id values must match ^[a-zA-Z0-9_-]{1,64}$
+_CUSTOM_ID_INVALID = re.compile(r'[^a-zA-Z0-9_-]')
+
+
+def soc_custom_id(soc_code: str) -> str:
+    """Build a Message Batches custom_id for a SOC code (dots are not allowed)."""
+    return "soc_" + _CUSTOM_ID_INVALID.sub('_', soc_code)[:60]
+
+
+def build_batch_request(custom_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap Messages API parameters as a single Message Batches request."""
+    return {"custom_id": custom_id, "params": params}
+
+
+def submit_batch(client, requests: List[Dict[str, Any]]):
+    """Submit all requests as one Message Batch and return the batch object."""
+    return client.messages.batches.create(requests=requests)
+
+
+async def wait_for_batch(client, batch_id: str, poll_interval: float = 30.0, timeout: Optional[float] = None):
+    """
+    Poll a Message Batch until processing has ended.
+
+    Args:
+        client: Anthropic client (or FakeBatchClient)
+        batch_id: Batch to poll
+        poll_interval: Seconds between status checks
+        timeout: Give up after this many seconds (None waits indefinitely)
+
+    Returns:
+        The ended batch object
+
+    Raises:
+        TimeoutError: If the batch is still processing when the timeout expires
+    """
+    waited = 0.0
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        print(f"  ⏳ Batch {batch_id}: {batch.processing_status} "
+              f"({counts.succeeded} succeeded, {counts.errored} errored, {counts.processing} processing)")
+        if batch.processing_status == "ended":
+            return batch
+        if timeout is not None and waited >= timeout:
+            raise TimeoutError(f"Batch {batch_id} still {batch.processing_status} after {waited:.0f}s")
+        await asyncio.sleep(poll_interval)
+        waited += poll_interval
+
+
+def iter_batch_results(client, batch_id: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Iterate over the results of an ended batch.
+
+    Yields:
+        Tuples of (custom_id, response text or None, error description or None)
+    """
+    for entry in client.messages.batches.results(batch_id):
+        result = entry.result
+        if result.type == "succeeded":
+            yield entry.custom_id, result.message.content[0].text, None
+        else:
+            error = getattr(result, "error", None)
+            yield entry.custom_id, None, f"{result.type}: {error}" if error else result.type
+
+
+class FakeMessageBatches:
+    """
+    Offline stand-in for ``client.messages.batches``.
+
+    Batches are kept as JSON files so a submitted batch can be resumed by id from
+    a later process, just like the real API. Each request is answered by a
+    responder callable (Messages API params -> response text); a batch reports
+    ``in_progress`` for ``polls_until_done`` retrievals before it ends.
+    """
+
+    def __init__(self, state_dir: str, responder: Callable[[Dict[str, Any]], str], polls_until_done: int = 1):
+        self.state_dir = state_dir
+        self.responder = responder
+        self.polls_until_done = polls_until_done
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _path(self, batch_id: str) -> str:
+        return os.path.join(self.state_dir, f"{batch_id}.json")
+
+    def _load(self, batch_id: str) -> Dict[str, Any]:
+        with open(self._path(batch_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, state: Dict[str, Any]):
+        with open(self._path(state["id"]), 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    def _batch(self, state: Dict[str, Any]):
+        ended = state["status"] == "ended"
+        total = len(state["requests"])
+        errored = sum(1 for result in state.get("results", {}).values() if result.get("error"))
+        return SimpleNamespace(
+            id=state["id"],
+            processing_status=state["status"],
+            created_at=state["created_at"],
+            request_counts=SimpleNamespace(
+                processing=0 if ended else total,
+                succeeded=total - errored if ended else 0,
+                errored=errored,
+                canceled=0,
+                expired=0
+            )
+        )
+
+    def create(self, requests: List[Dict[str, Any]]):
+        state = {
+            "id": f"msgbatch_fake_{uuid.uuid4().hex[:16]}",
+            "status": "in_progress",
+            "polls": 0,
+            "created_at": datetime.utcnow().isoformat(),
+            "requests": list(requests),
+        }
+        self._save(state)
+        return self._batch(state)
+
+    def retrieve(self, batch_id: str):
+        state = self._load(batch_id)
+        if state["status"] != "ended":
+            state["polls"] += 1
+            if state["polls"] >= self.polls_until_done:
+                # "Process" every request once the batch is due to end
+                results = {}
+                for request in state["requests"]:
+                    try:
+                        results[request["custom_id"]] = {"text": self.responder(request["params"])}
+                    except Exception as e:
+                        results[request["custom_id"]] = {"error": str(e)}
+                state["results"] = results
+                state["status"] = "ended"
+            self._save(state)
+        return self._batch(state)
+
+    def results(self, batch_id: str):
+        state = self._load(batch_id)
+        if state["status"] != "ended":
+            raise RuntimeError(f"Batch {batch_id} has not ended")
+        for custom_id, result in state["results"].items():
+            if "error" in result:
+                outcome = SimpleNamespace(type="errored", error=result["error"])
+            else:
+                message = SimpleNamespace(content=[SimpleNamespace(type="text", text=result["text"])])
+                outcome = SimpleNamespace(type="succeeded", message=message)
+            yield SimpleNamespace(custom_id=custom_id, result=outcome)
+
+
+class FakeBatchClient:
+    """Minimal client exposing ``messages.batches`` backed by FakeMessageBatches."""
+
+    def __init__(self, state_dir: str, responder: Callable[[Dict[str, Any]], str], polls_until_done: int = 1):
+        self.messages = SimpleNamespace(
+            batches=FakeMessageBatches(state_dir, responder, polls_until_done)
+        )
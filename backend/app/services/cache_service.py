@@ -1,7 +1,7 @@
 import json
 import os
 import hashlib
-from typing import Dict, Any, Optional
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from app.models.pydantic_models import JobInsightsReport
 
@@ -148,6 +148,59 @@ class AnalysisCacheService:
             print(f"⚠️ Error clearing cache: {e}")
             return 0
     
+    def invalidate_soc_codes(self, soc_codes: List[str]) -> int:
+        """
+        Remove cached analyses for any of these SOC codes, whatever the job title.
+        
+        Cache file names are hashes, so the SOC code is read from each file's
+        _cache_metadata.
+        
+        Args:
+            soc_codes: SOC codes whose postings changed
+            
+        Returns:
+            Number of cache files removed
+        """
+        soc_codes = set(soc_codes)
+        removed_count = 0
+        for cached_data in self.load_cached_reports():
+            metadata = cached_data["_cache_metadata"]
+            if metadata.get("soc_code") not in soc_codes or not metadata.get("cache_key"):
+                continue
+            try:
+                os.remove(self._get_cache_file_path(metadata["cache_key"]))
+                removed_count += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"⚠️ Error removing cached analysis for {metadata.get('job_title')} (SOC: {metadata['soc_code']}): {e}")
+        
+        if removed_count:
+            print(f"🗑️ Invalidated {removed_count} cached analyses for changed SOC codes")
+        return removed_count
+    
+    def load_cached_reports(self) -> List[Dict[str, Any]]:
+        """
+        Load every cached analysis, expired or not.
+        
+        Returns:
+            List of cached report dictionaries, each with its _cache_metadata
+            and the file modification time as _cache_metadata["modified_at"]
+        """
+        reports = []
+        for filename in os.listdir(self.cache_dir):
+            if not (filename.startswith("analysis_") and filename.endswith(".json")):
+                continue
+            file_path = os.path.join(self.cache_dir, filename)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    cached_data = json.load(f)
+                cached_data.setdefault("_cache_metadata", {})["modified_at"] = os.path.getmtime(file_path)
+                reports.append(cached_data)
+            except Exception as e:
+                print(f"⚠️ Error loading cached analysis {filename}: {e}")
+        return reports
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the cache.
@@ -196,4 +249,9 @@ class AnalysisCacheService:
 
 
 # Global cache service instance
-cache_service = AnalysisCacheService()
\ No newline at end of file
+cache_service = AnalysisCacheService()
+
+
+def invalidate_changed_socs(event: Dict[str, Any]):
+    """SOC change event handler (see event_service.subscribe) dropping stale cached analyses."""
+    cache_service.invalidate_soc_codes(event["soc_codes"])
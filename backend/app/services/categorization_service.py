@@ -0,0 +1,109 @@
+import json
+import pathlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
+
+from app.services.normalization_service import tokenize
+
+CATEGORY_RULES_JSON = pathlib.Path(__file__).parent.parent.parent / "config" / "category_rules.json"
+
+# Suffixes stripped (first match only) so "managing", "managed" and "manage" share a key
+_SUFFIXES = ('ing', 'ed', 'es', 'e', 's')
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """Crude suffix-stripping stemmer; enough to fold common verb and plural forms."""
+    if token.endswith('ss'):
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[:-len(suffix)]
+    return token
+
+
+def stem_tokens(text: str) -> List[str]:
+    return [stem(token) for token in tokenize(text)]
+
+
+def load_category_rules(path: pathlib.Path = CATEGORY_RULES_JSON) -> Dict[str, Any]:
+    """Load the categorization rules (categories, keyword weights, scoring weights) from JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class KeywordCategorizer:
+    """
+    Weighted keyword categorizer backed by a stemmed keyword index.
+
+    Keywords (single words or phrases) are stemmed and indexed once, so
+    scoring an activity is a lookup per word n-gram no matter how large the
+    category lexicons grow. Keyword hits in the activity count
+    ``activity_weight`` times their weight, hits in the context sentences
+    ``context_weight`` times. The highest-scoring category wins, ties go to the
+    category listed first, and an activity with no hits gets the default.
+    """
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.categories: List[str] = list(rules["categories"])
+        self.default: str = rules.get("default", self.categories[0])
+        self.activity_weight = float(rules.get("activity_weight", 1.0))
+        self.context_weight = float(rules.get("context_weight", 0.0))
+
+        # space-joined stemmed keyword -> [(category position, weight)]
+        self._index: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        # First stems of multi-word keywords; only these start a phrase lookup
+        self._phrase_starts = set()
+        self._max_keyword_tokens = 1
+        for position, category in enumerate(self.categories):
+            for keyword, weight in rules.get("keywords", {}).get(category, {}).items():
+                stems = stem_tokens(keyword)
+                if not stems:
+                    continue
+                self._index[' '.join(stems)].append((position, float(weight)))
+                if len(stems) > 1:
+                    self._phrase_starts.add(stems[0])
+                    self._max_keyword_tokens = max(self._max_keyword_tokens, len(stems))
+        self._index = dict(self._index)
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path = CATEGORY_RULES_JSON) -> "KeywordCategorizer":
+        return cls(load_category_rules(path))
+
+    def _add_scores(self, scores: List[float], text: str, multiplier: float):
+        if not text or not multiplier:
+            return
+        tokens = stem_tokens(text)
+        index = self._index
+        phrase_starts = self._phrase_starts
+        for start, token in enumerate(tokens):
+            hits = index.get(token)
+            if hits:
+                for position, weight in hits:
+                    scores[position] += weight * multiplier
+            if token in phrase_starts:
+                for end in range(start + 2, min(len(tokens), start + self._max_keyword_tokens) + 1):
+                    hits = index.get(' '.join(tokens[start:end]))
+                    if hits:
+                        for position, weight in hits:
+                            scores[position] += weight * multiplier
+
+    def score(self, activity: str, context: str = "") -> List[float]:
+        """Score an activity against every category, in category order."""
+        scores = [0.0] * len(self.categories)
+        self._add_scores(scores, activity, self.activity_weight)
+        self._add_scores(scores, context, self.context_weight)
+        return scores
+
+    def categorize(self, activity: str, context: str = "") -> str:
+        scores = self.score(activity, context)
+        best = max(range(len(scores)), key=lambda position: (scores[position], -position))
+        return self.categories[best] if scores[best] > 0 else self.default
+
+
+@lru_cache(maxsize=None)
+def get_categorizer() -> KeywordCategorizer:
+    """Return the process-wide categorizer, built from the rules file on first use."""
+    return KeywordCategorizer.from_file()
@@ -0,0 +1,356 @@
+import asyncio
+import re
+import random
+import zlib
+from typing import List, Dict, Any, Optional, Set, Tuple
+from collections import ChainMap, defaultdict
+from pymongo import DeleteOne, UpdateOne
+from app.services.text_service import get_posting_text_and_sentences
+
+# MinHash parameters. Signatures are built from 32-bit CRC hashes of word
+# shingles so they are stable across processes and can be persisted.
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# LSH banding: 16 bands x 4 rows catches pairs with Jaccard >= ~0.5 with high probability
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+
+# Novelty is scored against the most recently selected postings only, keeping selection linear
+NOVELTY_WINDOW = 50
+
+# Rough token estimate used for budgeting LLM context (~4 characters per token)
+CHARS_PER_TOKEN = 4
+
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randint(1, MERSENNE_PRIME - 1), _rng.randint(0, MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def shingle(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Return the set of hashed word shingles for a piece of text."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode())}
+    return {
+        zlib.crc32(' '.join(words[i:i + size]).encode())
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash_signature(text: str) -> List[int]:
+    """Compute the MinHash signature of a text's word shingles."""
+    shingles = shingle(text)
+    if not shingles:
+        return [MAX_HASH] * NUM_PERMUTATIONS
+    return [
+        min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in shingles)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_jaccard(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimate the Jaccard similarity of two documents from their signatures."""
+    if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+        return 0.0
+    matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return matches / len(sig_a)
+
+
+def lsh_band_keys(signature: List[int]) -> List[str]:
+    """Split a signature into LSH band keys (band index + hash of the band's rows)."""
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        band_hash = zlib.crc32(','.join(str(v) for v in rows).encode())
+        keys.append(f"{band}:{band_hash:08x}")
+    return keys
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in a text."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def select_representative_postings(
+    postings: List[Dict[str, Any]],
+    texts: List[str],
+    token_budget: Optional[int] = None,
+    duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD
+) -> Dict[str, Any]:
+    """
+    Pick a diverse, de-duplicated subset of postings that fits in a token budget.
+
+    Near-duplicates (same employer reposting across locations, aggregator copies)
+    are dropped first. The survivors are stratified by company and location and
+    taken round-robin, preferring at each step the posting least similar to what
+    has already been selected, until the token budget is filled.
+
+    Args:
+        postings: Raw posting documents (used for Company/Location strata)
+        texts: Cleaned text for each posting, aligned with postings
+        token_budget: Maximum estimated tokens to select (None for no limit)
+        duplicate_threshold: Estimated Jaccard similarity at which postings count as duplicates
+
+    Returns:
+        Dictionary with the selected indices plus counts of postings dropped
+        as duplicates and for exceeding the budget
+    """
+    signatures = [minhash_signature(text) for text in texts]
+
+    # Drop near-duplicates, using LSH buckets to avoid comparing every pair
+    buckets: Dict[str, List[int]] = defaultdict(list)
+    kept: List[int] = []
+    duplicates_dropped = 0
+    for index, text in enumerate(texts):
+        if not text:
+            continue
+        band_keys = lsh_band_keys(signatures[index])
+        candidates = {other for key in band_keys for other in buckets.get(key, [])}
+        if any(estimate_jaccard(signatures[index], signatures[other]) >= duplicate_threshold
+               for other in candidates):
+            duplicates_dropped += 1
+            continue
+        for key in band_keys:
+            buckets[key].append(index)
+        kept.append(index)
+
+    # Stratify by company, then by location within each company
+    strata: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+    for index in kept:
+        posting = postings[index]
+        company = (posting.get('Company') or posting.get('company') or '').strip().lower()
+        location = (posting.get('Location') or posting.get('location') or '').strip().lower()
+        strata[company][location].append(index)
+
+    queues: List[List[int]] = []
+    for locations in strata.values():
+        # Round-robin across locations so one company's queue alternates cities
+        location_lists = list(locations.values())
+        queue = []
+        for depth in range(max(len(items) for items in location_lists)):
+            queue.extend(items[depth] for items in location_lists if depth < len(items))
+        queues.append(queue)
+
+    selected: List[int] = []
+    used_tokens = 0
+    budget_dropped = 0
+    while any(queues):
+        # Each round offers the next posting of every company; take the most novel first
+        round_candidates = [queue.pop(0) for queue in queues if queue]
+        while round_candidates:
+            if selected:
+                recent = selected[-NOVELTY_WINDOW:]
+                best = min(
+                    round_candidates,
+                    key=lambda i: max(estimate_jaccard(signatures[i], signatures[s]) for s in recent)
+                )
+            else:
+                best = round_candidates[0]
+            round_candidates.remove(best)
+
+            tokens = estimate_tokens(texts[best])
+            if token_budget is not None and used_tokens + tokens > token_budget:
+                budget_dropped += 1
+                continue
+            selected.append(best)
+            used_tokens += tokens
+
+    return {
+        "selected_indices": selected,
+        "duplicates_dropped": duplicates_dropped,
+        "budget_dropped": budget_dropped,
+        "estimated_tokens": used_tokens,
+    }
+
+
+def _sign_postings(job_dicts: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[str]]]:
+    """Set each posting's MinHash signature; return the postings with text and their band keys."""
+    pending = []
+    for job in job_dicts:
+        text = get_posting_text_and_sentences(job)[0]
+        if text:
+            job["minhash"] = minhash_signature(text)
+            pending.append((job, lsh_band_keys(job["minhash"])))
+        else:
+            job["minhash"] = None
+            job["dup_cluster_id"] = job["JvId"]
+            job["dup_canonical"] = True
+    return pending
+
+
+async def assign_duplicate_clusters(db, job_dicts: List[Dict[str, Any]],
+                                    signature_cache: Optional[Dict[str, List[int]]] = None,
+                                    bucket_cache: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
+    """
+    Tag postings with a MinHash signature and a near-duplicate cluster id.
+
+    The LSH index lives in the ``lsh_buckets`` collection: one document per
+    band key pointing at the cluster (and the posting) that first claimed it.
+    Candidate lookup is a single ``$in`` query on band keys, so assignment
+    cost depends on the batch size, not on the collection size.
+
+    Postings are modified in place with ``minhash``, ``dup_cluster_id`` and
+    ``dup_canonical`` (True for the posting that founded its cluster). A
+    posting whose text changed releases the buckets it claimed for its old
+    signature, and one that moved to another cluster re-claims its buckets
+    for the new one. When a representative's text changes, its members must
+    be assigned again (see "representatives").
+
+    Nothing is written: the changes to the index are returned and stored with
+    store_lsh_buckets once the postings themselves are stored.
+
+    Args:
+        db: Motor database handle
+        job_dicts: Job documents about to be upserted, with clean_text set
+        signature_cache: JvId -> signature of postings that may not be written
+            yet (e.g. earlier chunks of the same ingest); updated with this
+            batch's postings, which the caller drops once they are written
+        bucket_cache: Band key -> bucket claimed by postings that may not be
+            written yet; updated with this batch's claims
+
+    Returns:
+        Dictionary with the number of postings assigned to an existing cluster
+        ("duplicates"), the buckets to claim ("claimed") and release
+        ("released"), each with the "jv_id" of its posting, and the JvIds of
+        representatives whose clusters changed ("representatives")
+    """
+    changes = {"duplicates": 0, "claimed": [], "released": [], "representatives": []}
+    jv_ids = [job["JvId"] for job in job_dicts]
+    stored_postings = {
+        doc["JvId"]: doc
+        async for doc in db.jobs.find({"JvId": {"$in": jv_ids}}, {"JvId": 1, "minhash": 1, "dup_cluster_id": 1})
+    }
+
+    # MinHash is pure Python; computing it in the executor keeps the event loop free
+    pending = await asyncio.get_running_loop().run_in_executor(None, _sign_postings, job_dicts)
+
+    # Fetch every bucket any posting in this batch falls into, or claimed for its stored signature
+    keys_by_posting = {job["JvId"]: keys for job, keys in pending}
+    new_signatures = {job["JvId"]: job["minhash"] for job in job_dicts}
+    old_keys = {
+        jv_id: lsh_band_keys(doc["minhash"])
+        for jv_id, doc in stored_postings.items()
+        if doc.get("minhash") and doc["minhash"] != new_signatures.get(jv_id)
+    }
+    all_keys = list({key for keys in keys_by_posting.values() for key in keys} | {key for keys in old_keys.values() for key in keys})
+    stored_buckets = {
+        bucket["_id"]: bucket
+        async for bucket in db.lsh_buckets.find({"_id": {"$in": all_keys}})
+    }
+    claimed_buckets = bucket_cache if bucket_cache is not None else {}
+    for key in all_keys:
+        if key not in stored_buckets and key in claimed_buckets:
+            stored_buckets[key] = claimed_buckets[key]
+
+    # A posting whose text changed gives up every bucket it claimed; the keys
+    # its new signature still falls into are claimed again below
+    for jv_id, keys in old_keys.items():
+        for key in set(keys) | set(keys_by_posting.get(jv_id, [])):
+            bucket = stored_buckets.get(key)
+            if bucket and bucket["jv_id"] == jv_id:
+                changes["released"].append({"_id": key, "jv_id": jv_id})
+                del stored_buckets[key]
+
+    # Load the signatures of the postings and clusters behind those buckets;
+    # postings in this batch are compared by the signature about to be stored.
+    # Loaded signatures are only kept for this batch: the cache holds just
+    # the postings that may not be written yet
+    cached_signatures = signature_cache if signature_cache is not None else {}
+    loaded_signatures = {}
+    representative_ids = list(
+        {bucket[field] for bucket in stored_buckets.values() for field in ("jv_id", "cluster_id")}
+        - cached_signatures.keys() - keys_by_posting.keys()
+    )
+    if representative_ids:
+        async for doc in db.jobs.find({"JvId": {"$in": representative_ids}}, {"JvId": 1, "minhash": 1}):
+            if doc.get("minhash"):
+                loaded_signatures[doc["JvId"]] = doc["minhash"]
+    batch_signatures = {job["JvId"]: job["minhash"] for job, _ in pending}
+    representative_signatures = ChainMap(batch_signatures, cached_signatures, loaded_signatures)
+
+    new_buckets: Dict[str, Dict[str, str]] = {}
+    for job, keys in pending:
+        jv_id = job["JvId"]
+        signature = job["minhash"]
+        cluster_id = None
+        for key in keys:
+            bucket = new_buckets.get(key) or stored_buckets.get(key)
+            if not bucket:
+                continue
+            if bucket["jv_id"] == jv_id == bucket["cluster_id"]:
+                cluster_id = jv_id
+                break
+            # A bucket of this posting's own still needs it to match its cluster
+            other = representative_signatures.get(bucket["jv_id"] if bucket["jv_id"] != jv_id else bucket["cluster_id"])
+            if other and estimate_jaccard(signature, other) >= DEFAULT_DUPLICATE_THRESHOLD:
+                cluster_id = bucket["cluster_id"]
+                break
+
+        if cluster_id is None:
+            cluster_id = jv_id
+        elif cluster_id != jv_id:
+            changes["duplicates"] += 1
+
+        job["dup_cluster_id"] = cluster_id
+        job["dup_canonical"] = cluster_id == jv_id
+
+        stored = stored_postings.get(jv_id, {})
+        if stored.get("dup_cluster_id") == jv_id and (jv_id in old_keys or cluster_id != jv_id):
+            changes["representatives"].append(jv_id)
+
+        for key in keys:
+            bucket = stored_buckets.get(key)
+            if bucket and bucket["jv_id"] == jv_id and bucket["cluster_id"] != cluster_id:
+                # Moved to another cluster: claim the key again for the new one
+                changes["released"].append({"_id": key, "jv_id": jv_id})
+                del stored_buckets[key]
+            if key not in stored_buckets and key not in new_buckets:
+                new_buckets[key] = {"_id": key, "cluster_id": cluster_id, "jv_id": jv_id}
+
+    # A representative left without text cannot hold its members any more
+    for job in job_dicts:
+        if job["JvId"] not in keys_by_posting and stored_postings.get(job["JvId"], {}).get("dup_cluster_id") == job["JvId"]:
+            changes["representatives"].append(job["JvId"])
+
+    cached_signatures.update(batch_signatures)
+    claimed_buckets.update(new_buckets)
+    changes["claimed"] = list(new_buckets.values())
+    return changes
+
+
+async def store_lsh_buckets(db, claimed: List[Dict[str, str]], released: Optional[List[Dict[str, str]]] = None):
+    """
+    Apply the bucket changes from assign_duplicate_clusters.
+
+    Released buckets are removed first (only while still held by the posting
+    releasing them), then claimed ones are added; a key already claimed by
+    another posting keeps its first claim. Only pass the changes of postings
+    that were actually stored, so the index never points at a posting that
+    does not exist.
+
+    Args:
+        db: Motor database handle
+        claimed: Buckets to claim
+        released: Buckets to release
+    """
+    if released:
+        await db.lsh_buckets.bulk_write(
+            [DeleteOne({"_id": bucket["_id"], "jv_id": bucket["jv_id"]}) for bucket in released],
+            ordered=False
+        )
+    if claimed:
+        await db.lsh_buckets.bulk_write(
+            [UpdateOne({"_id": bucket["_id"]}, {"$setOnInsert": bucket}, upsert=True) for bucket in claimed],
+            ordered=False
+        )
@@ -0,0 +1,242 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from pymongo import UpdateOne, DeleteOne
+from scipy import sparse
+
+from app.services.term_matrix_service import TermMatrix
+
+# Distinctive terms stored per SOC
+DISTINCTIVE_TERMS_PER_SOC = 25
+
+# A term must appear in at least this many of the SOC's postings to count
+MIN_DOC_COUNT = 2
+
+# Total pseudo-postings of the informative Dirichlet prior (spread by corpus frequency)
+PRIOR_STRENGTH = 10.0
+
+# Rebuild everything when more than this share of SOCs changed since the last build
+FULL_REBUILD_FRACTION = 0.25
+
+CONTEXT_SAMPLE_SIZE = 3
+
+
+def log_odds_scores(in_counts: np.ndarray, in_totals: np.ndarray,
+                    corpus_counts: np.ndarray, corpus_total: float,
+                    prior_strength: float = PRIOR_STRENGTH) -> np.ndarray:
+    """
+    Z-scored log-odds ratio of each term in a SOC against every other SOC.
+
+    Uses the informative Dirichlet prior of Monroe, Colaresi & Quinn (2008):
+    each term gets ``prior_strength`` pseudo-postings spread by its corpus
+    frequency, so rare terms are shrunk towards zero instead of topping the
+    list. All arguments are element-wise aligned arrays of posting counts.
+    """
+    prior = prior_strength * corpus_counts / max(corpus_total, 1.0)
+    out_counts = corpus_counts - in_counts
+    out_totals = corpus_total - in_totals
+    in_odds = np.log(in_counts + prior) - np.log(np.maximum(in_totals + prior_strength - in_counts - prior, 1e-9))
+    out_odds = np.log(out_counts + prior) - np.log(np.maximum(out_totals + prior_strength - out_counts - prior, 1e-9))
+    variance = 1.0 / (in_counts + prior) + 1.0 / (out_counts + prior)
+    return (in_odds - out_odds) / np.sqrt(variance)
+
+
+def _build_soc_matrix(rows: List[Dict[str, Any]], soc_codes: List[str]) -> Tuple[List[str], sparse.csr_matrix]:
+    """SOC x term matrix of posting counts from soc_term_stats rows."""
+    soc_index = {soc_code: index for index, soc_code in enumerate(soc_codes)}
+    per_soc: List[Dict[str, int]] = [{} for _ in soc_codes]
+    for row in rows:
+        index = soc_index.get(row["soc_code"])
+        if index is not None and row.get("doc_count", 0) > 0:
+            per_soc[index][row["term"]] = row["doc_count"]
+    matrix = TermMatrix.from_posting_terms(per_soc)
+    return matrix.vocabulary, matrix.counts
+
+
+def _score_rows(matrix: sparse.csr_matrix, soc_postings: np.ndarray,
+                corpus_counts: np.ndarray, corpus_total: float) -> np.ndarray:
+    """Log-odds score for every stored (SOC, term) entry of the matrix, aligned with matrix.data."""
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    return log_odds_scores(
+        matrix.data.astype(np.float64),
+        soc_postings[rows].astype(np.float64),
+        corpus_counts[matrix.indices].astype(np.float64),
+        float(corpus_total)
+    )
+
+
+def _select_distinctive(matrix: sparse.csr_matrix, scores: np.ndarray, row: int) -> List[Tuple[int, float, int]]:
+    """Top (term index, score, doc_count) entries of one SOC row."""
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    counts = matrix.data[start:end]
+    row_scores = np.where((counts >= MIN_DOC_COUNT) & (scores[start:end] > 0), scores[start:end], -np.inf)
+    chosen = TermMatrix.top_k(row_scores, DISTINCTIVE_TERMS_PER_SOC)
+    return [
+        (int(matrix.indices[start + i]), float(row_scores[i]), int(counts[i]))
+        for i in chosen if np.isfinite(row_scores[i])
+    ]
+
+
+async def _persist_socs(db, soc_codes: List[str], vocabulary: List[str], matrix: sparse.csr_matrix,
+                        scores: np.ndarray, totals: Dict[str, Dict[str, Any]]):
+    """Write the distinctive terms and contribution snapshot of each SOC row."""
+    selections = {soc_code: _select_distinctive(matrix, scores, row) for row, soc_code in enumerate(soc_codes)}
+
+    # Context sentences only for the chosen terms
+    chosen_ids = [f"{soc_code}|{vocabulary[term]}" for soc_code, chosen in selections.items() for term, _, _ in chosen]
+    sentences = {}
+    for start in range(0, len(chosen_ids), 1000):
+        async for doc in db.soc_term_stats.find({"_id": {"$in": chosen_ids[start:start + 1000]}}, {"sentences": 1}):
+            sentences[doc["_id"]] = doc.get("sentences", [])[:CONTEXT_SAMPLE_SIZE]
+
+    now = datetime.utcnow()
+    operations = []
+    for row, soc_code in enumerate(soc_codes):
+        postings = totals[soc_code]["postings"]
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        operations.append(UpdateOne(
+            {"_id": soc_code},
+            {"$set": {
+                "soc_code": soc_code,
+                "terms": [
+                    {
+                        "term": vocabulary[term],
+                        "score": round(score, 4),
+                        "doc_count": doc_count,
+                        "share": round(doc_count / postings, 4) if postings else 0.0,
+                        "context_sentences": sentences.get(f"{soc_code}|{vocabulary[term]}", []),
+                    }
+                    for term, score, doc_count in selections[soc_code]
+                ],
+                # What this SOC contributed to corpus_term_counts, subtracted on the next incremental build
+                "term_counts": [[vocabulary[term], int(count)] for term, count in zip(matrix.indices[start:end], matrix.data[start:end])],
+                "postings": postings,
+                "source_updated_at": totals[soc_code].get("updated_at"),
+                "built_at": now,
+            }},
+            upsert=True
+        ))
+    for start in range(0, len(operations), 100):
+        await db.soc_distinctive_terms.bulk_write(operations[start:start + 100], ordered=False)
+
+
+async def _full_rebuild(db, totals: Dict[str, Dict[str, Any]], corpus_total: int) -> int:
+    soc_codes = sorted(totals)
+    rows = [row async for row in db.soc_term_stats.find({}, {"soc_code": 1, "term": 1, "doc_count": 1})]
+    vocabulary, matrix = _build_soc_matrix(rows, soc_codes)
+
+    presence = matrix.copy()
+    presence.data = np.ones_like(presence.data)
+    corpus_counts = np.asarray(matrix.sum(axis=0)).ravel()
+    soc_counts = np.asarray(presence.sum(axis=0)).ravel()
+
+    # Replace the corpus-wide counts the incremental builds adjust
+    await db.corpus_term_counts.delete_many({})
+    documents = [
+        {"_id": term, "doc_count": int(corpus_counts[index]), "soc_count": int(soc_counts[index])}
+        for index, term in enumerate(vocabulary)
+    ]
+    for start in range(0, len(documents), 1000):
+        await db.corpus_term_counts.insert_many(documents[start:start + 1000], ordered=False)
+
+    soc_postings = np.array([totals[soc_code]["postings"] for soc_code in soc_codes])
+    scores = _score_rows(matrix, soc_postings, corpus_counts, corpus_total)
+    await _persist_socs(db, soc_codes, vocabulary, matrix, scores, totals)
+    return len(soc_codes)
+
+
+async def _incremental_rebuild(db, changed: List[str], removed: List[str],
+                               totals: Dict[str, Dict[str, Any]], corpus_total: int) -> int:
+    # Previous contributions of every SOC being replaced or removed
+    previous: Dict[str, Dict[str, int]] = {}
+    async for doc in db.soc_distinctive_terms.find({"_id": {"$in": changed + removed}}, {"term_counts": 1}):
+        previous[doc["_id"]] = {term: count for term, count in doc.get("term_counts", [])}
+
+    rows = [row async for row in db.soc_term_stats.find({"soc_code": {"$in": changed}}, {"soc_code": 1, "term": 1, "doc_count": 1})]
+    vocabulary, matrix = _build_soc_matrix(rows, changed)
+
+    doc_deltas: Dict[str, int] = defaultdict(int)
+    soc_deltas: Dict[str, int] = defaultdict(int)
+    for soc_code in changed + removed:
+        for term, count in previous.get(soc_code, {}).items():
+            doc_deltas[term] -= count
+            soc_deltas[term] -= 1
+    for row, soc_code in enumerate(changed):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        for term, count in zip(matrix.indices[start:end], matrix.data[start:end]):
+            doc_deltas[vocabulary[term]] += int(count)
+            soc_deltas[vocabulary[term]] += 1
+
+    operations = [
+        UpdateOne({"_id": term}, {"$inc": {"doc_count": delta, "soc_count": soc_deltas[term]}}, upsert=True)
+        for term, delta in doc_deltas.items() if delta or soc_deltas[term]
+    ]
+    for start in range(0, len(operations), 1000):
+        await db.corpus_term_counts.bulk_write(operations[start:start + 1000], ordered=False)
+    await db.corpus_term_counts.delete_many({"doc_count": {"$lte": 0}})
+
+    corpus_counts = np.zeros(len(vocabulary))
+    term_index = {term: index for index, term in enumerate(vocabulary)}
+    for start in range(0, len(vocabulary), 1000):
+        async for doc in db.corpus_term_counts.find({"_id": {"$in": vocabulary[start:start + 1000]}}, {"doc_count": 1}):
+            corpus_counts[term_index[doc["_id"]]] = doc["doc_count"]
+
+    soc_postings = np.array([totals[soc_code]["postings"] for soc_code in changed])
+    scores = _score_rows(matrix, soc_postings, corpus_counts, corpus_total)
+    if changed:
+        await _persist_socs(db, changed, vocabulary, matrix, scores, totals)
+    if removed:
+        await db.soc_distinctive_terms.bulk_write([DeleteOne({"_id": soc_code}) for soc_code in removed])
+    return len(changed) + len(removed)
+
+
+async def rebuild_distinctive_terms(db, full: bool = False) -> Dict[str, Any]:
+    """
+    Recompute the distinctive terms of each SOC against all other SOCs.
+
+    Scores come from the per-SOC term statistics (soc_term_stats and
+    soc_term_totals). Only SOCs whose statistics changed since the last build
+    are rescored: their old contribution to the corpus-wide counts is swapped
+    for the new one and the rest of the corpus is left as stored. Scores of
+    unchanged SOCs therefore drift slightly, so a full rebuild runs when
+    requested, on the first build, or when many SOCs changed.
+
+    Args:
+        db: Motor database handle
+        full: Rebuild every SOC from scratch
+
+    Returns:
+        Summary with the build mode and the number of SOCs written
+    """
+    totals = {
+        doc["_id"]: doc
+        async for doc in db.soc_term_totals.find({"postings": {"$gt": 0}}, {"postings": 1, "updated_at": 1})
+    }
+    built = {
+        doc["_id"]: doc.get("source_updated_at")
+        async for doc in db.soc_distinctive_terms.find({}, {"source_updated_at": 1})
+    }
+    changed = sorted(soc_code for soc_code in totals if soc_code not in built or built[soc_code] != totals[soc_code].get("updated_at"))
+    removed = sorted(soc_code for soc_code in built if soc_code not in totals)
+    corpus_total = sum(doc["postings"] for doc in totals.values())
+
+    if not full and not changed and not removed:
+        return {"mode": "unchanged", "socs_written": 0}
+
+    has_corpus = await db.corpus_term_counts.find_one({}, {"_id": 1}) is not None
+    if full or not built or not has_corpus or len(changed) + len(removed) > FULL_REBUILD_FRACTION * max(len(totals), 1):
+        written = await _full_rebuild(db, totals, corpus_total)
+        if removed:
+            await db.soc_distinctive_terms.delete_many({"_id": {"$in": removed}})
+        return {"mode": "full", "socs_written": written}
+
+    written = await _incremental_rebuild(db, changed, removed, totals, corpus_total)
+    return {"mode": "incremental", "socs_written": written}
+
+
+async def load_distinctive_terms(db, soc_code: str) -> Optional[List[Dict[str, Any]]]:
+    """Stored distinctive terms of a SOC, highest score first (None if never built)."""
+    doc = await db.soc_distinctive_terms.find_one({"_id": soc_code}, {"terms": 1})
+    return doc.get("terms", []) if doc else None
@@ -0,0 +1,156 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Iterable, List
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.soc import job_soc_codes
+
+# Fields a change stream event needs to tell which SOC codes a posting is filed under
+SOC_FIELDS = ["soc_code", "soc_codes", "OnetCodes", "onet_codes", "soc_all"]
+
+# Seconds change stream events are gathered before one SOC change event is published
+CHANGE_STREAM_BATCH_SECONDS = 2.0
+
+# Seconds to wait before reopening a change stream that failed
+CHANGE_STREAM_RETRY_SECONDS = 10.0
+
+# Server error code for change streams on a standalone mongod (not a replica set)
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+# Server error code for an unrecognised option (fullDocumentBeforeChange before MongoDB 6.0)
+UNKNOWN_FIELD = 40415
+
+_subscribers: List[Callable[[Dict[str, Any]], Any]] = []
+
+
+def subscribe(handler: Callable[[Dict[str, Any]], Any]):
+    """
+    Register a handler for SOC change events.
+
+    Handlers receive a dict with the changed "soc_codes" (sorted list), the
+    "source" of the change ("insert" or "change_stream") and the number of
+    postings written ("count"). They may be plain functions or coroutines.
+    """
+    if handler not in _subscribers:
+        _subscribers.append(handler)
+
+
+def unsubscribe(handler: Callable[[Dict[str, Any]], Any]):
+    """Remove a handler registered with subscribe."""
+    if handler in _subscribers:
+        _subscribers.remove(handler)
+
+
+async def publish_soc_changes(soc_codes: Iterable[str], source: str, count: int = 0) -> Dict[str, Any]:
+    """
+    Tell every subscriber that postings filed under these SOC codes changed.
+
+    A failing handler is logged and does not stop the others (or the write
+    that triggered the event).
+
+    Args:
+        soc_codes: SOC codes of the inserted or updated postings
+        source: Where the change was seen ("insert" or "change_stream")
+        count: Number of postings written
+
+    Returns:
+        The published event
+    """
+    event = {"soc_codes": sorted(set(soc_codes)), "source": source, "count": count}
+    if not event["soc_codes"]:
+        return event
+
+    for handler in list(_subscribers):
+        try:
+            result = handler(event)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"⚠️ Error in SOC change handler {getattr(handler, '__name__', handler)}: {e}")
+    return event
+
+
+async def enable_pre_images(db):
+    """
+    Have the server record each posting's state before it changes (MongoDB 6.0+).
+
+    With pre-images the change stream also sees the SOC codes a posting was
+    filed under before it was updated, replaced or deleted. The server keeps
+    them in a system collection, so this costs storage on busy collections.
+
+    Args:
+        db: Database whose jobs collection records pre-images
+    """
+    await db.command("collMod", "jobs", changeStreamPreAndPostImages={"enabled": True})
+
+
+async def watch_job_changes(db):
+    """
+    Publish SOC change events for postings written by other processes.
+
+    Follows a change stream on the jobs collection (inserts, updates,
+    replacements and deletes) and publishes the SOC codes seen every
+    CHANGE_STREAM_BATCH_SECONDS. The SOC fields are read from the posting
+    after the change and, where the collection records pre-images (see
+    enable_pre_images), from the posting before it, so a posting moved to
+    other SOC codes or deleted also invalidates the codes it left. Without
+    pre-images those old codes are not known: deletes publish nothing and
+    updates publish only the new codes. The posting after an update is
+    looked up when the event is read, so it can be newer than the change.
+
+    The stream resumes after the last event it handled when it is reopened.
+    Change streams need a replica set; on a standalone server this logs a
+    message and returns. Run it as a task and cancel it to stop.
+
+    Postings inserted through this process are published by the insert path
+    too, so their cache entries are simply invalidated twice.
+
+    Args:
+        db: Database whose jobs collection is watched
+    """
+    pipeline = [
+        {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+        {"$project": {
+            **{f"fullDocument.{field}": 1 for field in SOC_FIELDS},
+            **{f"fullDocumentBeforeChange.{field}": 1 for field in SOC_FIELDS},
+            "operationType": 1
+        }}
+    ]
+    resume_token = None
+    before_change = "whenAvailable"
+    while True:
+        try:
+            async with db.jobs.watch(pipeline, full_document="updateLookup", full_document_before_change=before_change,
+                                     resume_after=resume_token, max_await_time_ms=500) as stream:
+                print("👂 Watching job postings for changes from other processes")
+                pending = set()
+                count = 0
+                deadline = None
+                while stream.alive:
+                    # Waits up to max_await_time_ms on the server for the next change
+                    change = await stream.try_next()
+                    now = asyncio.get_running_loop().time()
+                    if change is not None:
+                        pending.update(job_soc_codes(change.get("fullDocument") or {}))
+                        pending.update(job_soc_codes(change.get("fullDocumentBeforeChange") or {}))
+                        count += 1
+                        if deadline is None:
+                            deadline = now + CHANGE_STREAM_BATCH_SECONDS
+                    if deadline is not None and now >= deadline:
+                        await publish_soc_changes(pending, "change_stream", count)
+                        # Only resume after changes that were published
+                        resume_token = stream.resume_token
+                        pending, count, deadline = set(), 0, None
+        except OperationFailure as e:
+            if e.code == CHANGE_STREAM_NOT_SUPPORTED:
+                print("⚠️ Change streams need a replica set; not watching for changes from other processes")
+                return
+            if e.code == UNKNOWN_FIELD and before_change:
+                print("⚠️ Server does not support pre-images (MongoDB 6.0+); SOC codes postings leave will not be seen")
+                before_change = None
+                continue
+            print(f"⚠️ Job change stream failed: {e}")
+        except PyMongoError as e:
+            print(f"⚠️ Job change stream failed: {e}")
+        await asyncio.sleep(CHANGE_STREAM_RETRY_SECONDS)
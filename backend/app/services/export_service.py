@@ -0,0 +1,56 @@
+import json
+import logging
+import zlib
+from typing import AsyncIterator, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Documents fetched from MongoDB per cursor batch during an export
+EXPORT_BATCH_SIZE = 500
+
+MAX_EXPORT_BATCH_SIZE = 5000
+
+# Serialized bytes gathered before a chunk is written to the response
+CHUNK_BYTES = 64 * 1024
+
+GZIP_LEVEL = 6
+
+
+async def stream_ndjson(documents: AsyncIterator[Dict[str, Any]], compress: bool = False) -> AsyncIterator[bytes]:
+    """
+    Serialize documents as newline-delimited JSON, in chunks of about CHUNK_BYTES.
+
+    Only the current chunk (and the compressor's window) is held in memory, so
+    the output can be any size. Values JSON cannot represent (ObjectId,
+    datetime) are written as strings. An error while reading the documents
+    is logged and raised, leaving the output without its final chunk.
+
+    Args:
+        documents: Documents to write, one per line
+        compress: Gzip-compress the stream
+
+    Yields:
+        Chunks of the (optionally compressed) output
+    """
+    # wbits 16 + MAX_WBITS writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    buffer = bytearray()
+    try:
+        async for document in documents:
+            buffer += json.dumps(document, default=str, ensure_ascii=False).encode("utf-8")
+            buffer += b"\n"
+            if len(buffer) >= CHUNK_BYTES:
+                chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+                buffer.clear()
+                if chunk:
+                    yield chunk
+    except Exception:
+        # Headers are already sent; re-raising aborts the chunked response, so a
+        # failed export is not mistaken for a complete one
+        logger.exception("Export stopped early")
+        raise
+
+    if compressor:
+        yield compressor.compress(bytes(buffer)) + compressor.flush()
+    elif buffer:
+        yield bytes(buffer)
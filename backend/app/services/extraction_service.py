@@ -0,0 +1,153 @@
+import json
+import pathlib
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Tuple
+
+EXTRACTION_LEXICON_JSON = pathlib.Path(__file__).parent.parent.parent / "config" / "extraction_lexicon.json"
+
+# Sentences shorter than this are never scanned
+MIN_SENTENCE_LENGTH = 20
+
+# Extracted activities outside this length range are discarded
+MIN_ACTIVITY_LENGTH = 20
+MAX_ACTIVITY_LENGTH = 100
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation over words, factored into a prefix trie.
+
+    Matching cost depends on word length rather than the number of words, so the
+    lexicon can grow to thousands of entries. Where one word is a prefix of
+    another the longer one is tried first.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _trie_to_pattern(trie)
+
+
+def _trie_to_pattern(node: Dict[str, Any]) -> str:
+    branches = [re.escape(char) + _trie_to_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    if len(branches) == 1 and '' not in node:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if '' in node else pattern
+
+
+def load_extraction_lexicon(path: pathlib.Path = EXTRACTION_LEXICON_JSON) -> Dict[str, List[str]]:
+    """Load the extraction lexicon (trigger phrases, verbs, nouns) from JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ActivityExtractor:
+    """
+    Compiled rule-based activity extractor.
+
+    Each sentence is scanned once for every trigger in the lexicon (responsibility
+    phrases, "will" clauses, activity verbs). Only at trigger positions are the
+    anchored capture patterns tried, one per rule, each resuming after its own
+    previous match so results are identical to running every rule's pattern
+    through re.finditer separately. Activities come out per sentence in rule
+    order: each responsibility phrase, then "will" clauses, then activity verbs.
+
+    Sentences are lowercased, so case-insensitive matching only matters for
+    non-ASCII text (e.g. U+017F folding to 's'); ASCII sentences use
+    case-sensitive copies of the patterns, which are several times faster.
+    """
+
+    def __init__(self, lexicon: Dict[str, List[str]]):
+        phrases = self._normalize(lexicon.get("responsibility_phrases", []))
+        nouns = self._normalize(lexicon.get("future_object_nouns", []))
+        verbs = self._normalize(lexicon.get("activity_verbs", []))
+        self.artifact_markers = self._normalize(lexicon.get("artifact_markers", []))
+
+        rules = [re.escape(phrase) + r' ([^,]{20,100})' for phrase in phrases]
+        triggers = list(phrases)
+        if nouns:
+            rules.append(r'will ([a-z\s]{15,80}' + build_trie_pattern(nouns) + r'[^,]{0,40})')
+            triggers.append('will ')
+        if verbs:
+            rules.append('(' + build_trie_pattern(verbs) + r'[^,]{20,100})')
+            triggers.extend(verbs)
+
+        scan = build_trie_pattern(triggers)
+        self._ascii_scan = re.compile(scan) if triggers else None
+        self._ascii_rules = [re.compile(rule) for rule in rules]
+        self._unicode_scan = re.compile(scan, re.IGNORECASE) if triggers else None
+        self._unicode_rules = [re.compile(rule, re.IGNORECASE) for rule in rules]
+
+    @staticmethod
+    def _normalize(words: Iterable[str]) -> List[str]:
+        # Sentences are lowercased before matching; keep lexicon order, drop repeats
+        return list(dict.fromkeys(word.lower() for word in words if word))
+
+    @classmethod
+    def from_file(cls, path: pathlib.Path = EXTRACTION_LEXICON_JSON) -> "ActivityExtractor":
+        return cls(load_extraction_lexicon(path))
+
+    def extract(self, sentences: List[str]) -> List[Tuple[str, str]]:
+        """
+        Extract activities from cleaned sentences.
+
+        Returns:
+            List of (activity, source sentence) tuples
+        """
+        activities_with_context = []
+        if self._ascii_scan is None:
+            return activities_with_context
+
+        rule_count = len(self._ascii_rules)
+        for sentence in sentences:
+            if len(sentence) < MIN_SENTENCE_LENGTH:
+                continue
+
+            sentence_lower = sentence.lower()
+            if sentence_lower.isascii():
+                scan, rules = self._ascii_scan, self._ascii_rules
+            else:
+                scan, rules = self._unicode_scan, self._unicode_rules
+            found = None
+            resume_at = [0] * rule_count
+
+            # Triggers may overlap, so each search resumes one character past the last hit
+            trigger = scan.search(sentence_lower)
+            while trigger:
+                position = trigger.start()
+                trigger = scan.search(sentence_lower, position + 1)
+                for index in range(rule_count):
+                    if position < resume_at[index]:
+                        continue
+                    match = rules[index].match(sentence_lower, position)
+                    if not match:
+                        continue
+                    resume_at[index] = match.end()
+
+                    activity = match.group(1).strip()
+                    if MIN_ACTIVITY_LENGTH <= len(activity) <= MAX_ACTIVITY_LENGTH:
+                        activity = _WHITESPACE_RE.sub(' ', activity)
+                        if not any(marker in activity for marker in self.artifact_markers):
+                            if found is None:
+                                found = [[] for _ in range(rule_count)]
+                            found[index].append((activity, sentence))
+
+            if found:
+                for rule_matches in found:
+                    activities_with_context.extend(rule_matches)
+
+        return activities_with_context
+
+
+@lru_cache(maxsize=None)
+def get_activity_extractor() -> ActivityExtractor:
+    """Return the process-wide extractor, compiled from the lexicon on first use."""
+    return ActivityExtractor.from_file()
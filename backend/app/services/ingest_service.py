@@ -0,0 +1,145 @@
+import json
+import zlib
+from typing import AsyncIterator
+
+from app.db.mongodb import JobIngest, INSERT_CHUNK_SIZE
+from app.models.pydantic_models import JobInsertResponse
+
+# Longest NDJSON line accepted; a line is buffered whole before it is parsed
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+# Decompressed bytes produced per step, so a small gzip body cannot expand all at once
+DECOMPRESS_CHUNK_BYTES = 256 * 1024
+
+# Chunks between running summaries in the server log
+PROGRESS_EVERY_CHUNKS = 10
+
+
+async def gunzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Decompress a gzip stream (one or more concatenated members) as it arrives.
+
+    Args:
+        chunks: Compressed bytes, in arbitrary pieces
+
+    Yields:
+        Decompressed bytes, at most DECOMPRESS_CHUNK_BYTES at a time
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    in_member = False
+    async for data in chunks:
+        while data:
+            in_member = True
+            try:
+                output = decompressor.decompress(data, DECOMPRESS_CHUNK_BYTES)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip stream: {e}")
+            if output:
+                yield output
+            if decompressor.eof:
+                # Next gzip member, if any
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                in_member = False
+            else:
+                data = decompressor.unconsumed_tail
+    if in_member:
+        raise ValueError("Truncated gzip stream")
+
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream into non-blank lines, holding at most one partial line.
+
+    Args:
+        chunks: Bytes of newline-delimited records, in arbitrary pieces
+
+    Yields:
+        Each non-blank line, without its line ending
+    """
+    buffer = bytearray()
+    async for data in chunks:
+        buffer += data
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(buffer[start:end]).strip()
+            if line:
+                yield line
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValueError(f"NDJSON line longer than {MAX_LINE_BYTES} bytes")
+    line = bytes(buffer).strip()
+    if line:
+        yield line
+
+
+async def ingest_ndjson(chunks: AsyncIterator[bytes], compressed: bool = False, db=None) -> JobInsertResponse:
+    """
+    Insert jobs from a newline-delimited JSON stream (one job per line) as it is read.
+
+    Lines are parsed and handed to JobIngest INSERT_CHUNK_SIZE at a time, so
+    memory use does not depend on the size of the upload. Lines that are not
+    valid JSON are reported like jobs failing validation; the index of a job
+    is its position among the non-blank lines. A JvId sent more than once is
+    stored as its last copy.
+
+    Args:
+        chunks: Request body bytes, in arbitrary pieces
+        compressed: The stream is gzip-compressed
+        db: Database to write to (defaults to the application database)
+
+    Returns:
+        JobInsertResponse with operation statistics and per-job errors
+    """
+    if compressed:
+        chunks = gunzip_stream(chunks)
+
+    ingest = JobIngest(db)
+    jobs = []
+    json_errors = {}
+    offset = 0
+    chunk_count = 0
+
+    async def flush():
+        nonlocal jobs, offset, chunk_count
+        first_error = len(ingest.errors)
+        await ingest.add_chunk(jobs, offset=offset)
+        # Report unparseable lines with the JSON error rather than as non-objects
+        for error in ingest.errors[first_error:]:
+            error["error"] = json_errors.get(error["index"], error["error"])
+        offset += len(jobs)
+        jobs = []
+        json_errors.clear()
+        chunk_count += 1
+        if chunk_count % PROGRESS_EVERY_CHUNKS == 0:
+            print(f"📥 Stream ingest: {ingest.progress()}")
+
+    try:
+        async for line in read_lines(chunks):
+            try:
+                jobs.append(json.loads(line))
+            except ValueError as e:
+                # Keep the position so later indices still match the stream
+                json_errors[offset + len(jobs)] = f"Invalid JSON: {e}"
+                jobs.append(None)
+            if len(jobs) >= INSERT_CHUNK_SIZE:
+                await flush()
+        if jobs:
+            await flush()
+    finally:
+        # Whatever was accepted before a broken stream is still written
+        response = await ingest.finish()
+
+    if not ingest.received:
+        return JobInsertResponse(
+            success=True,
+            inserted_count=0,
+            updated_count=0,
+            total_processed=0,
+            message="No jobs to process"
+        )
+    return response
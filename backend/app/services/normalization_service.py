@@ -0,0 +1,240 @@
+import csv
+import pathlib
+import re
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+PHRASE_SYNONYMS_CSV = pathlib.Path(__file__).parent.parent.parent / "config" / "phrase_synonyms.csv"
+# Written by learn_normalizations.py; optional
+LEARNED_NORMALIZATIONS_CSV = pathlib.Path(__file__).parent.parent.parent / "config" / "learned_normalizations.csv"
+
+# Phrases shorter than this (in words) only normalize an activity they match exactly;
+# single words like "java" or "connections" are too ambiguous to rewrite a longer activity
+MIN_EMBEDDED_PHRASE_TOKENS = 2
+
+# Words may carry internal dots ("node.js") but never start or end with one
+_TOKEN_RE = re.compile(r'[a-z0-9]+(?:\.[a-z0-9]+)*')
+
+# Built-in normalization dictionary; config/phrase_synonyms.csv extends it
+NORMALIZATION_DICT = {
+    # Electrical work activities
+    'running wire': 'running and pulling electrical wire',
+    'pulling wire': 'running and pulling electrical wire',
+    'wire running': 'running and pulling electrical wire',
+    'wire pulling': 'running and pulling electrical wire',
+    'run wire': 'running and pulling electrical wire',
+    'pull wire': 'running and pulling electrical wire',
+    'running and pulling wire': 'running and pulling electrical wire',
+    
+    'bending conduit': 'installing and bending conduit',
+    'conduit bending': 'installing and bending conduit',
+    'bend conduit': 'installing and bending conduit',
+    'running conduit': 'installing and bending conduit',
+    'conduit installation': 'installing and bending conduit',
+    
+    'installing lights': 'installing lighting and electrical fixtures',
+    'installing outlets': 'installing lighting and electrical fixtures',
+    'light installation': 'installing lighting and electrical fixtures',
+    'outlet installation': 'installing lighting and electrical fixtures',
+    'install lights': 'installing lighting and electrical fixtures',
+    'install outlets': 'installing lighting and electrical fixtures',
+    'fixture installation': 'installing lighting and electrical fixtures',
+    
+    'low voltage work': 'low voltage systems installation',
+    'low voltage': 'low voltage systems installation',
+    'low voltage installation': 'low voltage systems installation',
+    'low voltage systems': 'low voltage systems installation',
+    
+    'industrial work': 'industrial electrical maintenance',
+    'industrial electrical': 'industrial electrical maintenance',
+    'industrial maintenance': 'industrial electrical maintenance',
+    
+    'electrical terminations': 'electrical connections and terminations',
+    'wire terminations': 'electrical connections and terminations',
+    'cable terminations': 'electrical connections and terminations',
+    'terminating': 'electrical connections and terminations',
+    'terminate': 'electrical connections and terminations',
+    'connections': 'electrical connections and terminations',
+    
+    # Healthcare activities
+    'patient care': 'providing direct patient care',
+    'administering medication': 'medication administration and monitoring',
+    'medication administration': 'medication administration and monitoring',
+    'vital signs': 'monitoring vital signs and patient status',
+    'monitoring patients': 'monitoring vital signs and patient status',
+    'patient monitoring': 'monitoring vital signs and patient status',
+    
+    # Programming and tech
+    'javascript': 'javascript programming',
+    'js': 'javascript programming',
+    'python': 'python programming',
+    'java': 'java programming',
+    'react': 'react development',
+    'node.js': 'node.js development',
+    'nodejs': 'node.js development',
+    
+    # General work activities
+    'data analysis': 'analyzing and interpreting data',
+    'data analytics': 'analyzing and interpreting data',
+    'project management': 'managing projects and timelines',
+    'customer service': 'providing customer support and service',
+    'troubleshooting': 'diagnosing and troubleshooting issues',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, the unit phrase matching works on."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def load_phrase_synonyms(path: pathlib.Path = PHRASE_SYNONYMS_CSV, warn_missing: bool = True) -> Dict[str, str]:
+    """
+    Load an external phrase -> canonical phrase table.
+    
+    The CSV has ``phrase`` and ``canonical`` columns; rows starting with ``#``
+    are comments. A missing file yields an empty table.
+    """
+    synonyms = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = csv.DictReader(line for line in f if not line.startswith('#'))
+            for row in rows:
+                phrase = (row.get("phrase") or "").strip().lower()
+                canonical = (row.get("canonical") or "").strip()
+                if phrase and canonical:
+                    synonyms[phrase] = canonical
+    except FileNotFoundError:
+        if warn_missing:
+            print(f"Warning: {path} not found. Only the built-in normalization dictionary is used.")
+    return synonyms
+
+
+class PhraseNormalizer:
+    """
+    Aho-Corasick automaton over the words of every known phrase.
+    
+    A sentence is tokenized once and walked through the automaton in a single
+    pass, reporting every phrase occurrence regardless of dictionary size.
+    Matching is on whole words, so "java" never matches inside "javascript".
+    """
+    
+    def __init__(self, phrases: Dict[str, str]):
+        self.exact: Dict[str, str] = {}
+        # Node 0 is the root; per node: word transitions, failure link, the
+        # phrase ending here (if any) and the nearest phrase-ending node on
+        # the failure chain
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._phrase: List[Optional[Tuple[int, str]]] = [None]
+        self._output_link: List[int] = [0]
+        
+        for phrase, canonical in phrases.items():
+            key = phrase.lower()
+            self.exact[key] = canonical
+            tokens = tokenize(key)
+            if tokens:
+                self._add(tokens, canonical)
+        self._build_failure_links()
+    
+    def _add(self, tokens: List[str], canonical: str):
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._phrase.append(None)
+                self._output_link.append(0)
+                self._goto[node][token] = next_node
+            node = next_node
+        if self._phrase[node] is None:
+            self._phrase[node] = (len(tokens), canonical)
+    
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                suffix = self._fail[child]
+                self._output_link[child] = suffix if self._phrase[suffix] else self._output_link[suffix]
+    
+    def _occurrences(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """Every phrase occurrence as (start token, end token, canonical)."""
+        goto, fail, phrase, output_link = self._goto, self._fail, self._phrase, self._output_link
+        occurrences = []
+        node = 0
+        for position, token in enumerate(tokens, 1):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            match = node if phrase[node] else output_link[node]
+            while match:
+                length, canonical = phrase[match]
+                occurrences.append((position - length, position, canonical))
+                match = output_link[match]
+        return occurrences
+    
+    def find_phrases(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Find the known phrases in a sentence, leftmost-longest and non-overlapping.
+        
+        Returns:
+            List of (matched words, canonical phrase) in sentence order
+        """
+        tokens = tokenize(text)
+        found = []
+        covered_until = 0
+        for start, end, canonical in sorted(self._occurrences(tokens), key=lambda o: (o[0], o[0] - o[1])):
+            if start >= covered_until:
+                found.append((' '.join(tokens[start:end]), canonical))
+                covered_until = end
+        return found
+    
+    def normalize(self, activity: str) -> str:
+        """
+        Map an extracted activity to its canonical phrase.
+        
+        An exact dictionary key wins; otherwise the longest known phrase of at
+        least MIN_EMBEDDED_PHRASE_TOKENS words inside the activity (leftmost on
+        ties) decides, e.g. "pulling wire through conduit" becomes "running and
+        pulling electrical wire". Activities with no known phrase are unchanged.
+        """
+        canonical = self.exact.get(activity.lower())
+        if canonical is not None:
+            return canonical
+        
+        best = None
+        for start, end, canonical in self._occurrences(tokenize(activity)):
+            length = end - start
+            if length < MIN_EMBEDDED_PHRASE_TOKENS:
+                continue
+            if best is None or length > best[0] or (length == best[0] and start < best[1]):
+                best = (length, start, canonical)
+        return best[2] if best else activity
+
+
+@lru_cache(maxsize=None)
+def get_phrase_normalizer() -> PhraseNormalizer:
+    """
+    Return the process-wide normalizer.
+    
+    Combines the learned table, NORMALIZATION_DICT and the curated synonym table,
+    later sources overriding earlier ones. Learned canonicals that the curated
+    sources rename are followed to the curated name.
+    """
+    curated = dict(NORMALIZATION_DICT)
+    curated.update(load_phrase_synonyms())
+    phrases = {
+        phrase: curated.get(canonical, canonical)
+        for phrase, canonical in load_phrase_synonyms(LEARNED_NORMALIZATIONS_CSV, warn_missing=False).items()
+    }
+    phrases.update(curated)
+    return PhraseNormalizer(phrases)
@@ -0,0 +1,307 @@
+import csv
+import hashlib
+import json
+import os
+import zlib
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.services.categorization_service import stem_tokens
+
+# Token-set MinHash: 64 universal hashes over a 32-bit prime field
+NUM_PERMUTATIONS = 64
+HASH_PRIME = 4294967291  # largest prime below 2**32
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Estimated Jaccard similarity of stemmed token sets at which phrases are merged
+DEFAULT_THRESHOLD = 0.7
+
+# Phrases read, hashed and appended to the state per chunk
+CHUNK_SIZE = 20000
+
+# Band records are spread over this many files so each sorts in memory on its own
+NUM_PARTITIONS = 64
+
+# Function words carry no meaning in a token set and would inflate similarity
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'or', 'the', 'of', 'to', 'for', 'in', 'on', 'at', 'with', 'by',
+    'from', 'as', 'all', 'any', 'our', 'their', 'your', 'across', 'into', 'within',
+})
+
+_BAND_RECORD = np.dtype([("key", "<u8"), ("id", "<u4")])
+
+_rng = np.random.RandomState(1729)
+_HASH_A = _rng.randint(1, 2 ** 31 - 1, size=NUM_PERMUTATIONS).astype(np.uint64)
+_HASH_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def phrase_token_hashes(phrase: str) -> List[int]:
+    """CRC32 of each distinct stemmed token in a phrase, ignoring stopwords."""
+    return sorted({zlib.crc32(token.encode()) for token in stem_tokens(phrase) if token not in STOPWORDS})
+
+
+def phrase_signatures(token_hashes: List[List[int]]) -> np.ndarray:
+    """
+    MinHash signatures for a batch of phrases, computed for the whole batch at once.
+
+    Args:
+        token_hashes: Non-empty token hash lists, one per phrase
+
+    Returns:
+        uint32 array of shape (phrases, NUM_PERMUTATIONS)
+    """
+    lengths = np.fromiter((len(hashes) for hashes in token_hashes), dtype=np.int64, count=len(token_hashes))
+    flat = np.fromiter((h for hashes in token_hashes for h in hashes), dtype=np.uint64, count=int(lengths.sum()))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    signatures = np.empty((len(token_hashes), NUM_PERMUTATIONS), dtype=np.uint32)
+    prime = np.uint64(HASH_PRIME)
+    for permutation in range(NUM_PERMUTATIONS):
+        # a < 2**31 and h < 2**32, so a * h + b stays below 2**64
+        hashed = (_HASH_A[permutation] * flat + _HASH_B[permutation]) % prime
+        signatures[:, permutation] = np.minimum.reduceat(hashed, offsets)
+    return signatures
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """One 64-bit key per (phrase, band), mixing the band number with its rows."""
+    keys = np.empty((signatures.shape[0], LSH_BANDS), dtype=np.uint64)
+    multiplier = np.uint64(1099511628211)
+    for band in range(LSH_BANDS):
+        key = np.full(signatures.shape[0], 14695981039346656037 ^ band, dtype=np.uint64)
+        for row in range(band * LSH_ROWS, (band + 1) * LSH_ROWS):
+            key = (key ^ signatures[:, row].astype(np.uint64)) * multiplier
+        keys[:, band] = key
+    return keys
+
+
+def _phrase_hash(phrase: str) -> int:
+    return int.from_bytes(hashlib.blake2b(phrase.encode(), digest_size=8).digest(), "little")
+
+
+class PhraseClusterer:
+    """
+    Out-of-core MinHash/LSH clustering of activity phrases.
+
+    State lives in ``state_dir`` so runs are incremental: phrases seen before
+    keep their id and signature, and only new phrases are hashed and appended
+    (to phrases.txt, the memory-mapped signatures.u4 and the band partition
+    files). Clustering reads one band partition at a time, verifies candidate
+    pairs against the memory-mapped signatures and assigns phrases to clusters
+    in a single pass, so memory stays bounded by the partition size plus a few
+    bytes per phrase.
+
+    Clusters are stars: a phrase joins a cluster only if it is similar to the
+    cluster's root phrase, so chains of pairwise-similar phrases cannot drift
+    into one giant cluster the way single-linkage union-find would.
+    """
+
+    def __init__(self, state_dir: str, threshold: float = DEFAULT_THRESHOLD, num_partitions: int = NUM_PARTITIONS):
+        self.state_dir = state_dir
+        self.threshold = threshold
+        self.num_partitions = num_partitions
+        os.makedirs(os.path.join(state_dir, "bands"), exist_ok=True)
+        self._check_meta()
+
+        hashes_path = self._path("hashes.u8")
+        self.hashes = np.fromfile(hashes_path, dtype=np.uint64) if os.path.exists(hashes_path) else np.empty(0, dtype=np.uint64)
+        lengths_path = self._path("lengths.u2")
+        self.lengths = np.fromfile(lengths_path, dtype=np.uint16) if os.path.exists(lengths_path) else np.empty(0, dtype=np.uint16)
+        # Phrase hashes in sorted order with their ids, for lookups of known phrases
+        self._sorted_ids = np.argsort(self.hashes, kind="stable")
+        self._sorted_hashes = self.hashes[self._sorted_ids]
+        self.counts = np.zeros(len(self.hashes), dtype=np.float64)
+        self.new_phrases = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.state_dir, name)
+
+    def _check_meta(self):
+        meta = {"num_permutations": NUM_PERMUTATIONS, "bands": LSH_BANDS, "partitions": self.num_partitions, "seed": 1729}
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(f"{self.state_dir} was built with {stored}; rerun with a fresh state directory")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    @property
+    def size(self) -> int:
+        return len(self.hashes)
+
+    def _lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """Existing id for each hash, or -1."""
+        if not len(self._sorted_hashes):
+            return np.full(len(hashes), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._sorted_hashes, hashes), len(self._sorted_hashes) - 1)
+        return np.where(self._sorted_hashes[positions] == hashes, self._sorted_ids[positions], -1)
+
+    def add_phrases(self, phrases: Iterable[Tuple[str, float]]):
+        """Count (phrase, frequency) pairs, hashing and indexing phrases not seen before."""
+        chunk: List[Tuple[str, float]] = []
+        for item in phrases:
+            chunk.append(item)
+            if len(chunk) >= CHUNK_SIZE:
+                self._add_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk: List[Tuple[str, float]]):
+        texts = [phrase.strip().lower() for phrase, _ in chunk]
+        hashes = np.fromiter((_phrase_hash(text) for text in texts), dtype=np.uint64, count=len(texts))
+        ids = self._lookup(hashes)
+
+        # Phrases new to the state, first occurrence within the chunk only
+        new_ids: Dict[int, int] = {}
+        new_texts, new_tokens, new_hashes = [], [], []
+        for index, text in enumerate(texts):
+            if ids[index] >= 0 or not text:
+                continue
+            existing = new_ids.get(int(hashes[index]))
+            if existing is not None:
+                ids[index] = existing
+                continue
+            token_hashes = phrase_token_hashes(text)
+            if not token_hashes:
+                continue
+            ids[index] = new_ids[int(hashes[index])] = self.size + len(new_texts)
+            new_texts.append(text)
+            new_tokens.append(token_hashes)
+            new_hashes.append(hashes[index])
+
+        if new_texts:
+            self._append(new_texts, new_tokens, np.array(new_hashes, dtype=np.uint64))
+
+        valid = ids >= 0
+        np.add.at(self.counts, ids[valid], np.array([count for _, count in chunk], dtype=np.float64)[valid])
+
+    def _append(self, texts: List[str], token_hashes: List[List[int]], hashes: np.ndarray):
+        first_id = self.size
+        signatures = phrase_signatures(token_hashes)
+        with open(self._path("phrases.txt"), "a", encoding="utf-8") as f:
+            for text in texts:
+                f.write(text.replace("\n", " ") + "\n")
+        with open(self._path("signatures.u4"), "ab") as f:
+            signatures.tofile(f)
+        with open(self._path("hashes.u8"), "ab") as f:
+            hashes.tofile(f)
+        lengths = np.fromiter((min(len(text), 65535) for text in texts), dtype=np.uint16, count=len(texts))
+        with open(self._path("lengths.u2"), "ab") as f:
+            lengths.tofile(f)
+
+        keys = band_keys(signatures).ravel()
+        records = np.empty(len(keys), dtype=_BAND_RECORD)
+        records["key"] = keys
+        records["id"] = np.repeat(np.arange(first_id, first_id + len(texts), dtype=np.uint32), LSH_BANDS)
+        partitions = (keys % np.uint64(self.num_partitions)).astype(np.int64)
+        for partition in np.unique(partitions):
+            with open(self._path(os.path.join("bands", f"part_{partition:03d}.bin")), "ab") as f:
+                records[partitions == partition].tofile(f)
+
+        # Merge the new hashes into the sorted index (linear, no full re-sort)
+        order = np.argsort(hashes, kind="stable")
+        positions = np.searchsorted(self._sorted_hashes, hashes[order])
+        self._sorted_hashes = np.insert(self._sorted_hashes, positions, hashes[order])
+        self._sorted_ids = np.insert(self._sorted_ids, positions, np.arange(first_id, first_id + len(texts))[order])
+        self.hashes = np.concatenate((self.hashes, hashes))
+        self.lengths = np.concatenate((self.lengths, lengths))
+        self.counts = np.concatenate((self.counts, np.zeros(len(texts))))
+        self.new_phrases += len(texts)
+
+    def cluster(self) -> np.ndarray:
+        """
+        Group similar phrases.
+
+        Returns:
+            Root id of each phrase's cluster
+        """
+        parent = np.arange(self.size, dtype=np.int64)
+        if not self.size:
+            return parent
+        cluster_sizes = np.ones(self.size, dtype=np.int64)
+        signatures = np.memmap(self._path("signatures.u4"), dtype=np.uint32, mode="r", shape=(self.size, NUM_PERMUTATIONS))
+
+        def similar(a: int, b: int) -> bool:
+            return (signatures[a] == signatures[b]).mean() >= self.threshold
+
+        for partition in range(self.num_partitions):
+            path = self._path(os.path.join("bands", f"part_{partition:03d}.bin"))
+            if not os.path.exists(path):
+                continue
+            records = np.fromfile(path, dtype=_BAND_RECORD)
+            records = records[np.argsort(records["key"], kind="stable")]
+            boundaries = np.flatnonzero(np.diff(records["key"])) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(records)]))
+            for start, end in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+                # Verify each bucket member against the bucket's first phrase
+                members = records["id"][start:end].astype(np.int64)
+                leader = int(members[0])
+                similarity = (signatures[members[1:]] == signatures[leader]).mean(axis=1)
+                for other in members[1:][similarity >= self.threshold]:
+                    other = int(other)
+                    # Members always point straight at their root
+                    root_a, root_b = int(parent[leader]), int(parent[other])
+                    if root_a == root_b:
+                        continue
+                    # Only an unclustered phrase joins a cluster, and only if it
+                    # is similar to that cluster's root
+                    if cluster_sizes[root_b] == 1 and similar(other, root_a):
+                        parent[other] = root_a
+                        cluster_sizes[root_a] += 1
+                    elif cluster_sizes[root_a] == 1 and similar(leader, root_b):
+                        parent[leader] = root_b
+                        cluster_sizes[root_b] += 1
+
+        return parent
+
+    def write_normalizations(self, roots: np.ndarray, output_path: str, min_count: float = 0) -> Dict[str, Any]:
+        """
+        Write a phrase,canonical CSV mapping every clustered phrase to its cluster's canonical phrase.
+
+        The canonical phrase is the cluster's most frequent member, then the
+        shortest, then the earliest seen. Phrases counted below ``min_count``
+        in this run are left out.
+        """
+        ids = np.arange(self.size)
+        order = np.lexsort((ids, self.lengths, -self.counts, roots))
+        first_of_root = np.ones(len(order), dtype=bool)
+        first_of_root[1:] = roots[order][1:] != roots[order][:-1]
+        canonical_of_root = np.full(self.size, -1, dtype=np.int64)
+        canonical_of_root[roots[order][first_of_root]] = order[first_of_root]
+        canonical = canonical_of_root[roots]
+
+        cluster_sizes = np.bincount(roots, minlength=self.size)
+        mapped = (canonical != ids) & (cluster_sizes[roots] > 1) & (self.counts >= min_count)
+        needed = set(canonical[mapped].tolist())
+
+        canonical_texts = {}
+        with open(self._path("phrases.txt"), "r", encoding="utf-8") as f:
+            for phrase_id, line in enumerate(f):
+                if phrase_id in needed:
+                    canonical_texts[phrase_id] = line.rstrip("\n")
+
+        rows = 0
+        temporary_path = output_path + ".tmp"
+        with open(self._path("phrases.txt"), "r", encoding="utf-8") as f, \
+                open(temporary_path, "w", encoding="utf-8", newline="") as out:
+            out.write("# Learned by learn_normalizations.py from clustered activity phrases; do not edit by hand.\n")
+            out.write("# Curated variants belong in phrase_synonyms.csv, which overrides this file.\n")
+            writer = csv.writer(out)
+            writer.writerow(["phrase", "canonical"])
+            for phrase_id, line in enumerate(f):
+                if mapped[phrase_id]:
+                    writer.writerow([line.rstrip("\n"), canonical_texts[int(canonical[phrase_id])]])
+                    rows += 1
+        os.replace(temporary_path, output_path)
+
+        return {
+            "phrases": self.size,
+            "clusters": int(np.count_nonzero(cluster_sizes > 1)),
+            "mappings": rows,
+        }
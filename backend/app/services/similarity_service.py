@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import math
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.cache_service import cache_service
+from app.services.term_matrix_service import TermMatrix
+
+# Highest-weighted terms kept in each stored SOC vector
+VECTOR_TERMS = 200
+
+# Terms in fewer of a SOC's postings than this are left out of its vector
+MIN_DOC_COUNT = 2
+
+# Report categories whose terms stand in for term statistics a SOC does not have
+REPORT_CATEGORIES = ("responsibilities", "skills", "qualifications", "unique_aspects")
+
+# Shared terms returned with each similar occupation
+SHARED_TERMS = 5
+
+# How often a request may check whether a newer build should be loaded
+RELOAD_CHECK_SECONDS = 60
+
+
+class SimilarityIndex:
+    """
+    In-memory nearest-neighbour index over the SOC term vectors of one build.
+
+    Rows are L2-normalized, so cosine similarity against every SOC is a
+    single sparse matrix-vector product and the ranking is exact.
+    """
+
+    def __init__(self, build_id: str, soc_codes: List[str], vocabulary: List[str], vectors: sparse.csr_matrix,
+                 built_at: Optional[datetime] = None):
+        self.build_id = build_id
+        self.built_at = built_at
+        self.soc_codes = soc_codes
+        self.soc_index = {soc_code: index for index, soc_code in enumerate(soc_codes)}
+        self.vocabulary = vocabulary
+        self.vectors = vectors
+
+    @classmethod
+    def from_documents(cls, build_id: str, documents: List[Dict[str, Any]],
+                       built_at: Optional[datetime] = None) -> "SimilarityIndex":
+        """Build the index from soc_term_vectors documents of one build."""
+        documents = sorted(documents, key=lambda doc: doc["soc_code"])
+        term_index: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for doc in documents:
+            for term, weight in doc.get("terms", []):
+                indices.append(term_index.setdefault(term, len(term_index)))
+                data.append(weight)
+            indptr.append(len(indices))
+
+        vectors = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(documents), len(term_index))
+        )
+        return cls(build_id, [doc["soc_code"] for doc in documents], list(term_index), vectors, built_at)
+
+    def __contains__(self, soc_code: str) -> bool:
+        return soc_code in self.soc_index
+
+    def most_similar(self, soc_code: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        The k SOC codes whose term vectors are closest to ``soc_code``.
+
+        Returns:
+            List of {"soc_code", "score", "shared_terms"} dictionaries, most similar first
+        """
+        index = self.soc_index.get(soc_code)
+        if index is None:
+            return []
+        row = self.vectors.getrow(index)
+        scores = np.asarray((self.vectors @ row.T).todense()).ravel()
+        scores[index] = -np.inf
+
+        similar = []
+        for other in TermMatrix.top_k(scores, k):
+            if scores[other] <= 0:
+                break
+            overlap = row.multiply(self.vectors.getrow(other)).tocsr()
+            shared = overlap.indices[TermMatrix.top_k(overlap.data, SHARED_TERMS)]
+            similar.append({
+                "soc_code": self.soc_codes[other],
+                "score": round(float(scores[other]), 4),
+                "shared_terms": [self.vocabulary[term] for term in shared],
+            })
+        return similar
+
+
+def weight_vectors(per_soc: List[Dict[str, int]], postings: List[int]) -> Tuple[List[str], sparse.csr_matrix]:
+    """
+    TF-IDF weighted, L2-normalized SOC x term matrix.
+
+    Term frequency is the share of the SOC's postings mentioning the term;
+    inverse document frequency is taken over SOCs, so terms every occupation
+    mentions carry almost no weight. Each row keeps its VECTOR_TERMS
+    highest-weighted terms.
+
+    Args:
+        per_soc: Posting counts of each term, one dictionary per SOC
+        postings: Number of postings behind each SOC's counts
+    """
+    matrix = TermMatrix.from_posting_terms(per_soc)
+    counts = matrix.counts.astype(np.float64)
+    n_socs = counts.shape[0]
+    idf = np.log((1.0 + n_socs) / (1.0 + matrix.document_frequencies()))
+    rows = np.repeat(np.arange(n_socs), np.diff(counts.indptr))
+    counts.data = counts.data / np.maximum(np.asarray(postings, dtype=np.float64)[rows], 1.0) * idf[counts.indices]
+
+    indptr = [0]
+    indices: List[np.ndarray] = []
+    data: List[np.ndarray] = []
+    for row in range(n_socs):
+        start, end = counts.indptr[row], counts.indptr[row + 1]
+        keep = TermMatrix.top_k(counts.data[start:end], VECTOR_TERMS)
+        keep = keep[counts.data[start:end][keep] > 0]
+        weights = counts.data[start:end][keep]
+        norm = math.sqrt(float(weights @ weights)) or 1.0
+        indices.append(counts.indices[start:end][keep])
+        data.append(weights / norm)
+        indptr.append(indptr[-1] + len(keep))
+
+    vectors = sparse.csr_matrix(
+        (np.concatenate(data) if data else np.array([]), np.concatenate(indices) if indices else np.array([], dtype=np.int32), np.array(indptr)),
+        shape=counts.shape
+    )
+    return matrix.vocabulary, vectors
+
+
+def _report_term_counts(report: Dict[str, Any]) -> Dict[str, int]:
+    """Term counts of a stored report, taking the highest count when a term is in several categories."""
+    counts: Dict[str, int] = {}
+    for category in REPORT_CATEGORIES:
+        for item in report.get(category) or []:
+            counts[item["term"]] = max(counts.get(item["term"], 0), int(item.get("count", 0)))
+    return counts
+
+
+async def _load_sources(db) -> Tuple[Dict[str, Dict[str, Any]], str]:
+    """
+    Term counts of every SOC plus a signature of the data they came from.
+
+    Term statistics are used wherever a SOC has them; SOCs known only from
+    cached analysis reports fall back to the report's terms.
+    """
+    totals = {
+        doc["_id"]: doc
+        async for doc in db.soc_term_totals.find({"postings": {"$gt": 0}}, {"postings": 1, "updated_at": 1})
+    }
+    sources = {soc_code: {"source": "term_stats", "postings": doc["postings"], "terms": {}} for soc_code, doc in totals.items()}
+    async for row in db.soc_term_stats.find({"doc_count": {"$gte": MIN_DOC_COUNT}}, {"soc_code": 1, "term": 1, "doc_count": 1}):
+        if row["soc_code"] in sources:
+            sources[row["soc_code"]]["terms"][row["term"]] = row["doc_count"]
+
+    signature = hashlib.md5()
+    for soc_code in sorted(totals):
+        signature.update(f"{soc_code}|{totals[soc_code]['postings']}|{totals[soc_code].get('updated_at')}\n".encode())
+
+    # Newest cached report per SOC without term statistics
+    reports: Dict[str, Dict[str, Any]] = {}
+    for report in cache_service.load_cached_reports():
+        soc_code = report.get("soc_code")
+        if not soc_code or soc_code in totals:
+            continue
+        if soc_code not in reports or report["_cache_metadata"]["modified_at"] > reports[soc_code]["_cache_metadata"]["modified_at"]:
+            reports[soc_code] = report
+    for soc_code in sorted(reports):
+        report = reports[soc_code]
+        sources[soc_code] = {
+            "source": "report",
+            "postings": report.get("total_postings_analyzed") or 1,
+            "terms": _report_term_counts(report),
+        }
+        signature.update(f"{soc_code}|report|{report['_cache_metadata']['modified_at']}\n".encode())
+
+    return {soc_code: source for soc_code, source in sources.items() if source["terms"]}, signature.hexdigest()
+
+
+async def rebuild_soc_vectors(db, force: bool = False) -> Dict[str, Any]:
+    """
+    Precompute the normalized term vector of every SOC for the similarity index.
+
+    Vectors of a build are written under a new build id and the
+    soc_vector_builds pointer is switched only once all of them are stored,
+    so running servers never load a half-written build. Nothing is rebuilt
+    when the term statistics and reports are unchanged since the last build.
+
+    Args:
+        db: Motor database handle
+        force: Rebuild even if the sources are unchanged
+
+    Returns:
+        Summary with the build id and the number of SOC vectors written
+    """
+    sources, signature = await _load_sources(db)
+    latest = await db.soc_vector_builds.find_one({"_id": "latest"})
+    if not force and latest and latest.get("signature") == signature:
+        return {"mode": "unchanged", "build_id": latest["build_id"], "socs_written": 0}
+
+    soc_codes = sorted(sources)
+    vocabulary, vectors = weight_vectors([sources[soc_code]["terms"] for soc_code in soc_codes],
+                                         [sources[soc_code]["postings"] for soc_code in soc_codes])
+
+    built_at = datetime.utcnow()
+    build_id = built_at.strftime("%Y%m%d%H%M%S%f")
+    documents = []
+    for row, soc_code in enumerate(soc_codes):
+        start, end = vectors.indptr[row], vectors.indptr[row + 1]
+        documents.append({
+            "_id": f"{build_id}|{soc_code}",
+            "build_id": build_id,
+            "soc_code": soc_code,
+            "source": sources[soc_code]["source"],
+            "postings": sources[soc_code]["postings"],
+            "terms": [[vocabulary[term], round(float(weight), 6)] for term, weight in zip(vectors.indices[start:end], vectors.data[start:end])],
+        })
+    for start in range(0, len(documents), 500):
+        await db.soc_term_vectors.insert_many(documents[start:start + 500], ordered=False)
+
+    await db.soc_vector_builds.replace_one(
+        {"_id": "latest"},
+        {"build_id": build_id, "signature": signature, "socs": len(documents), "built_at": built_at},
+        upsert=True
+    )
+    await db.soc_term_vectors.delete_many({"build_id": {"$ne": build_id}})
+    return {"mode": "full", "build_id": build_id, "socs_written": len(documents)}
+
+
+_index: Optional[SimilarityIndex] = None
+_index_checked_at = 0.0
+_reload_lock = asyncio.Lock()
+
+
+async def _load_index(db, build: Dict[str, Any]) -> Optional[SimilarityIndex]:
+    documents = await db.soc_term_vectors.find({"build_id": build["build_id"]}, {"soc_code": 1, "terms": 1}).to_list(length=None)
+    if len(documents) != build.get("socs", len(documents)):
+        # The build was replaced while loading; keep serving the current index
+        return None
+    return SimilarityIndex.from_documents(build["build_id"], documents, build.get("built_at"))
+
+
+async def get_similarity_index(db, force_check: bool = False) -> Optional[SimilarityIndex]:
+    """
+    The similarity index of the latest SOC vector build (None if never built).
+
+    At most every RELOAD_CHECK_SECONDS the latest build id is compared with
+    the loaded one; a newer build is loaded in full and then swapped in, so
+    requests always see either the old index or the new one.
+    """
+    global _index, _index_checked_at
+    if not force_check and _index is not None and time.monotonic() - _index_checked_at < RELOAD_CHECK_SECONDS:
+        return _index
+
+    async with _reload_lock:
+        if not force_check and _index is not None and time.monotonic() - _index_checked_at < RELOAD_CHECK_SECONDS:
+            return _index
+        build = await db.soc_vector_builds.find_one({"_id": "latest"})
+        if build and (_index is None or _index.build_id != build["build_id"]):
+            index = await _load_index(db, build)
+            if index is not None:
+                _index = index
+                print(f"🔄 Loaded similarity index {build['build_id']} ({len(index.soc_codes)} SOC codes)")
+        _index_checked_at = time.monotonic()
+    return _index
@@ -0,0 +1,218 @@
+from datetime import datetime
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
+from pymongo import UpdateOne, DESCENDING
+
+from app.core.soc import job_soc_codes
+
+# Fields of a stored posting that decide its contribution to the catalog
+CATALOG_FIELDS = ["JvId", "soc_code", "soc_codes", "OnetCodes", "onet_codes", "Location"]
+
+# DatePosted formats seen from the CareerOneStop API
+DATE_POSTED_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y")
+
+
+def location_key(location: Optional[str]) -> str:
+    """
+    Bucket a posting location for the catalog breakdown: the state of a
+    "City,ST" location, otherwise the location itself. Made safe as a field name.
+    """
+    location = (location or "").strip()
+    if "," in location:
+        location = location.rsplit(",", 1)[1].strip()
+    return location.replace(".", "").lstrip("$") or "Unknown"
+
+
+def posted_date(value: Optional[str]) -> Optional[str]:
+    """DatePosted as an ISO date (YYYY-MM-DD) so it can be compared, or None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        pass
+    for date_format in DATE_POSTED_FORMATS:
+        try:
+            return datetime.strptime(value.split(" ")[0], date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+async def prepare_soc_catalog(db, job_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Work out how new or changed postings change the per-SOC catalog (soc_catalog).
+
+    Each catalog document counts the postings filed under a SOC code
+    (posting_count, any of its SOC codes; search_count, its search soc_code)
+    with a location breakdown, and keeps the latest DatePosted and the last
+    ingest time. Like the term statistics, the stored version of a posting is
+    subtracted and the new one added, so the catalog never needs a full
+    rescan. Nothing is written; see apply_soc_catalog. The posting's write
+    must be conditional on the version read here (see mongodb._write_chunk),
+    or two ingests of one JvId would both subtract the same old version.
+
+    Args:
+        db: Motor database handle
+        job_dicts: Job documents about to be upserted
+
+    Returns:
+        One change per posting: its "jv_id", per-SOC field "increments" and
+        "latest" DatePosted per SOC code
+    """
+    jv_ids = [job["JvId"] for job in job_dicts]
+    previous = {}
+    async for doc in db.jobs.find({"JvId": {"$in": jv_ids}}, {field: 1 for field in CATALOG_FIELDS}):
+        previous[doc["JvId"]] = doc
+
+    changes = []
+    for job in job_dicts:
+        increments: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        latest: Dict[str, str] = {}
+
+        old = previous.get(job["JvId"])
+        if old:
+            for soc_code in job_soc_codes(old):
+                increments[soc_code]["posting_count"] -= 1
+                increments[soc_code][f"locations.{location_key(old.get('Location'))}"] -= 1
+            if old.get("soc_code"):
+                increments[old["soc_code"]]["search_count"] -= 1
+
+        date = posted_date(job.get("DatePosted"))
+        for soc_code in job_soc_codes(job):
+            increments[soc_code]["posting_count"] += 1
+            increments[soc_code][f"locations.{location_key(job.get('Location'))}"] += 1
+            if date:
+                latest[soc_code] = date
+        if job.get("soc_code"):
+            increments[job["soc_code"]]["search_count"] += 1
+
+        changes.append({"jv_id": job["JvId"], "increments": increments, "latest": latest})
+        # Later copies of the same JvId in this batch replace this version
+        previous[job["JvId"]] = job
+
+    return changes
+
+
+async def apply_soc_catalog(db, changes: List[Dict[str, Any]]) -> int:
+    """
+    Apply changes from prepare_soc_catalog with $inc; latest_date_posted only
+    moves forward. Only pass the changes of postings that were actually stored.
+
+    Args:
+        db: Motor database handle
+        changes: Changes returned by prepare_soc_catalog
+
+    Returns:
+        Number of SOC codes updated
+    """
+    increments: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    latest: Dict[str, str] = {}
+    for change in changes:
+        for soc_code, fields in change["increments"].items():
+            for field, delta in fields.items():
+                increments[soc_code][field] += delta
+        for soc_code, date in change["latest"].items():
+            if date > latest.get(soc_code, ""):
+                latest[soc_code] = date
+
+    now = datetime.utcnow()
+    operations = []
+    for soc_code, fields in increments.items():
+        update = {
+            "$inc": {field: delta for field, delta in fields.items() if delta},
+            "$max": {"last_ingest_at": now},
+            "$setOnInsert": {"soc_code": soc_code},
+        }
+        if soc_code in latest:
+            update["$max"]["latest_date_posted"] = latest[soc_code]
+        if not update["$inc"]:
+            del update["$inc"]
+        operations.append(UpdateOne({"_id": soc_code}, update, upsert=True))
+
+    if operations:
+        await db.soc_catalog.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def catalog_entry(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A catalog document for display: no _id, empty location buckets dropped, largest first."""
+    locations = {location: count for location, count in (doc.get("locations") or {}).items() if count > 0}
+    return {
+        "soc_code": doc.get("soc_code", doc["_id"]),
+        "posting_count": doc.get("posting_count", 0),
+        "search_count": doc.get("search_count", 0),
+        "latest_date_posted": doc.get("latest_date_posted"),
+        "last_ingest_at": doc.get("last_ingest_at"),
+        "locations": dict(sorted(locations.items(), key=lambda item: (-item[1], item[0]))),
+    }
+
+
+async def load_soc_catalog(db, sort: str = "posting_count", limit: int = 0) -> List[Dict[str, Any]]:
+    """
+    Load the catalog of SOC codes with postings, largest first.
+
+    Args:
+        db: Motor database handle
+        sort: Count to order by (posting_count or search_count)
+        limit: Maximum number of SOC codes (0 for all)
+
+    Returns:
+        Catalog entries (see catalog_entry) with at least one posting
+    """
+    cursor = db.soc_catalog.find({sort: {"$gt": 0}}).sort([(sort, DESCENDING), ("_id", 1)])
+    if limit:
+        cursor = cursor.limit(limit)
+    return [catalog_entry(doc) async for doc in cursor]
+
+
+async def rebuild_soc_catalog(db) -> int:
+    """
+    Recompute the whole catalog from the postings in one pass over jobs.
+
+    Needed once for postings stored before the catalog existed, or to repair
+    it. Postings inserted while it runs may be missed; run it again after.
+
+    Args:
+        db: Motor database handle
+
+    Returns:
+        Number of SOC codes in the catalog
+    """
+    entries: Dict[str, Dict[str, Any]] = {}
+    now = datetime.utcnow()
+    # Keep the ingest times already recorded; they cannot be recomputed
+    last_ingest = {doc["_id"]: doc.get("last_ingest_at") async for doc in db.soc_catalog.find({}, {"last_ingest_at": 1})}
+
+    def entry(soc_code: str) -> Dict[str, Any]:
+        if soc_code not in entries:
+            entries[soc_code] = {
+                "soc_code": soc_code,
+                "posting_count": 0,
+                "search_count": 0,
+                "locations": defaultdict(int),
+                "latest_date_posted": None,
+                "last_ingest_at": last_ingest.get(soc_code) or now,
+            }
+        return entries[soc_code]
+
+    async for job in db.jobs.find({}, {field: 1 for field in CATALOG_FIELDS + ["DatePosted"]}).batch_size(5000):
+        date = posted_date(job.get("DatePosted"))
+        for soc_code in job_soc_codes(job):
+            soc_entry = entry(soc_code)
+            soc_entry["posting_count"] += 1
+            soc_entry["locations"][location_key(job.get("Location"))] += 1
+            if date and date > (soc_entry["latest_date_posted"] or ""):
+                soc_entry["latest_date_posted"] = date
+        if job.get("soc_code"):
+            entry(job["soc_code"])["search_count"] += 1
+
+    operations = [
+        UpdateOne({"_id": soc_code}, {"$set": {**soc_entry, "locations": dict(soc_entry["locations"])}}, upsert=True)
+        for soc_code, soc_entry in entries.items()
+    ]
+    if operations:
+        await db.soc_catalog.bulk_write(operations, ordered=False)
+    await db.soc_catalog.delete_many({"_id": {"$nin": list(entries)}})
+    return len(entries)
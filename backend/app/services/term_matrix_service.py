@@ -0,0 +1,128 @@
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Term matrices kept in memory, most recently used last
+MATRIX_CACHE_SIZE = 16
+
+_matrix_cache: "OrderedDict[str, TermMatrix]" = OrderedDict()
+
+
+class TermMatrix:
+    """
+    Sparse posting x normalized-term matrix of mention counts (CSR).
+
+    Document frequencies, mention totals and term co-occurrence are column
+    sums and a sparse product over this one matrix, so every category and
+    every request for the same postings share it.
+    """
+
+    def __init__(self, vocabulary: List[str], counts: sparse.csr_matrix, term_sentences: Optional[Dict[str, List[str]]] = None):
+        self.vocabulary = vocabulary
+        self.term_index = {term: index for index, term in enumerate(vocabulary)}
+        self.counts = counts
+        self.presence = counts.copy()
+        self.presence.data = np.ones_like(self.presence.data, dtype=np.int32)
+        self.term_sentences = term_sentences or {}
+        self._document_frequencies = None
+        self._cooccurrence = None
+
+    @classmethod
+    def from_posting_terms(cls, posting_terms: List[Dict[str, int]], term_sentences: Optional[Dict[str, List[str]]] = None) -> "TermMatrix":
+        """
+        Build the matrix from per-posting term counts.
+
+        Columns follow the order in which terms are first seen, so ties in
+        later rankings resolve the same way a stable sort over the postings would.
+        """
+        term_index: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        data: List[int] = []
+        for terms in posting_terms:
+            for term, count in terms.items():
+                indices.append(term_index.setdefault(term, len(term_index)))
+                data.append(count)
+            indptr.append(len(indices))
+
+        counts = sparse.csr_matrix(
+            (np.array(data, dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(posting_terms), len(term_index))
+        )
+        return cls(list(term_index), counts, term_sentences)
+
+    @property
+    def n_postings(self) -> int:
+        return self.counts.shape[0]
+
+    def document_frequencies(self) -> np.ndarray:
+        """Number of postings mentioning each term."""
+        if self._document_frequencies is None:
+            self._document_frequencies = np.asarray(self.presence.sum(axis=0)).ravel()
+        return self._document_frequencies
+
+    def mention_counts(self) -> np.ndarray:
+        """Total mentions of each term across all postings."""
+        return np.asarray(self.counts.sum(axis=0)).ravel()
+
+    def cooccurrence(self) -> sparse.csr_matrix:
+        """Term x term matrix of the number of postings mentioning both terms."""
+        if self._cooccurrence is None:
+            self._cooccurrence = (self.presence.T @ self.presence).tocsr()
+        return self._cooccurrence
+
+    @staticmethod
+    def top_k(values: np.ndarray, k: int, candidates: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Indices of the k largest values, highest first, ties broken by lower index.
+
+        Args:
+            values: One value per term
+            k: Number of indices to return
+            candidates: Restrict the ranking to these term indices
+        """
+        indices = np.arange(len(values)) if candidates is None else np.asarray(candidates, dtype=np.int64)
+        selected = values[indices]
+        if len(indices) > k:
+            # Keep everything tied with the k-th largest value so ties resolve by index
+            threshold = np.partition(selected, len(selected) - k)[len(selected) - k]
+            keep = selected >= threshold
+            indices, selected = indices[keep], selected[keep]
+        return indices[np.lexsort((indices, -selected))[:k]]
+
+    def related_terms(self, term: str, k: int = 10) -> List[Tuple[str, int]]:
+        """Terms most often mentioned in the same postings as ``term``, with the shared posting count."""
+        index = self.term_index.get(term)
+        if index is None:
+            return []
+        row = self.cooccurrence().getrow(index).toarray().ravel()
+        row[index] = 0
+        return [(self.vocabulary[i], int(row[i])) for i in self.top_k(row, k) if row[i] > 0]
+
+
+def posting_fingerprint(posting_sentences: List[List[str]]) -> str:
+    """Hash identifying a set of postings by their sentences, used as the matrix cache key."""
+    digest = hashlib.md5()
+    for sentences in posting_sentences:
+        for sentence in sentences:
+            digest.update(sentence.encode())
+            digest.update(b'\x1f')
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def get_cached_term_matrix(key: str) -> Optional[TermMatrix]:
+    matrix = _matrix_cache.get(key)
+    if matrix is not None:
+        _matrix_cache.move_to_end(key)
+    return matrix
+
+
+def cache_term_matrix(key: str, matrix: TermMatrix):
+    _matrix_cache[key] = matrix
+    _matrix_cache.move_to_end(key)
+    while len(_matrix_cache) > MATRIX_CACHE_SIZE:
+        _matrix_cache.popitem(last=False)
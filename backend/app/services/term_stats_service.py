@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import List, Dict, Any, Tuple
+from collections import defaultdict
+from pymongo import UpdateOne, ASCENDING, DESCENDING
+
+from app.core.soc import job_soc_codes
+from app.services.analysis_service import extract_activities_from_sentences
+from app.services.normalization_service import get_phrase_normalizer
+from app.services.text_service import get_posting_text_and_sentences
+
+# Context sentences kept per (SOC, term) aggregate
+SENTENCE_SAMPLE_SIZE = 5
+
+# Terms loaded per SOC when assembling a report from aggregates
+MAX_REPORT_TERMS = 1000
+
+
+def posting_text(job: Dict[str, Any]) -> str:
+    """Cleaned description plus title, matching what the report generator analyzes."""
+    return get_posting_text_and_sentences(job)[0]
+
+
+def content_hash(job: Dict[str, Any]) -> str:
+    """Hash of the posting text that drives rule-based extraction."""
+    return hashlib.md5(posting_text(job).encode()).hexdigest()
+
+
+def extract_posting_terms(job: Dict[str, Any]) -> Dict[str, str]:
+    """Return each normalized term in a posting mapped to the first sentence it appeared in."""
+    normalizer = get_phrase_normalizer()
+    terms = {}
+    for activity, sentence in extract_activities_from_sentences(get_posting_text_and_sentences(job)[1]):
+        normalized = normalizer.normalize(activity)
+        terms.setdefault(normalized, sentence)
+    return terms
+
+
+def _term_key(soc_code: str, term: str) -> str:
+    return f"{soc_code}|{term}"
+
+
+async def prepare_term_stats(db, job_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Work out how new or changed postings change the per-SOC term statistics.
+
+    Each posting document remembers the content hash, SOC codes and terms it last
+    contributed (content_hash, term_stats_socs, term_stats_terms). Unchanged
+    postings are skipped; for changed ones the old contribution is subtracted and
+    the new one added, so the aggregates never need a full rescan.
+    Near-duplicate copies (dup_canonical False) contribute nothing.
+
+    Nothing is written: job dicts are modified in place with the bookkeeping
+    fields, and the changes are applied with apply_term_stats once the
+    postings themselves are stored. The deltas are only right if the stored
+    version is still the one read here, so the posting's write must be
+    conditional on it (see mongodb._write_chunk).
+
+    Args:
+        db: Motor database handle
+        job_dicts: Job documents about to be upserted
+
+    Returns:
+        One change per (re)extracted posting: its "jv_id", SOC "postings"
+        deltas, (SOC, term) "terms" deltas and new context "sentences"
+    """
+    jv_ids = [job["JvId"] for job in job_dicts]
+    previous = {}
+    async for doc in db.jobs.find(
+        {"JvId": {"$in": jv_ids}},
+        {"JvId": 1, "content_hash": 1, "term_stats_socs": 1, "term_stats_terms": 1}
+    ):
+        previous[doc["JvId"]] = doc
+
+    # Rule-based extraction is CPU-bound; run it in the executor, off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, _term_changes, job_dicts, previous)
+
+
+def _term_changes(job_dicts: List[Dict[str, Any]], previous: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The synchronous part of prepare_term_stats, diffing each posting against its previous version."""
+    changes = []
+    for job in job_dicts:
+        old = previous.get(job["JvId"], {})
+        new_hash = content_hash(job)
+        counted = job.get("dup_canonical", True) is not False
+        new_socs = job_soc_codes(job) if counted else []
+
+        if old.get("content_hash") == new_hash and old.get("term_stats_socs", []) == new_socs:
+            continue
+
+        terms = extract_posting_terms(job) if new_socs else {}
+        change = {"jv_id": job["JvId"], "postings": defaultdict(int), "terms": defaultdict(int), "sentences": {}}
+
+        for soc_code in old.get("term_stats_socs", []):
+            change["postings"][soc_code] -= 1
+            for term in old.get("term_stats_terms", []):
+                change["terms"][(soc_code, term)] -= 1
+
+        for soc_code in new_socs:
+            change["postings"][soc_code] += 1
+            for term, sentence in terms.items():
+                change["terms"][(soc_code, term)] += 1
+                change["sentences"][(soc_code, term)] = sentence
+
+        changes.append(change)
+        job["content_hash"] = new_hash
+        job["term_stats_socs"] = new_socs
+        job["term_stats_terms"] = list(terms)
+        # Later copies of the same JvId in this batch diff against this version
+        previous[job["JvId"]] = dict(job)
+
+    return changes
+
+
+async def apply_term_stats(db, changes: List[Dict[str, Any]]):
+    """
+    Apply changes from prepare_term_stats to the aggregates with $inc.
+
+    Only pass the changes of postings that were actually stored: the
+    aggregates must match the bookkeeping fields on the posting documents.
+
+    Args:
+        db: Motor database handle
+        changes: Changes returned by prepare_term_stats
+    """
+    doc_deltas: Dict[Tuple[str, str], int] = defaultdict(int)
+    sentences: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    posting_deltas: Dict[str, int] = defaultdict(int)
+
+    for change in changes:
+        for soc_code, delta in change["postings"].items():
+            posting_deltas[soc_code] += delta
+        for key, delta in change["terms"].items():
+            doc_deltas[key] += delta
+        for key, sentence in change["sentences"].items():
+            samples = sentences[key]
+            if len(samples) < SENTENCE_SAMPLE_SIZE and sentence not in samples:
+                samples.append(sentence)
+
+    operations = []
+    for (soc_code, term), delta in doc_deltas.items():
+        samples = sentences.get((soc_code, term))
+        if not delta and not samples:
+            continue
+        update = {
+            "$inc": {"doc_count": delta},
+            "$setOnInsert": {"soc_code": soc_code, "term": term},
+        }
+        if samples:
+            update["$push"] = {"sentences": {"$each": samples, "$slice": SENTENCE_SAMPLE_SIZE}}
+        operations.append(UpdateOne({"_id": _term_key(soc_code, term)}, update, upsert=True))
+
+    if operations:
+        await db.soc_term_stats.bulk_write(operations, ordered=False)
+        # Drop terms no posting mentions any more
+        decremented = [_term_key(soc, term) for (soc, term), delta in doc_deltas.items() if delta < 0]
+        if decremented:
+            await db.soc_term_stats.delete_many({"_id": {"$in": decremented}, "doc_count": {"$lte": 0}})
+
+    now = datetime.utcnow()
+    total_operations = [
+        UpdateOne({"_id": soc_code}, {"$inc": {"postings": delta}, "$set": {"updated_at": now}}, upsert=True)
+        for soc_code, delta in posting_deltas.items() if delta
+    ]
+    if total_operations:
+        await db.soc_term_totals.bulk_write(total_operations, ordered=False)
+
+
+async def load_term_stats(db, soc_code: str, limit: int = MAX_REPORT_TERMS) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Load the aggregated term statistics for a SOC code.
+
+    Returns:
+        Tuple of (number of postings aggregated, term documents sorted by doc_count)
+    """
+    totals = await db.soc_term_totals.find_one({"_id": soc_code})
+    total_postings = totals.get("postings", 0) if totals else 0
+    if total_postings <= 0:
+        return 0, []
+
+    cursor = db.soc_term_stats.find(
+        {"soc_code": soc_code},
+        {"term": 1, "doc_count": 1, "sentences": 1}
+    ).sort([("doc_count", DESCENDING), ("_id", ASCENDING)]).limit(limit)
+    terms = await cursor.to_list(length=limit)
+    return total_postings, terms
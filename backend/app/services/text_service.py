@@ -0,0 +1,123 @@
+import re
+import html
+from typing import List, Dict, Any, Tuple
+
+# Script and style blocks are dropped with their content before any other tag is
+# touched: a bare '<' from unescaped text would otherwise open a "tag" that
+# swallows a following block opener.
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', flags=re.DOTALL | re.IGNORECASE)
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', flags=re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Tracking URLs (cloudfront or analytics) in one pass: either match runs to
+# the end of the non-space run, so one alternation removes exactly what the
+# two original passes did.
+_TRACKING_URL_RE = re.compile(
+    r'https?://(?:[^\s]*\.cloudfront\.net[^\s]*|[^\s]*analytics[^\s]*)',
+    flags=re.IGNORECASE
+)
+
+# Tracking attributes, each its own pass in the original order: removing one
+# can join the text around it into a match for the next (e.g. "defer <url> src=").
+_TRACKING_ATTRIBUTE_RES = [
+    re.compile(r'data-[a-zA-Z-]+=[\"\'][^\"\']*[\"\']', flags=re.IGNORECASE),
+    re.compile(r'defer\s+src=', flags=re.IGNORECASE),
+    re.compile(r'script\s+id=', flags=re.IGNORECASE),
+]
+
+_URL_RE = re.compile(r'https?://\S+')
+
+# An email match can only start where a run of non-space characters starts, so
+# anchoring there skips the per-character retries of a bare \S+@ pattern.
+_EMAIL_RE = re.compile(r'(?<!\S)\S+@\S+\.\S+')
+
+
+def clean_html_and_artifacts(text: str) -> str:
+    """
+    Clean HTML tags, script content, and other artifacts from text.
+    
+    Patterns are compiled once and stages that cannot match are skipped. Stages
+    run in the same order as the original per-pattern re.sub passes, so the
+    output is unchanged (see benchmarks/bench_html_cleaning.py).
+    """
+    if not text:
+        return ""
+    
+    # Decode HTML entities
+    text = html.unescape(text)
+    
+    # Remove script and style blocks, then HTML tags (keeping tag content)
+    if '<' in text:
+        text = _SCRIPT_RE.sub('', text)
+        text = _STYLE_RE.sub('', text)
+        text = _TAG_RE.sub(' ', text)
+    
+    # Remove tracking patterns, URLs and emails. Every attribute pattern needs
+    # an '=', which no removal can create.
+    if '://' in text:
+        text = _TRACKING_URL_RE.sub('', text)
+    if '=' in text:
+        for pattern in _TRACKING_ATTRIBUTE_RES:
+            text = pattern.sub('', text)
+    if '://' in text:
+        text = _URL_RE.sub('', text)
+    if '@' in text:
+        text = _EMAIL_RE.sub('', text)
+    
+    # Clean whitespace
+    return ' '.join(text.split())
+
+
+# Bump whenever clean_html_and_artifacts or split_sentences change their output,
+# so stored clean_text/sentences get recomputed (see backfill_clean_text.py)
+CLEANER_VERSION = 2
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split cleaned text into stripped, non-empty sentences."""
+    sentences = []
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        sentence = sentence.strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def build_posting_text(job: Dict[str, Any]) -> str:
+    """Clean a posting's description and title into the text the analysis works on."""
+    text_fields = []
+    
+    if job.get('Description'):
+        text_fields.append(job['Description'])
+    elif job.get('description'):
+        text_fields.append(job['description'])
+    
+    if job.get('JobTitle'):
+        text_fields.append(job['JobTitle'])
+    elif job.get('job_title'):
+        text_fields.append(job['job_title'])
+    
+    return clean_html_and_artifacts(' '.join(text_fields))
+
+
+def annotate_clean_text(job: Dict[str, Any]) -> None:
+    """Store the cleaned posting text and its sentences on a job document, tagged with the cleaner version."""
+    clean_text = build_posting_text(job)
+    job["clean_text"] = clean_text
+    job["sentences"] = split_sentences(clean_text)
+    job["cleaner_version"] = CLEANER_VERSION
+
+
+def get_posting_text_and_sentences(job: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """
+    Return a posting's cleaned text and sentences.
+    
+    Uses the fields precomputed at ingestion when they were produced by the
+    current cleaner version, otherwise cleans and splits the raw description.
+    """
+    if job.get("cleaner_version") == CLEANER_VERSION and "clean_text" in job and "sentences" in job:
+        return job["clean_text"], job["sentences"]
+    clean_text = build_posting_text(job)
+    return clean_text, split_sentences(clean_text)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Script to store the cleaned text and sentences of job postings already in MongoDB.
+New inserts are cleaned at ingestion; this only needs to run for postings ingested
+before that, or after CLEANER_VERSION is bumped.
+"""
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+from app.services.text_service import annotate_clean_text, CLEANER_VERSION
+
+BATCH_SIZE = 500
+
+
+async def backfill_clean_text():
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+
+    try:
+        # Postings never cleaned, or cleaned by an older cleaner version
+        query = {"cleaner_version": {"$ne": CLEANER_VERSION}}
+        pending = await db.jobs.count_documents(query)
+        print(f"📊 {pending} job postings need cleaning (cleaner version {CLEANER_VERSION})")
+
+        processed = 0
+        cursor = db.jobs.find(
+            query,
+            {"Description": 1, "description": 1, "JobTitle": 1, "job_title": 1}
+        ).batch_size(BATCH_SIZE)
+        operations = []
+        async for job in cursor:
+            annotate_clean_text(job)
+            operations.append(UpdateOne(
+                {"_id": job["_id"]},
+                {"$set": {
+                    "clean_text": job["clean_text"],
+                    "sentences": job["sentences"],
+                    "cleaner_version": job["cleaner_version"],
+                }}
+            ))
+            if len(operations) >= BATCH_SIZE:
+                await db.jobs.bulk_write(operations, ordered=False)
+                processed += len(operations)
+                operations = []
+                print(f"  ✅ {processed}/{pending} postings cleaned")
+        if operations:
+            await db.jobs.bulk_write(operations, ordered=False)
+            processed += len(operations)
+
+        print(f"🎉 Backfill complete! Cleaned {processed} postings.")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_clean_text())
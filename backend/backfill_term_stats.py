@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script to build the per-SOC term statistics for job postings already in MongoDB.
+New inserts maintain the statistics incrementally; this only needs to run once
+for postings ingested before term statistics existed (or after they were dropped).
+Run with --rebuild after changing the extraction lexicon or phrase normalization.
+"""
+import argparse
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+from app.services.term_stats_service import prepare_term_stats, apply_term_stats
+
+BATCH_SIZE = 500
+
+
+async def backfill_term_stats(rebuild: bool = False):
+    # Load environment variables
+    load_dotenv()
+    
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+    
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+    
+    try:
+        if rebuild:
+            # Start over: drop the aggregates and every posting's bookkeeping fields
+            await db.soc_term_stats.drop()
+            await db.soc_term_totals.drop()
+            await db.jobs.update_many(
+                {"content_hash": {"$exists": True}},
+                {"$unset": {"content_hash": "", "term_stats_socs": "", "term_stats_terms": ""}}
+            )
+            print("🧹 Dropped existing term statistics")
+        
+        # Only postings without bookkeeping fields need processing
+        query = {"content_hash": {"$exists": False}}
+        pending = await db.jobs.count_documents(query)
+        print(f"📊 {pending} job postings need term statistics")
+        
+        processed = 0
+        cursor = db.jobs.find(query).batch_size(BATCH_SIZE)
+        batch = []
+        async for job in cursor:
+            batch.append(job)
+            if len(batch) >= BATCH_SIZE:
+                processed += await _flush(db, batch)
+                batch = []
+                print(f"  ✅ {processed}/{pending} postings processed")
+        if batch:
+            processed += await _flush(db, batch)
+        
+        print(f"🎉 Backfill complete! Extracted terms from {processed} postings.")
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+async def _flush(db, batch):
+    """Persist the bookkeeping fields for a batch, then fold it into the term statistics."""
+    changes = await prepare_term_stats(db, batch)
+    operations = [
+        UpdateOne(
+            {"_id": job["_id"]},
+            {"$set": {
+                "content_hash": job["content_hash"],
+                "term_stats_socs": job["term_stats_socs"],
+                "term_stats_terms": job["term_stats_terms"],
+            }}
+        )
+        for job in batch if "content_hash" in job
+    ]
+    if operations:
+        await db.jobs.bulk_write(operations, ordered=False)
+    await apply_term_stats(db, changes)
+    return len(changes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-SOC term statistics for stored job postings")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the existing statistics and rebuild them from every posting")
+    args = parser.parse_args()
+    asyncio.run(backfill_term_stats(args.rebuild))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the analyze query with whole documents against the analysis projection.
+
+Needs a running MongoDB (DATABASE_URL). Fills a scratch database with synthetic
+postings shaped like real ones (HTML description, MetaData blob and the fields
+derived at ingestion), then runs the analyze query for one SOC code both ways,
+reporting the BSON bytes received from the server and the latency. The
+projected documents are checked to give the same cleaned text as the full ones.
+The scratch database is dropped afterwards unless --keep is given.
+
+Run from backend/:
+    python -m benchmarks.bench_analyze_projection --documents 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from bson import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+
+from app.core.soc import soc_filter
+from app.db.mongodb import ANALYSIS_FIELDS, build_projection
+from app.services.dedup_service import minhash_signature
+from app.services.text_service import annotate_clean_text, get_posting_text_and_sentences
+
+SOC_CODES = ["15-1252.00", "29-1141.00", "47-2111.00", "13-1082.00"]
+LIMIT = 100
+
+WORDS = ("design develop maintain patient care install wiring manage budget review code test deploy "
+         "coordinate schedule customer support analyze data report team lead safety compliance").split()
+
+
+def make_posting(i: int, rng: random.Random):
+    paragraphs = "".join(
+        f"<p><strong>{rng.choice(WORDS).title()}</strong> {' '.join(rng.choices(WORDS, k=rng.randint(30, 80)))}.</p>"
+        for _ in range(rng.randint(8, 20))
+    )
+    soc_code = rng.choice(SOC_CODES)
+    posting = {
+        "JvId": f"bench-{i}",
+        "JobTitle": f"{rng.choice(WORDS).title()} Specialist",
+        "Company": f"Company {rng.randint(1, 300)}",
+        "Location": rng.choice(["Austin,TX", "Washington,DC", "Denver,CO"]),
+        "URL": f"https://example.com/jobs/{i}",
+        "Description": f"<div class=\"posting\">{paragraphs}<ul>{'<li>benefit</li>' * 10}</ul></div>",
+        "MetaData": {"Publisher": "CareerOneStop", "DataSource": [{"DataName": "jobs", "DataDescription": "x" * 2000}]},
+        "soc_code": soc_code,
+        "soc_all": [soc_code],
+        "dup_canonical": True,
+    }
+    annotate_clean_text(posting)
+    posting["minhash"] = minhash_signature(posting["clean_text"])
+    return posting
+
+
+async def run_query(collection, projection, repeats: int):
+    raw = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+    query = {**soc_filter(SOC_CODES[0]), "dup_canonical": {"$ne": False}}
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        documents = await raw.find(query, projection).limit(LIMIT).to_list(length=LIMIT)
+        timings.append(time.perf_counter() - start)
+    return timings, sum(len(document.raw) for document in documents), documents
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--database", default="occupation100_bench")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("DATABASE_URL", "mongodb://localhost:27017"))
+    db = client[args.database]
+    collection = db.jobs
+
+    try:
+        await collection.drop()
+        rng = random.Random(11)
+        documents = [make_posting(i, rng) for i in range(args.documents)]
+        for start in range(0, len(documents), 1000):
+            await collection.insert_many(documents[start:start + 1000], ordered=False)
+        await collection.create_index([("soc_all", ASCENDING)])
+        print(f"📊 {len(documents)} postings in {args.database}")
+
+        full_timings, full_bytes, full_documents = await run_query(collection, None, args.repeats)
+        projected_timings, projected_bytes, projected_documents = await run_query(collection, build_projection(ANALYSIS_FIELDS), args.repeats)
+
+        print(f"  whole documents:     {full_bytes / 1024:9.1f} KiB   median {statistics.median(full_timings) * 1000:7.2f}ms")
+        print(f"  analysis projection: {projected_bytes / 1024:9.1f} KiB   median {statistics.median(projected_timings) * 1000:7.2f}ms")
+        print(f"  {full_bytes / max(projected_bytes, 1):.1f}x fewer bytes, "
+              f"{statistics.median(full_timings) / statistics.median(projected_timings):.2f}x faster")
+
+        full_text = [get_posting_text_and_sentences(dict(document)) for document in full_documents]
+        projected_text = [get_posting_text_and_sentences(dict(document)) for document in projected_documents]
+        assert full_text == projected_text, "projected postings give different analysis text"
+        print("✅ Projected postings give the same analysis text")
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
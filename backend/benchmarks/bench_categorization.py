@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark the keyword-indexed categorizer as category lexicons grow.
+
+Times KeywordCategorizer against the original any(word in activity) scans
+with the default rules and with every category padded to thousands of
+synthetic keywords, and reports how often the two agree on the default
+rules (they differ by design: whole-word matching, weights and context).
+
+Run from backend/:
+    python -m benchmarks.bench_categorization --activities 20000
+"""
+import argparse
+import random
+import time
+
+from app.services.categorization_service import KeywordCategorizer, load_category_rules
+from benchmarks.bench_fallback_parallel import make_postings
+
+
+def legacy_categorize(activity, context, lists):
+    activity_lower = activity.lower()
+    for category, words in lists:
+        if any(word in activity_lower for word in words):
+            return category
+    return 'responsibilities'
+
+
+LEGACY_LISTS = [
+    ('responsibilities', ['coordinate', 'provide', 'maintain', 'manage', 'monitor', 'install', 'connect', 'analyze', 'develop', 'perform', 'conduct']),
+    ('skills', ['python', 'java', 'javascript', 'sql', 'excel', 'software', 'programming', 'coding']),
+    ('qualifications', ['degree', 'bachelor', 'master', 'experience', 'years', 'certification', 'license']),
+    ('unique_aspects', ['benefits', 'remote', 'flexible', 'culture', 'salary', 'bonus']),
+]
+
+
+def padded_rules(rules, per_category: int, seed: int = 3):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    keywords = {}
+    for category, terms in rules["keywords"].items():
+        grown = dict(terms)
+        while len(grown) < per_category:
+            grown["".join(rng.choice(letters) for _ in range(rng.randint(5, 10)))] = 1
+        keywords[category] = grown
+    return {**rules, "keywords": keywords}
+
+
+def padded_legacy_lists(rules):
+    return [(category, list(rules["keywords"][category])) for category, _ in LEGACY_LISTS]
+
+
+def timed(categorize, items) -> float:
+    start = time.perf_counter()
+    for activity, context in items:
+        categorize(activity, context)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activities", type=int, default=20000)
+    parser.add_argument("--lexicon-sizes", type=int, nargs="*", default=[1000, 5000])
+    args = parser.parse_args()
+
+    sentences = [sentence for posting in make_postings(args.activities // 10 + 1) for sentence in posting]
+    rng = random.Random(9)
+    items = [(sentence[:80].lower(), " ".join(rng.sample(sentences, 3))) for sentence in sentences[:args.activities]]
+    print(f"📊 {len(items)} activities with 3 context sentences each")
+
+    rules = load_category_rules()
+    categorizer = KeywordCategorizer(rules)
+    agree = sum(categorizer.categorize(a, c) == legacy_categorize(a, c, LEGACY_LISTS) for a, c in items)
+    print(f"  agreement with legacy rules: {100 * agree / len(items):.1f}%")
+    print(f"  default rules: index {timed(categorizer.categorize, items):6.2f}s   "
+          f"any() scans {timed(lambda a, c: legacy_categorize(a, c, LEGACY_LISTS), items):6.2f}s")
+
+    for size in args.lexicon_sizes:
+        grown = padded_rules(rules, size)
+        grown_categorizer = KeywordCategorizer(grown)
+        lists = padded_legacy_lists(grown)
+        print(f"  {size:5d} terms/category: index {timed(grown_categorizer.categorize, items):6.2f}s   "
+              f"any() scans {timed(lambda a, c: legacy_categorize(a, c, lists), items):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Golden-output check and throughput benchmark for rule-based activity extraction.
+
+Compares the compiled ActivityExtractor (default lexicon) against the original
+four-regex loop on synthetic postings and exits non-zero if any output differs.
+It then grows the verb lexicon with synthetic verbs to show that the trie-based
+scan keeps its speed while a flat alternation slows down with lexicon size.
+
+Run from backend/:
+    python -m benchmarks.bench_extraction --postings 2000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from app.services.extraction_service import ActivityExtractor, load_extraction_lexicon
+from app.services.text_service import split_sentences
+from benchmarks.bench_fallback_parallel import make_postings
+
+
+def legacy_extract(sentences):
+    """The original per-sentence loop over four patterns, kept as the golden reference."""
+    activities_with_context = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if len(sentence) < 20:
+            continue
+        sentence_lower = sentence.lower()
+        patterns = [
+            r'responsible for ([^,]{20,100})',
+            r'duties include ([^,]{20,100})',
+            r'will ([a-z\s]{15,80}(?:patients|clients|systems|equipment|data|wiring|electrical)[^,]{0,40})',
+            r'((?:coordinate|provide|maintain|manage|monitor|install|connect|analyze|develop)[^,]{20,100})',
+        ]
+        for pattern in patterns:
+            for match in re.finditer(pattern, sentence_lower, re.IGNORECASE):
+                activity = match.group(1).strip()
+                if 20 <= len(activity) <= 100:
+                    activity = re.sub(r'\s+', ' ', activity)
+                    if not any(artifact in activity for artifact in ['script', 'http', 'www']):
+                        activities_with_context.append((activity, sentence))
+    return activities_with_context
+
+
+EXTRA_SENTENCES = [
+    "You will coordinate with the managers, develop schedules and maintain equipment for clients",
+    "Responsible for responsible for installing panels and duties include monitoring wiring systems",
+    "The technician will be monitoring http://example.com systems and www portals for clients daily",
+    "Provide provide provide maintenance to connect connecting systems, install, analyze data quickly",
+    "Duties include: overseeing   multiple\tcrews and managing equipment inventories across sites",
+]
+
+
+def make_sentences(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    postings = []
+    for sentences in make_postings(count, seed):
+        extra = [rng.choice(EXTRA_SENTENCES) for _ in range(rng.randint(0, 4))]
+        postings.append(sentences + extra)
+    return postings
+
+
+def synthetic_verbs(count: int, seed: int = 13):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(5, 11))) for _ in range(count)]
+
+
+def timed(extract, postings, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sentences in postings:
+            extract(sentences)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def flat_alternation_extract(verbs):
+    pattern = re.compile('((?:' + '|'.join(map(re.escape, verbs)) + r')[^,]{20,100})', re.IGNORECASE)
+
+    def extract(sentences):
+        return [match.group(1) for sentence in sentences for match in pattern.finditer(sentence.lower())]
+    return extract
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postings", type=int, default=2000)
+    parser.add_argument("--lexicon-sizes", type=int, nargs="*", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    postings = make_sentences(args.postings)
+    print(f"📊 {len(postings)} synthetic postings, {sum(map(len, postings))} sentences")
+
+    lexicon = load_extraction_lexicon()
+    extractor = ActivityExtractor(lexicon)
+    mismatches = 0
+    for index, sentences in enumerate(postings):
+        if extractor.extract(sentences) != legacy_extract(sentences):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  ❌ posting {index} differs")
+
+    legacy_time = timed(legacy_extract, postings)
+    compiled_time = timed(extractor.extract, postings)
+    print(f"  legacy extraction:   {legacy_time:6.2f}s")
+    print(f"  compiled extraction: {compiled_time:6.2f}s  (x{legacy_time / compiled_time:.2f})")
+
+    print("📈 Verb lexicon scaling (trie scan vs flat alternation):")
+    for size in args.lexicon_sizes:
+        verbs = lexicon["activity_verbs"] + synthetic_verbs(max(0, size - len(lexicon["activity_verbs"])))
+        grown = ActivityExtractor({**lexicon, "activity_verbs": verbs})
+        trie_time = timed(grown.extract, postings, repeat=1)
+        flat_time = timed(flat_alternation_extract(verbs), postings, repeat=1)
+        print(f"  {len(verbs):5d} verbs: trie {trie_time:6.2f}s   flat alternation {flat_time:6.2f}s")
+
+    if mismatches:
+        print(f"❌ {mismatches} of {len(postings)} postings differ from the golden reference")
+        sys.exit(1)
+    print("✅ All outputs match the golden reference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the rule-based fallback extraction across process-pool sizes.
+
+Generates synthetic postings, runs the serial path and the process pool with
+increasing worker counts, checks the merged results match the serial ones
+exactly, and prints wall time and speedup.
+
+Run from backend/:
+    python -m benchmarks.bench_fallback_parallel --postings 10000
+"""
+import argparse
+import os
+import random
+import time
+
+from app.services.analysis_service import aggregate_activities, aggregate_activities_parallel, PARALLEL_MIN_POSTINGS
+from app.services.text_service import split_sentences
+
+SENTENCE_TEMPLATES = [
+    "Responsible for {verb} {noun} across multiple {site} locations every week",
+    "Duties include {verb} {noun} and documenting results for the {site} team",
+    "You will work closely with {site} staff to support patients and clients with {noun}",
+    "{verb} {noun} in accordance with company policy and local {site} regulations",
+    "Candidates should have strong communication skills and attention to detail",
+]
+VERBS = ["coordinate", "provide", "maintain", "manage", "monitor", "install", "connect", "analyze", "develop"]
+NOUNS = ["electrical systems", "patient records", "network equipment", "financial data", "wiring and conduit", "software releases"]
+SITES = ["hospital", "commercial", "industrial", "residential", "corporate", "field"]
+
+
+def make_postings(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    postings = []
+    for _ in range(count):
+        sentences = [
+            rng.choice(SENTENCE_TEMPLATES).format(verb=rng.choice(VERBS), noun=rng.choice(NOUNS), site=rng.choice(SITES))
+            for _ in range(rng.randint(8, 20))
+        ]
+        postings.append(split_sentences(". ".join(sentences) + "."))
+    return postings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postings", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="*", default=None,
+                        help="Worker counts to try (default: 1, 2, 4, ... up to the core count)")
+    args = parser.parse_args()
+
+    postings = make_postings(args.postings)
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, *[2 ** i for i in range(1, cores.bit_length()) if 2 ** i <= cores], cores})
+
+    print(f"📊 {len(postings)} synthetic postings, {cores} cores available")
+
+    start = time.perf_counter()
+    serial = aggregate_activities(postings)
+    serial_time = time.perf_counter() - start
+    print(f"  serial:     {serial_time:7.2f}s  ({len(serial[1])} distinct activities)")
+
+    for workers in worker_counts:
+        if workers <= 1:
+            continue
+        # The pool is started once and reused; keep its start-up out of the timing
+        aggregate_activities_parallel(postings[:PARALLEL_MIN_POSTINGS], max_workers=workers)
+        start = time.perf_counter()
+        result = aggregate_activities_parallel(postings, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        assert result == serial, f"parallel result with {workers} workers differs from serial"
+        print(f"  {workers:2d} workers: {elapsed:7.2f}s  speedup x{serial_time / elapsed:.2f}  ✅ matches serial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Golden-output check and throughput benchmark for clean_html_and_artifacts.
+
+Compares the compiled cleaner against the original ten-pass implementation on
+every description in the corpus and reports throughput in MB/s for both.
+Exits non-zero if any output differs.
+
+The corpus is the stored postings in MongoDB (DATABASE_URL) with --from-mongo,
+otherwise a synthetic HTML corpus with scripts, tracking links and emails.
+
+With --check only the golden comparison runs (no timing), quick enough to
+gate CI on every change to the cleaner.
+
+Run from backend/:
+    python -m benchmarks.bench_html_cleaning --from-mongo --limit 5000
+    python -m benchmarks.bench_html_cleaning --check
+"""
+import argparse
+import asyncio
+import html
+import random
+import re
+import sys
+import time
+
+from app.services.text_service import clean_html_and_artifacts
+
+
+def legacy_clean_html_and_artifacts(text: str) -> str:
+    """The original multi-pass cleaner, kept as the golden reference."""
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    tracking_patterns = [
+        r'https?://[^\s]*\.cloudfront\.net[^\s]*',
+        r'https?://[^\s]*analytics[^\s]*',
+        r'data-[a-zA-Z-]+=[\"\'][^\"\']*[\"\']',
+        r'defer\s+src=', r'script\s+id=',
+    ]
+    for pattern in tracking_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'https?://\S+', '', text)
+    text = re.sub(r'\S+@\S+\.\S+', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+FRAGMENTS = [
+    "<p>Responsible for maintaining electrical systems &amp; panels.</p>",
+    "<ul><li>Provide direct patient care</li><li>Monitor vital signs</li></ul>",
+    "<script type=\"text/javascript\">var x = '<b>tracking</b>'; track();</script>",
+    "<STYLE>.job { color: red; }</STYLE>",
+    "Apply at https://careers.example.com/jobs/123?ref=abc today!",
+    "<img src=\"https://d1234.cloudfront.net/pixel.gif\" data-track=\"yes\">",
+    "Visit HTTPS://Analytics.Example.com/t?id=9 for more.",
+    "Questions? Email jobs@example.com or hr.team@corp.example.org.",
+    "<div data-job-id='42'>Duties include coordinating schedules &nbsp; and reports.</div>",
+    "Candidates will analyze data for clients\n\n\tin a fast-paced   environment.",
+    "defer src= script id= leftover attribute text",
+    "&lt;b&gt;escaped markup&lt;/b&gt; and 5 &lt; 7 comparisons",
+    "<a href=\"mailto:someone@example.com\">someone@example.com</a>",
+    "Benefits: 401(k), health, dental &#8211; vision.",
+    # Removing a tracking URL joins its neighbours into an attribute pattern
+    "Apply: defer https://d1.cloudfront.net/x.js src= now",
+    "script https://x.analytics.io/p id= tail",
+    "<span data-x=\"https://d1.cloudfront.net/p\" title=\"quoted\">text</span> and data-y=\"https://d1.cloudfront.net/q\" then \"quoted\" words",
+]
+
+
+def synthetic_corpus(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(10, 60))) for _ in range(count)]
+
+
+async def mongo_corpus(limit: int):
+    import os
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ["DATABASE_URL"])
+    try:
+        cursor = client.occupation100.jobs.find({"Description": {"$type": "string"}}, {"Description": 1}).limit(limit)
+        return [doc["Description"] async for doc in cursor]
+    finally:
+        client.close()
+
+
+def throughput(cleaner, corpus, total_mb: float, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            cleaner(text)
+        best = min(best, time.perf_counter() - start)
+    return total_mb / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from-mongo", action="store_true", help="Use stored postings instead of the synthetic corpus")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--check", action="store_true", help="Only compare outputs with the golden reference; skip the throughput runs")
+    args = parser.parse_args()
+
+    corpus = asyncio.run(mongo_corpus(args.limit)) if args.from_mongo else synthetic_corpus(args.limit)
+    total_mb = sum(len(text.encode("utf-8")) for text in corpus) / (1024 * 1024)
+    print(f"📊 {len(corpus)} descriptions, {total_mb:.1f} MB")
+
+    mismatches = 0
+    for index, text in enumerate(corpus):
+        expected = legacy_clean_html_and_artifacts(text)
+        actual = clean_html_and_artifacts(text)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  ❌ description {index} differs:\n     expected: {expected[:200]!r}\n     actual:   {actual[:200]!r}")
+
+    if args.check:
+        report_mismatches(mismatches, len(corpus))
+        return
+
+    legacy_rate = throughput(legacy_clean_html_and_artifacts, corpus, total_mb)
+    compiled_rate = throughput(clean_html_and_artifacts, corpus, total_mb)
+    print(f"  legacy cleaner:   {legacy_rate:7.1f} MB/s")
+    print(f"  compiled cleaner: {compiled_rate:7.1f} MB/s  (x{compiled_rate / legacy_rate:.2f})")
+    report_mismatches(mismatches, len(corpus))
+
+
+def report_mismatches(mismatches: int, total: int):
+    """Print the golden-check verdict, exiting non-zero on any difference."""
+    if mismatches:
+        print(f"❌ {mismatches} of {total} outputs differ from the golden reference")
+        sys.exit(1)
+    print("✅ All outputs match the golden reference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark the job insert pipeline in documents per second.
+
+Validation is timed first, per job (the old Job(**job) loop) against one
+TypeAdapter call per insert chunk; this part needs no database. Then, if a MongoDB is
+reachable (DATABASE_URL), each size is ingested into a scratch database
+three times: fresh inserts, an identical re-ingest (skipped by content
+hash) and a re-ingest with every tenth posting edited, and once more into
+an empty collection as a gzip NDJSON stream read in 64 KiB pieces (the
+/insert/stream path). The three ingests also check that the near-duplicate
+caches stay bounded by the chunks in flight, exiting non-zero otherwise.
+The scratch database is dropped afterwards unless --keep is given.
+
+Run from backend/:
+    python -m benchmarks.bench_insert --sizes 10000 100000
+"""
+import argparse
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.indexes import ensure_indexes
+from app.db.mongodb import JobIngest, validate_jobs, INSERT_CHUNK_SIZE, INSERT_CONCURRENCY
+from app.models.pydantic_models import Job
+from app.services.ingest_service import ingest_ndjson
+
+WORDS = ("design develop maintain patient care install wiring manage budget review code test deploy "
+         "coordinate schedule customer support analyze data report team lead safety compliance").split()
+SOC_CODES = ["15-1252.00", "29-1141.00", "47-2111.00", "13-1082.00", "27-1024.00"]
+
+
+def make_jobs(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        soc_code = rng.choice(SOC_CODES)
+        sentences = [f"Responsible for {' '.join(rng.choices(WORDS, k=rng.randint(4, 10)))}" for _ in range(rng.randint(5, 15))]
+        jobs.append({
+            "JvId": f"bench-{i}",
+            "JobTitle": f"{rng.choice(WORDS).title()} Specialist",
+            "Company": f"Company {rng.randint(1, 500)}",
+            "AccquisitionDate": "2025-06-01",
+            "URL": f"https://example.com/jobs/{i}",
+            "Location": rng.choice(["Austin,TX", "Washington,DC", "Denver,CO"]),
+            "Fc": "x",
+            "DatePosted": "2025-06-01",
+            "Description": "<p>" + ". ".join(sentences) + f". Reference {i}.</p>",
+            "OnetCodes": [soc_code],
+            "soc_codes": [soc_code],
+            "soc_code": soc_code,
+        })
+    return jobs
+
+
+def legacy_validate(jobs):
+    """The old up-front per-job validation, printing the payload of every rejected job."""
+    valid = []
+    for job_data in jobs:
+        try:
+            valid.append(Job(**job_data).model_dump(by_alias=True))
+        except Exception as e:
+            print(f"Error processing job data: {job_data}. Error: {e}")
+    return len(valid)
+
+
+def validate_in_chunks(jobs):
+    """Validation as the insert pipeline runs it, one chunk at a time."""
+    valid = 0
+    for start in range(0, len(jobs), INSERT_CHUNK_SIZE):
+        valid += len(validate_jobs(jobs[start:start + INSERT_CHUNK_SIZE], offset=start)[0])
+    return valid
+
+
+def best_time(function, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_validation(jobs):
+    invalid = [dict(job, Company=None) if i % 20 == 0 else job for i, job in enumerate(jobs)]
+    for label, batch in (("valid", jobs), ("5% invalid", invalid)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            per_job = best_time(lambda: legacy_validate(batch))
+            adapter = best_time(lambda: validate_in_chunks(batch))
+        print(f"  validation {label:<11} per job {len(batch) / per_job:9.0f} docs/s   TypeAdapter {len(batch) / adapter:9.0f} docs/s")
+
+
+async def timed_insert(jobs, db, label: str) -> bool:
+    """
+    Ingest the jobs as insert_jobs_from_job_set does, also checking that the
+    near-duplicate caches only ever hold the chunks still being written.
+    """
+    ingest = JobIngest(db)
+    bound = (INSERT_CONCURRENCY + 1) * INSERT_CHUNK_SIZE
+    peak = 0
+    start = time.perf_counter()
+    for offset in range(0, len(jobs), INSERT_CHUNK_SIZE):
+        await ingest.add_chunk(jobs[offset:offset + INSERT_CHUNK_SIZE], offset=offset)
+        peak = max(peak, len(ingest._signature_cache))
+    result = await ingest.finish()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {len(jobs) / elapsed:10.0f} docs/s   ({result.message})")
+    bounded = peak <= bound and not ingest._signature_cache and not ingest._bucket_cache
+    if not bounded:
+        print(f"  ❌ Signature cache peaked at {peak} entries (bound {bound}), {len(ingest._signature_cache)} left after the ingest")
+    return bounded
+
+
+async def timed_stream(jobs, db, label: str):
+    body = gzip.compress("".join(json.dumps(job) + "\n" for job in jobs).encode())
+
+    async def pieces():
+        for start in range(0, len(body), 64 * 1024):
+            yield body[start:start + 64 * 1024]
+
+    start = time.perf_counter()
+    result = await ingest_ndjson(pieces(), compressed=True, db=db)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {len(jobs) / elapsed:10.0f} docs/s   ({result.message})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--database", default="occupation100_bench")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("DATABASE_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=3000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        print(f"⚠️ No MongoDB reachable ({e}); only validation is benchmarked")
+        client = None
+
+    failed = False
+    try:
+        for size in args.sizes:
+            jobs = make_jobs(size)
+            print(f"📊 {size} jobs")
+            bench_validation(jobs)
+            if client is None:
+                continue
+
+            await client.drop_database(args.database)
+            db = client[args.database]
+            await ensure_indexes(db)
+            bounded = await timed_insert(jobs, db, "fresh insert")
+            bounded &= await timed_insert(jobs, db, "unchanged re-ingest")
+            for job in jobs[::10]:
+                job["Description"] += " Updated."
+            bounded &= await timed_insert(jobs, db, "10% edited re-ingest")
+            if not bounded:
+                failed = True
+            await db.jobs.delete_many({})
+            await timed_stream(jobs, db, "gzip NDJSON stream")
+    finally:
+        if client is not None:
+            if not args.keep:
+                await client.drop_database(args.database)
+            client.close()
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Aho-Corasick phrase normalizer against a naive substring loop.
+
+Builds a synthetic dictionary (20k phrases by default) plus the real
+NORMALIZATION_DICT, checks the automaton reports exactly the phrase
+occurrences a brute-force scan of every word window finds, and compares
+throughput with looping over the dictionary for each sentence.
+
+Run from backend/:
+    python -m benchmarks.bench_normalization --entries 20000
+"""
+import argparse
+import random
+import sys
+import time
+
+from app.services.normalization_service import NORMALIZATION_DICT, PhraseNormalizer, tokenize
+
+WORDS = [
+    "install", "maintain", "electrical", "wire", "conduit", "patient", "care", "data", "analysis",
+    "customer", "service", "project", "management", "network", "systems", "repair", "equipment",
+    "schedule", "reports", "safety", "inspection", "training", "records", "software", "testing",
+]
+
+
+def synthetic_dictionary(entries: int, seed: int = 21):
+    rng = random.Random(seed)
+    vocabulary = WORDS + [f"term{i}" for i in range(entries // 4)]
+    phrases = dict(NORMALIZATION_DICT)
+    while len(phrases) < entries:
+        phrase = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4)))
+        phrases.setdefault(phrase, f"canonical {len(phrases) % 500}")
+    return phrases
+
+
+def synthetic_sentences(count: int, phrases, seed: int = 22):
+    rng = random.Random(seed)
+    keys = list(phrases)
+    sentences = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(3, 8)):
+            parts.append(rng.choice(keys) if rng.random() < 0.3 else " ".join(rng.choices(WORDS, k=3)))
+        sentences.append(" ".join(parts))
+    return sentences
+
+
+def brute_force_occurrences(phrases, text):
+    """Every (start, end, canonical) found by checking each word window against the dictionary."""
+    by_tokens = {}
+    for phrase, canonical in phrases.items():
+        by_tokens.setdefault(tuple(tokenize(phrase)), canonical)
+    longest = max(len(tokens) for tokens in by_tokens)
+    tokens = tokenize(text)
+    found = []
+    for start in range(len(tokens)):
+        for end in range(start + 1, min(len(tokens), start + longest) + 1):
+            canonical = by_tokens.get(tuple(tokens[start:end]))
+            if canonical is not None:
+                found.append((start, end, canonical))
+    return sorted(found)
+
+
+def naive_substring_scan(phrases, text):
+    """The O(entries x text) approach: test every dictionary phrase against the sentence."""
+    padded = f" {' '.join(tokenize(text))} "
+    return [canonical for phrase, canonical in phrases.items() if f" {phrase} " in padded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--sentences", type=int, default=5000)
+    parser.add_argument("--naive-sentences", type=int, default=200, help="Sentences timed with the naive loop (it is slow)")
+    args = parser.parse_args()
+
+    phrases = synthetic_dictionary(args.entries)
+    sentences = synthetic_sentences(args.sentences, phrases)
+
+    start = time.perf_counter()
+    normalizer = PhraseNormalizer(phrases)
+    build_time = time.perf_counter() - start
+    print(f"📊 {len(phrases)} phrases ({len(normalizer._goto)} automaton nodes) built in {build_time:.2f}s")
+
+    mismatches = 0
+    for sentence in sentences[:1000]:
+        if sorted(normalizer._occurrences(tokenize(sentence))) != brute_force_occurrences(phrases, sentence):
+            mismatches += 1
+
+    start = time.perf_counter()
+    for sentence in sentences:
+        normalizer.find_phrases(sentence)
+    automaton_rate = len(sentences) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for sentence in sentences[:args.naive_sentences]:
+        naive_substring_scan(phrases, sentence)
+    naive_rate = args.naive_sentences / (time.perf_counter() - start)
+
+    print(f"  automaton:       {automaton_rate:10.0f} sentences/s")
+    print(f"  substring loop:  {naive_rate:10.0f} sentences/s  (automaton x{automaton_rate / naive_rate:.0f})")
+
+    if mismatches:
+        print(f"❌ {mismatches} sentences differ from the brute-force reference")
+        sys.exit(1)
+    print("✅ Automaton matches the brute-force reference")
+
+
+if __name__ == "__main__":
+    main()
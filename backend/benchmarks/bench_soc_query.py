@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark SOC lookups: the old five-clause $or over soc_code / onet_codes /
+soc_codes against one equality match on the canonical soc_all field.
+
+Needs a running MongoDB (DATABASE_URL). Fills a scratch database with
+synthetic postings whose SOC codes are spread over the three legacy fields
+the way real ingests and older documents are, indexes both layouts, then
+times each query for a sample of SOC codes, checks both return the same
+postings and prints the explain() work counters. The scratch database is
+dropped afterwards unless --keep is given.
+
+Run from backend/:
+    python -m benchmarks.bench_soc_query --documents 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+
+from app.core.soc import job_soc_codes, soc_filter
+
+SOC_CODES = [f"{major:02d}-{minor:04d}.00" for major in range(11, 54, 2) for minor in range(1011, 1100, 8)]
+
+
+def legacy_filter(soc_code: str):
+    """The SOC filter analyze_job used before soc_all."""
+    return {
+        "$or": [
+            {"soc_code": soc_code},
+            {"onet_codes": soc_code},
+            {"soc_codes": soc_code},
+            {"onet_codes": {"$in": [soc_code]}},
+            {"soc_codes": {"$in": [soc_code]}}
+        ]
+    }
+
+
+def make_documents(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        codes = rng.sample(SOC_CODES, rng.choice((1, 1, 2, 3)))
+        document = {"JvId": f"bench-{i}", "JobTitle": f"Job {i}", "Description": "x" * rng.randint(200, 800)}
+        layout = rng.random()
+        if layout < 0.6:
+            # Current ingests: search SOC code plus the O*NET codes of the posting
+            document["soc_code"] = codes[0]
+            document["soc_codes"] = codes
+        elif layout < 0.85:
+            # Postings without a search SOC code
+            document["soc_codes"] = codes
+        else:
+            # Older documents with the legacy field name
+            document["onet_codes"] = codes
+        document["soc_all"] = job_soc_codes(document)
+        documents.append(document)
+    return documents
+
+
+async def time_queries(collection, make_filter, soc_codes, repeats: int):
+    timings = []
+    results = {}
+    for _ in range(repeats):
+        for soc_code in soc_codes:
+            start = time.perf_counter()
+            ids = [doc["JvId"] async for doc in collection.find(make_filter(soc_code), {"JvId": 1, "_id": 0})]
+            timings.append(time.perf_counter() - start)
+            results[soc_code] = sorted(ids)
+    return timings, results
+
+
+async def explain_work(collection, query):
+    stats = (await collection.find(query).explain()).get("executionStats", {})
+    return stats.get("totalKeysExamined"), stats.get("totalDocsExamined")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=20, help="SOC codes looked up per round")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database", default="occupation100_bench")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("DATABASE_URL", "mongodb://localhost:27017"))
+    db = client[args.database]
+    collection = db.jobs
+
+    try:
+        await collection.drop()
+        documents = make_documents(args.documents)
+        for start in range(0, len(documents), 10000):
+            await collection.insert_many(documents[start:start + 10000], ordered=False)
+        for field in ("soc_code", "soc_codes", "onet_codes", "soc_all"):
+            await collection.create_index([(field, ASCENDING)])
+        print(f"📊 {len(documents)} postings over {len(SOC_CODES)} SOC codes in {args.database}")
+
+        soc_codes = random.Random(7).sample(SOC_CODES, min(args.queries, len(SOC_CODES)))
+        # Warm both plans into the plan cache
+        await time_queries(collection, legacy_filter, soc_codes, 1)
+        await time_queries(collection, soc_filter, soc_codes, 1)
+
+        legacy_timings, legacy_results = await time_queries(collection, legacy_filter, soc_codes, args.repeats)
+        canonical_timings, canonical_results = await time_queries(collection, soc_filter, soc_codes, args.repeats)
+
+        legacy_work = await explain_work(collection, legacy_filter(soc_codes[0]))
+        canonical_work = await explain_work(collection, soc_filter(soc_codes[0]))
+        print(f"  five-way $or:     median {statistics.median(legacy_timings) * 1000:7.2f}ms   keys/docs examined {legacy_work}")
+        print(f"  soc_all equality: median {statistics.median(canonical_timings) * 1000:7.2f}ms   keys/docs examined {canonical_work}")
+        print(f"  speedup: {statistics.median(legacy_timings) / statistics.median(canonical_timings):.2f}x")
+
+        assert legacy_results == canonical_results, "soc_all lookups return different postings"
+        print("✅ Both filters return the same postings")
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
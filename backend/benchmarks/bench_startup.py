@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark import time and API start-up, failing on regressions.
+
+Measures:
+  * cumulative `python -X importtime` cost of importing app.main, listing the
+    slowest modules, and checks that heavy optional modules (the Anthropic SDK, numpy, scipy)
+    are not imported at start-up;
+  * time from launching uvicorn until the first successful /api/v1/health.
+
+Exits non-zero if either measurement exceeds its threshold, so it can gate CI.
+
+Run from backend/:
+    python -m benchmarks.bench_startup --max-import-ms 800 --max-health-ms 4000
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+# Modules that must stay lazily imported
+LAZY_MODULES = ["anthropic", "numpy", "scipy"]
+
+
+def _env():
+    env = dict(os.environ)
+    # Settings require a database URL; start-up must not need a live server
+    env.setdefault("DATABASE_URL", "mongodb://localhost:27017")
+    return env
+
+
+def measure_import_time(module: str = "app.main"):
+    """Return (cumulative microseconds per module, set of imported module names)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative[parts[2].strip()] = int(parts[1])
+    return cumulative
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_time_to_health(timeout: float = 30.0) -> float:
+    """Launch uvicorn and return seconds until /api/v1/health answers 200."""
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/api/v1/health", timeout=0.5)
+                if response.status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"/api/v1/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-import-ms", type=float, default=1000.0)
+    parser.add_argument("--max-health-ms", type=float, default=5000.0)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list")
+    args = parser.parse_args()
+
+    failures = []
+
+    cumulative = measure_import_time()
+    import_ms = cumulative.get("app.main", 0) / 1000
+    print(f"📦 import app.main: {import_ms:.0f} ms (threshold {args.max_import_ms:.0f} ms)")
+    top_level = sorted(
+        ((name, us) for name, us in cumulative.items() if name.count(".") == 0 or name.startswith("app.")),
+        key=lambda item: item[1], reverse=True
+    )
+    for name, us in top_level[:args.top]:
+        print(f"    {us / 1000:8.1f} ms  {name}")
+    if import_ms > args.max_import_ms:
+        failures.append(f"import time {import_ms:.0f} ms exceeds {args.max_import_ms:.0f} ms")
+    for module in LAZY_MODULES:
+        if module in cumulative:
+            failures.append(f"{module} is imported at start-up")
+
+    health_ms = measure_time_to_health() * 1000
+    print(f"🚀 time to first /health: {health_ms:.0f} ms (threshold {args.max_health_ms:.0f} ms)")
+    if health_ms > args.max_health_ms:
+        failures.append(f"time to /health {health_ms:.0f} ms exceeds {args.max_health_ms:.0f} ms")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Start-up within thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark document-frequency counting with the sparse posting x term matrix.
+
+Generates synthetic per-posting term counts with a Zipf-like vocabulary,
+then compares pure-Python dictionaries against TermMatrix for document
+frequencies, per-category top-k and co-occurrence with one term, checking
+that both give the same answers.
+
+Run from backend/:
+    python -m benchmarks.bench_term_matrix --postings 20000 --terms 5000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from app.services.term_matrix_service import TermMatrix
+
+CATEGORIES = 4
+TOP_K = 15
+
+
+def make_posting_terms(postings: int, terms: int, seed: int = 17):
+    rng = random.Random(seed)
+    vocabulary = [f"activity {i}" for i in range(terms)]
+    weights = [1 / (rank + 1) for rank in range(terms)]
+    return [Counter(rng.choices(vocabulary, weights, k=rng.randint(5, 25))) for _ in range(postings)]
+
+
+def python_baseline(posting_terms, probe):
+    document_frequencies = Counter()
+    for terms in posting_terms:
+        document_frequencies.update(terms.keys())
+    order = {term: index for index, term in enumerate(dict.fromkeys(t for terms in posting_terms for t in terms))}
+    tops = []
+    for category in range(CATEGORIES):
+        members = [term for term in order if order[term] % CATEGORIES == category]
+        tops.append(sorted(members, key=lambda term: -document_frequencies[term])[:TOP_K])
+    related = Counter()
+    for terms in posting_terms:
+        if probe in terms:
+            related.update(term for term in terms if term != probe)
+    return tops, related
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postings", type=int, default=20000)
+    parser.add_argument("--terms", type=int, default=5000)
+    args = parser.parse_args()
+
+    posting_terms = make_posting_terms(args.postings, args.terms)
+    probe = "activity 3"
+    print(f"📊 {len(posting_terms)} postings over a {args.terms}-term vocabulary")
+
+    start = time.perf_counter()
+    expected_tops, expected_related = python_baseline(posting_terms, probe)
+    python_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = TermMatrix.from_posting_terms(posting_terms)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    document_frequencies = matrix.document_frequencies()
+    tops = []
+    for category in range(CATEGORIES):
+        members = list(range(category, len(matrix.vocabulary), CATEGORIES))
+        tops.append([matrix.vocabulary[i] for i in matrix.top_k(document_frequencies, TOP_K, members)])
+    related = dict(matrix.related_terms(probe, k=len(matrix.vocabulary)))
+    matrix_time = time.perf_counter() - start
+
+    print(f"  python dicts:        {python_time:6.3f}s")
+    print(f"  matrix build:        {build_time:6.3f}s")
+    print(f"  matrix queries:      {matrix_time:6.3f}s  (co-occurrence for all terms included)")
+    assert tops == expected_tops, "top-k differs from the Python baseline"
+    assert related == dict(expected_related), "co-occurrence differs from the Python baseline"
+    print("✅ Matrix results match the Python baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script to (re)build the distinctive terms of every SOC code from the per-SOC term
+statistics. Intended to run periodically (e.g. nightly from cron); only SOCs whose
+statistics changed since the last run are rescored unless --full is given.
+"""
+import argparse
+import asyncio
+import os
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from app.services.distinctive_terms_service import rebuild_distinctive_terms, load_distinctive_terms
+
+
+async def build_distinctive_terms(full: bool = False, show: str = None):
+    # Load environment variables
+    load_dotenv()
+    
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+    
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+    
+    try:
+        start = time.perf_counter()
+        summary = await rebuild_distinctive_terms(db, full=full)
+        elapsed = time.perf_counter() - start
+        print(f"🎉 Distinctive terms {summary['mode']}: {summary['socs_written']} SOC codes written in {elapsed:.1f}s")
+        
+        if show:
+            terms = await load_distinctive_terms(db, show) or []
+            print(f"📋 Distinctive terms for {show}:")
+            for item in terms:
+                print(f"  {item['score']:8.2f}  {item['share']:6.1%}  {item['term']}")
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-SOC distinctive terms from term statistics")
+    parser.add_argument("--full", action="store_true", help="Rescore every SOC instead of only the changed ones")
+    parser.add_argument("--show", metavar="SOC_CODE", help="Print the distinctive terms of one SOC code afterwards")
+    args = parser.parse_args()
+    asyncio.run(build_distinctive_terms(args.full, args.show))
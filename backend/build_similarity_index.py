@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to (re)build the per-SOC term vectors behind the similar-occupations
+endpoint from the term statistics and cached analysis reports. Running servers
+pick up the new build on their next reload check. Ingestion never rebuilds the
+vectors, so /similar answers as of the last run (its response carries the
+build_id and built_at); run this after ingestion or periodically (e.g. nightly
+from cron). Nothing is rebuilt when the sources are unchanged unless --force
+is given.
+"""
+import argparse
+import asyncio
+import os
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from app.services.similarity_service import rebuild_soc_vectors, get_similarity_index
+
+
+async def build_similarity_index(force: bool = False, show: str = None):
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+
+    try:
+        start = time.perf_counter()
+        summary = await rebuild_soc_vectors(db, force=force)
+        elapsed = time.perf_counter() - start
+        print(f"🎉 SOC vectors {summary['mode']} (build {summary['build_id']}): {summary['socs_written']} SOC codes written in {elapsed:.1f}s")
+
+        if show:
+            index = await get_similarity_index(db, force_check=True)
+            print(f"📋 Occupations most similar to {show}:")
+            for item in index.most_similar(show) if index else []:
+                print(f"  {item['score']:6.3f}  {item['soc_code']}  ({', '.join(item['shared_terms'])})")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-SOC term vectors for the similar-occupations index")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if term statistics and reports are unchanged")
+    parser.add_argument("--show", metavar="SOC_CODE", help="Print the occupations most similar to one SOC code afterwards")
+    args = parser.parse_args()
+    asyncio.run(build_similarity_index(args.force, args.show))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the per-SOC catalog (soc_catalog: posting counts, latest
+DatePosted, last ingest time and location breakdown per SOC code) from every
+job posting in MongoDB. Inserts keep it up to date incrementally; run this once
+for postings stored before the catalog existed, or to repair it.
+"""
+import argparse
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from app.services.soc_catalog_service import rebuild_soc_catalog, load_soc_catalog
+
+
+async def build_soc_catalog(show: int = 10):
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+
+    try:
+        print("🔧 Rebuilding the SOC catalog from all job postings...")
+        soc_count = await rebuild_soc_catalog(db)
+        print(f"🎉 Catalog rebuilt: {soc_count} SOC codes")
+
+        for entry in await load_soc_catalog(db, limit=show):
+            print(f"  - {entry['soc_code']}: {entry['posting_count']} postings "
+                  f"({entry['search_count']} fetched for it), latest posted {entry['latest_date_posted'] or 'N/A'}")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the per-SOC catalog from the job postings")
+    parser.add_argument("--show", type=int, default=10, help="Number of SOC codes to print afterwards")
+    args = parser.parse_args()
+    asyncio.run(build_soc_catalog(args.show))
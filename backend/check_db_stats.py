@@ -7,6 +7,8 @@ import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
+from app.services.soc_catalog_service import load_soc_catalog
+
 async def check_db_stats():
     # Load environment variables
     load_dotenv()
@@ -27,19 +29,17 @@ async def check_db_stats():
         print("Successfully connected to MongoDB")
         
         # Get total count
-        total_count = await db.jobs.count_documents({})
+        total_count = await db.jobs.estimated_document_count()
         print(f'\nTotal job postings in database: {total_count}')
         
-        # Get count by SOC code
-        pipeline = [
-            {'$group': {'_id': '$soc_code', 'count': {'$sum': 1}}},
-            {'$sort': {'count': -1}}
-        ]
-        
-        soc_counts = await db.jobs.aggregate(pipeline).to_list(None)
+        # Get count by SOC code from the catalog maintained at ingestion
+        soc_counts = await load_soc_catalog(db, sort="search_count")
+        if not soc_counts and total_count:
+            print('\nThe SOC catalog is empty; run build_soc_catalog.py to build it')
         print(f'\nJob postings by SOC code:')
         for item in soc_counts:
-            print(f'  {item["_id"]}: {item["count"]} postings')
+            print(f'  {item["soc_code"]}: {item["search_count"]} postings '
+                  f'({item["posting_count"]} with any SOC code, latest posted {item["latest_date_posted"] or "N/A"})')
         
         print(f'\nTotal SOC codes with data: {len(soc_counts)}')
         
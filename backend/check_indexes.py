@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Script to create and verify the managed MongoDB indexes (app/db/indexes.py).
+
+Creates any missing index, reports missing, unmanaged and unused indexes, then
+explains the application's hot queries and fails (exit code 1) if any of them
+would scan a whole collection instead of using an index.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from app.core.soc import soc_filter
+from app.db.indexes import ensure_indexes, index_report
+
+SAMPLE_SOC_CODE = "15-1252.00"
+
+
+def hot_queries(soc_code: str):
+    """(description, collection, filter, sort) of each query that must be served by an index."""
+    return [
+        ("upsert by JvId", "jobs", {"JvId": "sample"}, None),
+        ("change detection by JvId", "jobs", {"JvId": {"$in": ["sample-1", "sample-2"]}}, None),
+        ("analyze postings by SOC", "jobs", {**soc_filter(soc_code), "dup_canonical": {"$ne": False}}, None),
+        ("list search", "jobs", {"$text": {"$search": "nurse"}}, None),
+        ("term statistics by SOC", "soc_term_stats", {"soc_code": soc_code}, [("doc_count", -1), ("_id", 1)]),
+        ("similarity build vectors", "soc_term_vectors", {"build_id": "sample"}, None),
+    ]
+
+
+def plan_stages(plan) -> list:
+    """Every stage name in an explain plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+async def explain_query(db, collection_name: str, query, sort):
+    cursor = db[collection_name].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explanation = await cursor.explain()
+    return plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+
+
+async def check_indexes(soc_code: str, create: bool = True) -> bool:
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return False
+
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+
+    try:
+        if create:
+            created = await ensure_indexes(db)
+            print(f"🔧 Created {len(created['created'])} indexes, {len(created['failed'])} failed")
+
+        report = await index_report(db)
+        for collection_name, details in report.items():
+            print(f"\n📚 {collection_name}")
+            print(f"  missing:   {', '.join(details['missing']) or '-'}")
+            print(f"  unmanaged: {', '.join(details['unmanaged']) or '-'}")
+            print(f"  unused:    {', '.join(details['unused']) or '-'}")
+            for name, ops in sorted(details["usage"].items()):
+                print(f"    {ops:10d} ops  {name}")
+
+        print("\n🔍 Query plans:")
+        ok = True
+        for description, collection_name, query, sort in hot_queries(soc_code):
+            stages = await explain_query(db, collection_name, query, sort)
+            uses_index = "COLLSCAN" not in stages and any(stage in ("IXSCAN", "TEXT_MATCH", "EXPRESS_IXSCAN", "IDHACK") for stage in stages)
+            ok = ok and uses_index
+            print(f"  {'✅' if uses_index else '❌'} {description}: {' <- '.join(stages)}")
+        return ok
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the managed MongoDB indexes and verify the hot queries use them")
+    parser.add_argument("--soc-code", default=SAMPLE_SOC_CODE, help="SOC code used in the explained queries")
+    parser.add_argument("--no-create", action="store_true", help="Only report, do not create missing indexes")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(check_indexes(args.soc_code, create=not args.no_create)) else 1)
@@ -5,30 +5,18 @@ This will give us 10,000 total job postings for comprehensive analysis.
 """
 
 import asyncio
-import csv
 import time
-from pathlib import Path
-from app.core.config import Settings
+from app.core.config import get_settings, load_supported_jobs
 from app.services.career_api_service import fetch_postings
 
 async def fetch_jobs_for_all_100_soc_codes():
     """Fetch 100 job postings for each of the 100 SOC codes."""
     
     # Load settings
-    settings = Settings()
+    settings = get_settings()
     
     # Load all 100 SOC codes from CSV
-    config_path = Path(__file__).parent / "config" / "onet_soc_codes.csv"
-    supported_jobs = []
-    
-    with open(config_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) == 1:
-                data = row[0]
-                if ',' in data:
-                    title, soc_code = data.rsplit(',', 1)
-                    supported_jobs.append({"title": title.strip(), "soc_code": soc_code.strip()})
+    supported_jobs = load_supported_jobs()
     
     print(f"🎯 Target: 100 jobs × {len(supported_jobs)} SOC codes = {len(supported_jobs) * 100} total jobs")
     print(f"📋 Found {len(supported_jobs)} SOC codes to process")
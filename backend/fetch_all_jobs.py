@@ -7,14 +7,14 @@ This ensures we have adequate data for analysis.
 import asyncio
 import json
 from pathlib import Path
-from app.core.config import Settings
+from app.core.config import get_settings
 from app.services.career_api_service import fetch_postings
 
 async def fetch_jobs_for_all_soc_codes():
     """Fetch 100 job postings for each supported SOC code."""
     
     # Load settings
-    settings = Settings()
+    settings = get_settings()
     
     # Load supported jobs
     config_path = Path(__file__).parent / "config" / "supported_jobs.json"
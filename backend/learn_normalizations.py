@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script to learn phrase normalizations by clustering extracted activity phrases.
+
+Phrases come from the per-SOC term statistics in MongoDB (or a phrase<TAB>count
+file with --input). Similar phrases are grouped with token-set MinHash/LSH and
+each group is mapped to its most frequent member in
+config/learned_normalizations.csv, which the analyzer loads at startup.
+
+State is kept in --state-dir, so reruns only hash phrases not seen before; use
+--reset to start over. Rebuild term statistics afterwards
+(backfill_term_stats.py --rebuild) so stored aggregates use the new table.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from app.services.normalization_service import LEARNED_NORMALIZATIONS_CSV
+from app.services.phrase_clustering_service import PhraseClusterer, DEFAULT_THRESHOLD
+
+DEFAULT_STATE_DIR = os.path.join("cache", "phrase_clusters")
+
+# Term statistics read from MongoDB and indexed per step
+READ_BATCH_SIZE = 5000
+
+
+def read_phrase_file(path: str):
+    """Yield (phrase, count) from a phrase<TAB>count file (count defaults to 1)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            phrase, _, count = line.rstrip("\n").partition("\t")
+            if phrase:
+                yield phrase, float(count or 1)
+
+
+async def read_term_stats(db, batch_size: int = READ_BATCH_SIZE):
+    """
+    Yield (term, postings) pairs from soc_term_stats, batch_size at a time, so
+    the whole collection is never held in memory. A term shared by several
+    SOCs appears once per SOC.
+    """
+    batch = []
+    async for doc in db.soc_term_stats.find({"doc_count": {"$gt": 0}}, {"term": 1, "doc_count": 1}).batch_size(batch_size):
+        batch.append((doc["term"], doc.get("doc_count", 1)))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def add_phrases_from_mongo(clusterer: PhraseClusterer):
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        raise RuntimeError("DATABASE_URL not found in environment variables")
+
+    client = AsyncIOMotorClient(mongodb_url)
+    try:
+        async for batch in read_term_stats(client.occupation100):
+            clusterer.add_phrases(batch)
+    finally:
+        client.close()
+
+
+def learn_normalizations(args):
+    if args.reset and os.path.exists(args.state_dir):
+        shutil.rmtree(args.state_dir)
+        print(f"🧹 Removed {args.state_dir}")
+
+    start = time.perf_counter()
+    clusterer = PhraseClusterer(args.state_dir, threshold=args.threshold)
+    print(f"📂 {clusterer.size} phrases already indexed in {args.state_dir}")
+
+    if args.input:
+        clusterer.add_phrases(read_phrase_file(args.input))
+    else:
+        asyncio.run(add_phrases_from_mongo(clusterer))
+    print(f"🔢 Indexed {clusterer.new_phrases} new phrases ({clusterer.size} total)")
+
+    roots = clusterer.cluster()
+    summary = clusterer.write_normalizations(roots, args.output, min_count=args.min_count)
+    elapsed = time.perf_counter() - start
+    print(f"🎉 {summary['clusters']} clusters, {summary['mappings']} mappings written to {args.output} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learn phrase normalizations by clustering activity phrases")
+    parser.add_argument("--input", help="phrase<TAB>count file to read instead of MongoDB term statistics")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR)
+    parser.add_argument("--output", default=str(LEARNED_NORMALIZATIONS_CSV))
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Estimated token-set Jaccard similarity to merge at")
+    parser.add_argument("--min-count", type=float, default=1, help="Skip phrases counted fewer times than this in this run")
+    parser.add_argument("--reset", action="store_true", help="Discard the saved state and index every phrase again")
+    args = parser.parse_args()
+
+    try:
+        learn_normalizations(args)
+    except Exception as e:
+        print(f"❌ Error: {e}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Script to populate the canonical soc_all field (every SOC code of a posting, see
+app.core.soc.job_soc_codes) on job postings already in MongoDB. New inserts get it
+at ingestion; SOC lookups only match postings that have it, so run this once after
+upgrading. Use --all to recompute it on every posting.
+"""
+import argparse
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+from app.core.soc import job_soc_codes
+from app.db.indexes import ensure_indexes
+
+BATCH_SIZE = 1000
+
+
+async def migrate_soc_all(recompute_all: bool = False):
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+
+    try:
+        query = {} if recompute_all else {"soc_all": {"$exists": False}}
+        pending = await db.jobs.count_documents(query)
+        print(f"📊 {pending} job postings need soc_all")
+
+        processed = 0
+        cursor = db.jobs.find(
+            query,
+            {"soc_code": 1, "soc_codes": 1, "OnetCodes": 1, "onet_codes": 1}
+        ).batch_size(BATCH_SIZE)
+        operations = []
+        async for job in cursor:
+            operations.append(UpdateOne({"_id": job["_id"]}, {"$set": {"soc_all": job_soc_codes(job)}}))
+            if len(operations) >= BATCH_SIZE:
+                await db.jobs.bulk_write(operations, ordered=False)
+                processed += len(operations)
+                operations = []
+                print(f"  ✅ {processed}/{pending} postings migrated")
+        if operations:
+            await db.jobs.bulk_write(operations, ordered=False)
+            processed += len(operations)
+
+        created = await ensure_indexes(db)
+        if created["created"]:
+            print(f"🔧 Created indexes: {', '.join(created['created'])}")
+
+        print(f"🎉 Migration complete! Set soc_all on {processed} postings.")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate the canonical soc_all field on existing job postings")
+    parser.add_argument("--all", action="store_true", help="Recompute soc_all on every posting, not only those missing it")
+    args = parser.parse_args()
+    asyncio.run(migrate_soc_all(args.all))
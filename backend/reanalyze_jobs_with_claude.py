@@ -3,9 +3,12 @@
 Script to re-analyze existing job postings in MongoDB using Claude Sonnet 4.0.
 This will generate new insights reports for all SOC codes with job data.
 """
+import argparse
 import asyncio
+import json
 import os
 import sys
+from datetime import datetime
 from typing import List, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
@@ -13,8 +16,59 @@ from dotenv import load_dotenv
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from app.services.analysis_service import generate_report_from_postings
-from app.core.config import settings
+from app.services.analysis_service import get_analyzer, generate_report_from_postings
+from app.services.batch_service import (
+    soc_custom_id,
+    build_batch_request,
+    submit_batch,
+    wait_for_batch,
+    iter_batch_results,
+    FakeBatchClient
+)
+from app.services.cache_service import cache_service
+from app.services.soc_catalog_service import load_soc_catalog
+from app.services.text_service import split_sentences
+from app.models.pydantic_models import JobInsightsReport
+from app.core.config import get_settings, load_supported_jobs
+
+def report_to_insights_doc(report: JobInsightsReport, analysis_method: str) -> Dict[str, Any]:
+    """Convert a JobInsightsReport into the document stored in job_insights."""
+    def terms(items):
+        return [
+            {
+                'term': term.term,
+                'count': term.count,
+                'context_sentences': term.context_sentences
+            } for term in items
+        ]
+    
+    return {
+        'soc_code': report.soc_code,
+        'searched_title': report.searched_title,
+        'total_postings_analyzed': report.total_postings_analyzed,
+        'responsibilities': terms(report.responsibilities),
+        'skills': terms(report.skills),
+        'qualifications': terms(report.qualifications),
+        'unique_aspects': terms(report.unique_aspects),
+        'analysis_timestamp': asyncio.get_event_loop().time(),
+        'analysis_method': analysis_method
+    }
+
+
+def find_job_title(jobs: List[Dict[str, Any]]) -> str:
+    """Find the job title from the first job that has one."""
+    for job in jobs:
+        if job.get('JobTitle'):
+            return job['JobTitle']
+        elif job.get('job_title'):
+            return job['job_title']
+    return "Unknown"
+
+
+def supported_job_titles() -> Dict[str, str]:
+    """Map each supported SOC code to the title /analyze looks reports up under."""
+    return {job['soc_code']: job['title'] for job in load_supported_jobs()}
+
 
 async def reanalyze_all_jobs():
     """Re-analyze all job postings in the database using Claude Sonnet 4.0."""
@@ -38,22 +92,18 @@ async def reanalyze_all_jobs():
         print("✅ Successfully connected to MongoDB")
         
         # Get total count
-        total_count = await db.jobs.count_documents({})
+        total_count = await db.jobs.estimated_document_count()
         print(f"📊 Total job postings in database: {total_count}")
         
-        # Get unique SOC codes with job counts
-        pipeline = [
-            {'$group': {'_id': '$soc_code', 'count': {'$sum': 1}}},
-            {'$sort': {'count': -1}}
-        ]
-        
-        soc_counts = await db.jobs.aggregate(pipeline).to_list(None)
+        # Get unique SOC codes with job counts from the catalog maintained at ingestion
+        soc_counts = await load_soc_catalog(db, sort="search_count")
         print(f"🎯 Found {len(soc_counts)} SOC codes with job data")
+        titles = supported_job_titles()
         
         # Process each SOC code
         for soc_info in soc_counts:
-            soc_code = soc_info['_id']
-            job_count = soc_info['count']
+            soc_code = soc_info['soc_code']
+            job_count = soc_info['search_count']
             
             if not soc_code:
                 print("⚠️ Skipping jobs with missing SOC code")
@@ -69,15 +119,8 @@ async def reanalyze_all_jobs():
                 print(f"  ⚠️ No jobs found for SOC {soc_code}")
                 continue
             
-            # Find the job title from the first job
-            job_title = "Unknown"
-            for job in jobs:
-                if job.get('JobTitle'):
-                    job_title = job['JobTitle']
-                    break
-                elif job.get('job_title'):
-                    job_title = job['job_title']
-                    break
+            # Use the supported-jobs title, falling back to the first job's title
+            job_title = titles.get(soc_code) or find_job_title(jobs)
             
             print(f"  📝 Job Title: {job_title}")
             print(f"  🤖 Analyzing with Claude Sonnet 4.0...")
@@ -87,41 +130,7 @@ async def reanalyze_all_jobs():
                 report = generate_report_from_postings(jobs, job_title, soc_code)
                 
                 # Convert report to dict for storage
-                report_dict = {
-                    'soc_code': report.soc_code,
-                    'searched_title': report.searched_title,
-                    'total_postings_analyzed': report.total_postings_analyzed,
-                    'responsibilities': [
-                        {
-                            'term': term.term,
-                            'count': term.count,
-                            'context_sentences': term.context_sentences
-                        } for term in report.responsibilities
-                    ],
-                    'skills': [
-                        {
-                            'term': term.term,
-                            'count': term.count,
-                            'context_sentences': term.context_sentences
-                        } for term in report.skills
-                    ],
-                    'qualifications': [
-                        {
-                            'term': term.term,
-                            'count': term.count,
-                            'context_sentences': term.context_sentences
-                        } for term in report.qualifications
-                    ],
-                    'unique_aspects': [
-                        {
-                            'term': term.term,
-                            'count': term.count,
-                            'context_sentences': term.context_sentences
-                        } for term in report.unique_aspects
-                    ],
-                    'analysis_timestamp': asyncio.get_event_loop().time(),
-                    'analysis_method': 'claude_sonnet_4'
-                }
+                report_dict = report_to_insights_doc(report, 'claude_sonnet_4')
                 
                 # Store the analysis results
                 await db.job_insights.replace_one(
@@ -151,7 +160,165 @@ async def reanalyze_all_jobs():
     finally:
         client.close()
 
+def rule_based_responder(params: Dict[str, Any]) -> str:
+    """Answer a batch request offline by running the rule-based analysis on its postings."""
+    prompt = params["messages"][0]["content"]
+    postings_text = prompt.split("JOB POSTINGS TEXT:\n", 1)[-1].split("\n\nPlease extract", 1)[0]
+    posting_texts = [text.strip() for text in postings_text.split("--- JOB POSTING ---") if text.strip()]
+    posting_sentences = [split_sentences(text) for text in posting_texts]
+    return json.dumps(get_analyzer().analyze_with_fallback(posting_sentences, "batch"))
+
+
+def get_batch_client(fake: bool):
+    """Return the real Anthropic client or an offline fake batch client."""
+    if fake:
+        return FakeBatchClient(os.path.join("cache", "fake_batches"), rule_based_responder)
+    analyzer = get_analyzer()
+    if not analyzer.claude_available:
+        raise RuntimeError("Claude is not configured; set ANTHROPIC_API_KEY or use --fake")
+    return analyzer.client
+
+
+async def submit_reanalysis_batch(db, client) -> str:
+    """Build one request per SOC code, submit them as a single Message Batch and record a manifest."""
+    analyzer = get_analyzer()
+    soc_counts = await load_soc_catalog(db, sort="search_count")
+    print(f"🎯 Found {len(soc_counts)} SOC codes with job data")
+    
+    titles = supported_job_titles()
+    
+    requests = []
+    manifest = []
+    for soc_info in soc_counts:
+        soc_code = soc_info['soc_code']
+        if not soc_code:
+            print("⚠️ Skipping jobs with missing SOC code")
+            continue
+        
+        jobs = await db.jobs.find({'soc_code': soc_code}).to_list(None)
+        if not jobs:
+            continue
+        job_title = titles.get(soc_code) or find_job_title(jobs)
+        
+        posting_texts, _, selected_indices = analyzer.prepare_postings(jobs, get_settings().analysis_token_budget)
+        combined_text = analyzer.combine_postings_text(posting_texts, selected_indices)
+        custom_id = soc_custom_id(soc_code)
+        
+        requests.append(build_batch_request(custom_id, analyzer.build_claude_request(combined_text, job_title)))
+        manifest.append({
+            'custom_id': custom_id,
+            'soc_code': soc_code,
+            'job_title': job_title,
+            'total_postings': len(jobs),
+            'postings_represented': len(selected_indices)
+        })
+    
+    if not requests:
+        raise RuntimeError("No SOC codes with job data to analyze")
+    
+    batch = submit_batch(client, requests)
+    await db.analysis_batches.replace_one(
+        {'_id': batch.id},
+        {'_id': batch.id, 'status': 'submitted', 'created_at': datetime.utcnow(), 'requests': manifest},
+        upsert=True
+    )
+    print(f"📨 Submitted batch {batch.id} with {len(requests)} requests")
+    print(f"   Resume later with: python reanalyze_jobs_with_claude.py --resume {batch.id}")
+    return batch.id
+
+
+async def collect_reanalysis_batch(db, client, batch_id: str, poll_interval: float, analysis_method: str = 'claude_sonnet_4_batch'):
+    """Wait for a submitted batch to end, then store each SOC's report in job_insights and the cache."""
+    analyzer = get_analyzer()
+    manifest = await db.analysis_batches.find_one({'_id': batch_id})
+    if not manifest:
+        raise RuntimeError(f"No manifest recorded for batch {batch_id}")
+    requests = {entry['custom_id']: entry for entry in manifest['requests']}
+    # Batches submitted before manifests carried the supported-jobs title fall back to it here
+    titles = supported_job_titles()
+    
+    await wait_for_batch(client, batch_id, poll_interval=poll_interval)
+    
+    stored = 0
+    failed = []
+    for custom_id, response_text, error in iter_batch_results(client, batch_id):
+        entry = requests.get(custom_id)
+        if not entry:
+            print(f"  ⚠️ Unknown custom_id in results: {custom_id}")
+            continue
+        if error:
+            failed.append(entry['soc_code'])
+            print(f"  ❌ SOC {entry['soc_code']}: {error}")
+            continue
+        
+        try:
+            results = analyzer.parse_claude_response(response_text)
+        except Exception as e:
+            failed.append(entry['soc_code'])
+            print(f"  ❌ SOC {entry['soc_code']}: could not parse response: {e}")
+            continue
+        
+        job_title = titles.get(entry['soc_code'], entry['job_title'])
+        report = analyzer.build_report(
+            results, job_title, entry['soc_code'],
+            entry['total_postings'], entry['postings_represented']
+        )
+        await db.job_insights.replace_one(
+            {'soc_code': entry['soc_code']},
+            report_to_insights_doc(report, analysis_method),
+            upsert=True
+        )
+        cache_service.cache_analysis(entry['soc_code'], job_title, report)
+        stored += 1
+    
+    await db.analysis_batches.update_one(
+        {'_id': batch_id},
+        {'$set': {'status': 'collected', 'collected_at': datetime.utcnow(), 'failed_soc_codes': failed}}
+    )
+    print(f"\n🎉 Batch {batch_id} collected: {stored} reports stored, {len(failed)} failed")
+
+
+async def reanalyze_with_batch(resume_batch_id: str = None, fake: bool = False, poll_interval: float = 30.0):
+    """Re-analyze all SOC codes through the Message Batches API (or resume a submitted batch)."""
+    load_dotenv()
+    
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+    
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+    
+    try:
+        await client.admin.command('ping')
+        print("✅ Successfully connected to MongoDB")
+        
+        batch_client = get_batch_client(fake)
+        batch_id = resume_batch_id or await submit_reanalysis_batch(db, batch_client)
+        analysis_method = 'rule_based_fake_batch' if fake else 'claude_sonnet_4_batch'
+        await collect_reanalysis_batch(db, batch_client, batch_id, poll_interval, analysis_method)
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
 if __name__ == "__main__":
-    print("🚀 Starting job re-analysis with Claude Sonnet 4.0...")
-    print("=" * 60)
-    asyncio.run(reanalyze_all_jobs())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Re-analyze job postings in MongoDB using Claude Sonnet 4.0.")
+    parser.add_argument("--batch", action="store_true", help="Submit all SOC codes as one Message Batch")
+    parser.add_argument("--resume", metavar="BATCH_ID", help="Resume polling and collecting a submitted batch")
+    parser.add_argument("--fake", action="store_true", help="Use an offline fake batch client (rule-based answers)")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="Seconds between batch status checks")
+    args = parser.parse_args()
+    
+    if args.batch or args.resume:
+        print("🚀 Starting batch job re-analysis with Claude Sonnet 4.0...")
+        print("=" * 60)
+        poll_interval = 0 if args.fake else args.poll_interval
+        asyncio.run(reanalyze_with_batch(args.resume, args.fake, poll_interval))
+    else:
+        print("🚀 Starting job re-analysis with Claude Sonnet 4.0...")
+        print("=" * 60)
+        asyncio.run(reanalyze_all_jobs())
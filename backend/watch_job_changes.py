@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script to follow the jobs change stream and print the SOC change events the
+API would publish (app/services/event_service.py), optionally invalidating
+cached analyses as the API does with WATCH_JOB_CHANGES=true.
+
+Change streams need a replica set. For a local single-node one:
+    mongod --replSet rs0 --dbpath <dir>
+    mongosh --eval 'rs.initiate()'
+then run this script and insert postings from another process (fetch_all_jobs.py
+or POST /api/v1/jobs/insert).
+
+Deletes, and the SOC codes an updated posting leaves, are only seen when the
+jobs collection records pre-images (MongoDB 6.0+); --enable-pre-images turns
+that on once.
+"""
+import argparse
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from app.services import event_service
+from app.services.cache_service import invalidate_changed_socs
+
+
+def print_event(event):
+    print(f"📣 {event['count']} postings changed under {len(event['soc_codes'])} SOC codes: {', '.join(event['soc_codes'])}")
+
+
+async def watch(invalidate: bool = False, pre_images: bool = False):
+    # Load environment variables
+    load_dotenv()
+
+    mongodb_url = os.getenv('DATABASE_URL')
+    if not mongodb_url:
+        print("❌ DATABASE_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongodb_url)
+    db = client.occupation100
+
+    event_service.subscribe(print_event)
+    if invalidate:
+        event_service.subscribe(invalidate_changed_socs)
+
+    try:
+        if pre_images:
+            await event_service.enable_pre_images(db)
+            print("✅ Pre-images enabled on the jobs collection")
+        await event_service.watch_job_changes(db)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print SOC change events from the jobs change stream")
+    parser.add_argument("--invalidate", action="store_true", help="Also remove cached analyses of the changed SOC codes")
+    parser.add_argument("--enable-pre-images", action="store_true", help="Record postings' state before each change so deletes and SOC moves are seen")
+    args = parser.parse_args()
+    try:
+        asyncio.run(watch(args.invalidate, args.enable_pre_images))
+    except KeyboardInterrupt:
+        pass